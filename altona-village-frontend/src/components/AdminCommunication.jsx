@@ -59,6 +59,34 @@ const AdminCommunication = () => {
     }
   };
 
+  const pollEmailJob = (jobId) => {
+    const poll = async () => {
+      try {
+        const { data } = await adminAPI.getEmailJobStatus(jobId);
+        if (data.status === 'queued' || data.status === 'running') {
+          setMessage({
+            type: 'success',
+            text: `Sending email: ${data.sent_count} of ${data.total_recipients} sent${data.failed_count ? `, ${data.failed_count} failed` : ''}...`
+          });
+          setTimeout(poll, 3000);
+          return;
+        }
+        if (data.failed_count > 0 || data.status === 'failed') {
+          setMessage({
+            type: 'warning',
+            text: `${data.sent_count} emails sent, ${data.failed_count} failed. Check console for details.`
+          });
+          console.log('Failed emails:', data.failed_emails);
+        } else {
+          setMessage({ type: 'success', text: `Email sent successfully to ${data.sent_count} recipients!` });
+        }
+      } catch (error) {
+        console.error('Failed to fetch email job status:', error);
+      }
+    };
+    setTimeout(poll, 2000);
+  };
+
   const handleEmailSubmit = async (e) => {
     e.preventDefault();
     if (!emailData.subject.trim() || !emailData.message.trim()) {
@@ -83,7 +111,7 @@ const AdminCommunication = () => {
       
       setMessage({ 
         type: 'success', 
-        text: `Email sent successfully to ${response.data.sent_count} recipients!${uploadedFile ? ' (with attachment)' : ''}`
+        text: `Email queued for ${response.data.total_recipients} recipients${uploadedFile ? ' (with attachment)' : ''}. Sending in the background...`
       });
       
       // Reset form
@@ -98,16 +126,8 @@ const AdminCommunication = () => {
         removeAttachment();
       }
       
-      // Show detailed results if there were failures
-      if (response.data.failed_count > 0) {
-        setTimeout(() => {
-          setMessage({ 
-            type: 'warning', 
-            text: `${response.data.sent_count} emails sent, ${response.data.failed_count} failed. Check console for details.`
-          });
-          console.log('Failed emails:', response.data.failed_emails);
-        }, 3000);
-      }
+      // Follow the background send and show the final result
+      pollEmailJob(response.data.job_id);
       
     } catch (error) {
       setMessage({ type: 'error', text: 'Failed to send email: ' + (error.response?.data?.error || error.message) });
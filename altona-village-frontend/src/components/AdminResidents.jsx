@@ -33,10 +33,13 @@ import {
 
 const AdminResidents = () => {
   const [residents, setResidents] = useState([]);
-  const [filteredResidents, setFilteredResidents] = useState([]);
-  const [loading, setLoading] = useState(true);
+  const [loading, setLoading] = useState(true); // first load only
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [totalCount, setTotalCount] = useState(0);
   const [searchTerm, setSearchTerm] = useState('');
   const [filterType, setFilterType] = useState('all'); // all, residents, owners, both, archived
+  const [sortBy, setSortBy] = useState('street'); // street, surname, erf
   const [selectedResident, setSelectedResident] = useState(null);
   const [editDialogOpen, setEditDialogOpen] = useState(false);
   const [message, setMessage] = useState({ type: '', text: '' });
@@ -52,19 +55,37 @@ const AdminResidents = () => {
     color: ''
   });
 
+  // The directory is filtered, sorted and paged on the server
   useEffect(() => {
-    loadResidents();
-  }, []);
-
-  useEffect(() => {
-    filterResidents();
-  }, [residents, searchTerm, filterType]);
+    const timer = setTimeout(() => loadResidents(), searchTerm ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [searchTerm, filterType, sortBy]);
+
+  const PAGE_SIZE = 60;
+
+  const directoryParams = () => {
+    const params = { per_page: PAGE_SIZE, sort: sortBy };
+    if (searchTerm.trim()) params.q = searchTerm.trim();
+    switch (filterType) {
+      case 'residents':
+        return { ...params, type: 'tenant', archived: 'false' };
+      case 'owners':
+        return { ...params, type: 'owner', archived: 'false' };
+      case 'both':
+        return { ...params, type: 'owner-resident', archived: 'false' };
+      case 'archived':
+        return { ...params, archived: 'true' };
+      default:
+        return params;
+    }
+  };
 
   const loadResidents = async () => {
     try {
-      setLoading(true);
-      const response = await adminAPI.getAllResidents();
-      setResidents(response.data || []);
+      const response = await adminAPI.getAllResidents({ ...directoryParams(), include_total: 'true' });
+      setResidents(response.data?.data || []);
+      setNextCursor(response.data?.pagination?.next_cursor || null);
+      setTotalCount(response.data?.pagination?.total_count ?? 0);
     } catch (error) {
       console.error('Failed to load residents:', error);
       setMessage({ type: 'error', text: 'Failed to load residents data' });
@@ -73,45 +94,19 @@ const AdminResidents = () => {
     }
   };
 
-  const filterResidents = () => {
-    let filtered = residents;
-
-    // Filter by search term
-    if (searchTerm) {
-      const term = searchTerm.toLowerCase();
-      filtered = filtered.filter(resident => 
-        resident.first_name?.toLowerCase().includes(term) ||
-        resident.last_name?.toLowerCase().includes(term) ||
-        resident.email?.toLowerCase().includes(term) ||
-        resident.phone_number?.toLowerCase().includes(term) ||
-        resident.erf_number?.toLowerCase().includes(term) ||
-        resident.full_address?.toLowerCase().includes(term)
-      );
-    }
-
-    // Filter by type
-    if (filterType !== 'all') {
-      filtered = filtered.filter(resident => {
-        const isResident = resident.is_resident;
-        const isOwner = resident.is_owner;
-        const isArchived = resident.status === 'archived' || resident.archived === true;
-        
-        switch (filterType) {
-          case 'residents':
-            return isResident && !isOwner && !isArchived;
-          case 'owners':
-            return isOwner && !isResident && !isArchived;
-          case 'both':
-            return isResident && isOwner && !isArchived;
-          case 'archived':
-            return isArchived;
-          default:
-            return true;
-        }
-      });
+  const loadMoreResidents = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const response = await adminAPI.getAllResidents({ ...directoryParams(), cursor: nextCursor });
+      setResidents(prev => [...prev, ...(response.data?.data || [])]);
+      setNextCursor(response.data?.pagination?.next_cursor || null);
+    } catch (error) {
+      console.error('Failed to load more residents:', error);
+      setMessage({ type: 'error', text: 'Failed to load more residents' });
+    } finally {
+      setLoadingMore(false);
     }
-
-    setFilteredResidents(filtered);
   };
 
   const handleClearFilters = () => {
@@ -395,7 +390,7 @@ const AdminResidents = () => {
         <div className="flex items-center space-x-2">
           <Badge variant="outline">
             <Users className="w-4 h-4 mr-1" />
-            {filteredResidents.length} of {residents.length}
+            {residents.length} of {totalCount}
           </Badge>
         </div>
       </div>
@@ -429,6 +424,17 @@ const AdminResidents = () => {
                 />
               </div>
             </div>
+            <div className="w-full md:w-40">
+              <select
+                value={sortBy}
+                onChange={(e) => setSortBy(e.target.value)}
+                className="flex h-10 w-full rounded-md border border-input bg-background px-3 py-2 text-sm ring-offset-background focus:outline-none focus:ring-2 focus:ring-ring focus:ring-offset-2"
+              >
+                <option value="street">Sort by Street</option>
+                <option value="surname">Sort by Surname</option>
+                <option value="erf">Sort by ERF</option>
+              </select>
+            </div>
             <div className="w-full md:w-48">
               <select
                 value={filterType}
@@ -454,7 +460,7 @@ const AdminResidents = () => {
           </div>
           {(searchTerm || filterType !== 'all') && (
             <div className="mt-3 text-sm text-gray-600">
-              Showing {filteredResidents.length} of {residents.length} residents
+              Showing {residents.length} of {totalCount} residents
               {searchTerm && (
                 <span> matching "{searchTerm}"</span>
               )}
@@ -474,7 +480,7 @@ const AdminResidents = () => {
 
       {/* Residents Grid */}
       <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-        {filteredResidents.map((resident) => {
+        {residents.map((resident) => {
           const isArchived = resident.status === 'archived' || resident.archived === true;
           return (
           <Card 
@@ -573,7 +579,15 @@ const AdminResidents = () => {
         })}
       </div>
 
-      {filteredResidents.length === 0 && !loading && (
+      {nextCursor && (
+        <div className="flex justify-center">
+          <Button variant="outline" onClick={loadMoreResidents} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : `Load more (${residents.length} of ${totalCount})`}
+          </Button>
+        </div>
+      )}
+
+      {residents.length === 0 && !loading && (
         <Card>
           <CardContent className="flex flex-col items-center justify-center py-12">
             <Users className="w-12 h-12 text-gray-400 mb-4" />
@@ -45,7 +45,7 @@ export const adminAPI = {
   getPendingRegistrations: () => api.get('/admin/pending-registrations'),
   approveRegistration: (userId) => api.post(`/admin/approve-registration/${userId}`),
   rejectRegistration: (userId) => api.post(`/admin/reject-registration/${userId}`),
-  getAllResidents: () => api.get('/admin/residents'),
+  getAllResidents: (params) => api.get('/admin/residents', { params }),
   updateResident: (userId, data) => api.put(`/admin/residents/${userId}`, data),
   getAllProperties: () => api.get('/admin/properties'),
   createProperty: (data) => api.post('/admin/properties', data),
@@ -105,6 +105,7 @@ export const adminAPI = {
     });
   },
   sendBulkEmailWithAttachment: (data) => api.post('/communication/send-email-with-attachment', data),
+  getEmailJobStatus: (jobId) => api.get(`/communication/jobs/${jobId}`),
 };
 
 // Resident API
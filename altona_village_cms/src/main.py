@@ -10,6 +10,7 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+import click
 from flask import Flask, send_from_directory, jsonify, request
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
@@ -64,6 +65,12 @@ def create_app() -> Flask:
     app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "asdf#FGSgvasgf$5$WGT")
     app.config["JWT_SECRET_KEY"] = os.environ.get("JWT_SECRET_KEY", "jwt-secret-string-change-in-production")
     app.config["BOOTSTRAP_KEY"] = os.environ.get("BOOTSTRAP_KEY", "")
+    # Opt-in: sibling ERF accounts with the same password share one stored hash (see auth.login)
+    app.config["SHARE_PASSWORD_HASH_PER_EMAIL"] = os.environ.get("SHARE_PASSWORD_HASH_PER_EMAIL", "").lower() in ("1", "true", "yes")
+    # Opt-in: read address .xlsx uploads with pandas (legacy, whole sheet in memory) instead of streaming
+    app.config["ADDRESS_IMPORT_PANDAS_EXCEL"] = os.environ.get("ADDRESS_IMPORT_PANDAS_EXCEL", "").lower() in ("1", "true", "yes")
+    # Shared secret gate controllers send as X-Gate-Key to POST /api/admin/gate-access/events (empty = admins only)
+    app.config["GATE_INGEST_KEY"] = os.environ.get("GATE_INGEST_KEY", "")
 
     # ---- Database Configuration -------------------------------------------
     # Load from environment variable, with a fallback for local development.
@@ -91,19 +98,19 @@ def create_app() -> Flask:
     JWTManager(app)
     db.init_app(app)
 
-    # --- Create all database tables if they don't exist ---------------------
-    with app.app_context():
-        # This will create tables from all models imported in the project
-        # (e.g., User, Property, Vehicle)
-        db.create_all()
-
-    # --- Ensure the `user_changes` table exists -----------------------------
-    try:
-        from src.models.user_change import ensure_user_changes_table
+    # ---- Request metrics (Server-Timing, JSON logs, /api/admin/metrics) -----
+    if os.environ.get("METRICS_ENABLED", "1").lower() not in ("0", "false", "no"):
+        from src.utils.metrics import init_metrics
+        init_metrics(app)
+
+    # --- Schema ----------------------------------------------------------------
+    # Tables and column upgrades are applied once per deploy by `flask migrate-db`
+    # (see render.yaml), not on every worker boot. MIGRATE_ON_STARTUP=1 restores
+    # the old behaviour for setups without a release step.
+    if os.environ.get("MIGRATE_ON_STARTUP", "").lower() in ("1", "true", "yes"):
+        from src.models.migrate import migrate_schema
         with app.app_context():
-            ensure_user_changes_table()
-    except Exception as e:
-        app.logger.exception("Failed to ensure user_changes table: %s", e)
+            migrate_schema()
 
     # ---- Logging -----------------------------------------------------------
     logging.basicConfig(level=logging.INFO)
@@ -115,18 +122,169 @@ def create_app() -> Flask:
         return jsonify({"status": "ok"}), 200
 
     # ---- CLI command to initialize the database ----------------------------
+    @app.cli.command("migrate-db")
+    def migrate_db_command():
+        """Creates missing tables and applies schema upgrades (run once per deploy)."""
+        from src.models.migrate import migrate_schema
+        failed = migrate_schema()
+        if failed:
+            print(f"❌ Schema migration failed at: {', '.join(failed)}")
+            raise SystemExit(1)
+        print("✅ Database schema is up to date.")
+
     @app.cli.command("init-db")
     def init_db_command():
-        """Creates the database tables."""
-        try:
-            db.create_all()
-            from src.models.user_change import ensure_user_changes_table
-            ensure_user_changes_table()
+        """Creates the database tables (same as migrate-db)."""
+        from src.models.migrate import migrate_schema
+        failed = migrate_schema()
+        if failed:
+            print(f"Error initializing database: {', '.join(failed)} failed")
+            raise SystemExit(1)
+        else:
             print("Initialized the database and all tables.")
+
+    @app.cli.command("rebuild-gate-register")
+    def rebuild_gate_register_command():
+        """Rebuilds the gate register snapshot from the live tables."""
+        try:
+            from src.utils.gate_register import rebuild_gate_register
+            count = rebuild_gate_register()
+            db.session.commit()
+            print(f"✅ Gate register rebuilt ({count} entries).")
         except Exception as e:
-            print(f"Error initializing database: {e}")
-            # Optionally re-raise or handle more gracefully
-            # raise e
+            db.session.rollback()
+            print(f"❌ Failed to rebuild gate register: {e}")
+
+    @app.cli.command("backfill-change-erfs")
+    def backfill_change_erfs_command():
+        """Fills erf_number on legacy user_changes rows (run once after upgrading)."""
+        try:
+            from src.models.user_change import backfill_user_change_erfs
+            count = backfill_user_change_erfs()
+            db.session.commit()
+            print(f"✅ Backfilled ERF on {count} change rows.")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Failed to backfill change ERFs: {e}")
+
+    @app.cli.command("vehicle-plate-duplicates")
+    def vehicle_plate_duplicates_command():
+        """Lists legacy vehicles sharing a plate with another vehicle (left for an admin to resolve)."""
+        from src.models.user import duplicate_vehicle_plates
+        duplicates = duplicate_vehicle_plates()
+        if not duplicates:
+            print("✅ No duplicate vehicle plates.")
+            return
+        for d in duplicates:
+            vehicle, kept = d["vehicle"], d["kept_on"]
+            print(
+                f"{d['plate']}: vehicle {vehicle['id']} ('{vehicle['registration_number']}', {vehicle['status']}) "
+                f"duplicates vehicle {kept['id']} ('{kept['registration_number']}', {kept['status']})"
+            )
+        print(f"⚠️  {len(duplicates)} duplicate vehicle(s): delete them or correct their registration numbers.")
+
+    @app.cli.command("email-worker")
+    @click.option("--once", is_flag=True, help="Exit when the queue is empty instead of polling.")
+    @click.option("--poll-interval", default=5.0, show_default=True, help="Seconds between queue polls.")
+    def email_worker_command(once, poll_interval):
+        """Runs the background worker that sends queued bulk emails."""
+        from src.utils.email_jobs import run_email_worker
+        run_email_worker(poll_interval=poll_interval, once=once)
+
+    @app.cli.command("ingest-gate-events")
+    @click.argument("path", default="-", type=click.Path(allow_dash=True))
+    @click.option("--format", "fmt", type=click.Choice(["auto", "json", "ndjson"]), default="auto", show_default=True,
+                  help="auto: a file starting with '[' is a JSON array, anything else NDJSON.")
+    @click.option("--batch-size", default=1000, show_default=True, help="Events per bulk INSERT/commit.")
+    def ingest_gate_events_command(path, fmt, batch_size):
+        """Loads boom-gate/ANPR events from a JSON or NDJSON file (or stdin) into gate_access_logs."""
+        import json
+        import time
+        from itertools import chain
+        from src.utils.gate_access import ingest_events, read_json_events, read_ndjson_events
+
+        with click.open_file(path, "r", encoding="utf-8") as f:
+            head = f.readline()
+            while head and not head.strip():
+                head = f.readline()
+            if fmt == "auto":
+                fmt = "json" if head.lstrip().startswith("[") else "ndjson"
+            if fmt == "json":
+                events = read_json_events(json.loads(head + f.read()))
+            else:
+                events = read_ndjson_events(chain([head], f))
+
+            started = time.perf_counter()
+            result = ingest_events(events, batch_size=batch_size)
+            elapsed = time.perf_counter() - started
+
+        rate = result["received"] / elapsed if elapsed else 0
+        print(f"✅ {result['inserted']} of {result['received']} events stored "
+              f"({result['matched']} matched, {result['unmatched']} unknown plates, {result['rejected']} rejected) "
+              f"in {elapsed:.2f} s ({rate:,.0f} events/s)")
+        for error in result["errors"]:
+            print(f"   ❌ {error}")
+
+    @app.cli.command("simulate-gate-feed")
+    @click.option("--events", "count", default=10000, show_default=True, help="Number of events to generate.")
+    @click.option("--unknown-share", default=0.2, show_default=True, help="Share of visitor plates not in the register.")
+    @click.option("--output", default="-", type=click.Path(allow_dash=True), help="NDJSON file to write (default stdout).")
+    def simulate_gate_feed_command(count, unknown_share, output):
+        """Writes synthetic gate events (registered plates plus visitors) as NDJSON, for load tests."""
+        import json
+        from src.utils.gate_access import simulated_events
+
+        with click.open_file(output, "w", encoding="utf-8") as f:
+            for item in simulated_events(count, unknown_share=unknown_share):
+                f.write(json.dumps(item) + "\n")
+
+    @app.cli.command("gate-rollup-worker")
+    @click.option("--once", is_flag=True, help="Exit when no hours are pending instead of polling.")
+    @click.option("--poll-interval", default=60.0, show_default=True, help="Seconds between checks for new events.")
+    def gate_rollup_worker_command(once, poll_interval):
+        """Keeps the hourly/daily gate access rollups up to date."""
+        from src.utils.gate_history import run_rollup_worker
+        run_rollup_worker(poll_interval=poll_interval, once=once)
+
+    @app.cli.command("gate-access-partitions")
+    def gate_access_partitions_command():
+        """Lists the monthly raw gate access tables and their row counts."""
+        from src.utils.gate_history import list_shards, partition_info, pending_rollup_hours
+        for key in list_shards():
+            info = partition_info(key, with_count=True)
+            print(f"{info['month']}  {info['table']:<28} {info['rows']:>10,} rows")
+        print(f"Hours waiting for rollup: {pending_rollup_hours()}")
+
+    @app.cli.command("drop-gate-access-partitions")
+    @click.option("--before", required=True, help="Drop raw months before this one (YYYY-MM).")
+    @click.option("--archive-dir", type=click.Path(file_okay=False), help="Write each month to DIR/<table>.ndjson.gz first.")
+    @click.option("--yes", is_flag=True, help="Do not ask for confirmation.")
+    def drop_gate_access_partitions_command(before, archive_dir, yes):
+        """Drops (optionally archiving) old raw gate access months; rollups are kept."""
+        from src.utils.gate_history import list_shards, parse_month, drop_partition, run_rollups, GateHistoryError
+        try:
+            cutoff = parse_month(before)
+        except GateHistoryError as e:
+            raise click.BadParameter(str(e), param_hint="--before")
+
+        months = [key for key in list_shards() if key < cutoff]
+        if not months:
+            print("Nothing to drop.")
+            return
+        labels = ", ".join(f"{key[:4]}-{key[4:]}" for key in months)
+        if not yes and not click.confirm(f"Drop raw gate events for {labels}?"):
+            return
+
+        # count anything still pending before the raw rows go
+        while run_rollups()["hours"]:
+            pass
+        for key in months:
+            try:
+                info = drop_partition(key, archive_dir=archive_dir)
+                archived = f" (archived {info['archived']:,} rows to {info['archive']})" if archive_dir else ""
+                print(f"✅ Dropped {info['table']}{archived}")
+            except GateHistoryError as e:
+                print(f"❌ {key[:4]}-{key[4:]}: {e}")
 
     @app.cli.command("set-admin-password")
     def set_admin_password_command():
@@ -137,7 +295,7 @@ def create_app() -> Flask:
         try:
             from src.models.user import User  # Import the User model here
             # Find all users with this email, regardless of role
-            all_users = db.session.query(User).filter_by(email=admin_email).all()
+            all_users = User.accounts_for_email(admin_email).all()
             admin_user = next((u for u in all_users if u.role == 'admin'), None)
 
             if not admin_user:
@@ -249,4 +407,8 @@ def create_app() -> Flask:
 app = create_app()
 
 if __name__ == "__main__":
+    # local dev server: keep the schema current without a separate step
+    from src.models.migrate import migrate_schema
+    with app.app_context():
+        migrate_schema()
     app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 5000)), debug=True)
\ No newline at end of file
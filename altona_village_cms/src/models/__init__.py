@@ -1,2 +1,4 @@
 from .user import db
 from .user_change import UserChange
+from .gate_register import GateRegisterEntry
+from .email_job import EmailJob, EmailJobRecipient
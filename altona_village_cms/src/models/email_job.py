@@ -0,0 +1,121 @@
+# src/models/email_job.py
+import uuid
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+from .user import db
+
+
+class EmailJob(db.Model):
+    """
+    A queued bulk email send. Created by the communication endpoints and
+    drained by the email worker (`flask email-worker`), so the HTTP request
+    returns immediately.
+    """
+    __tablename__ = "email_jobs"
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    job_type = db.Column(db.String(50), nullable=False, default="bulk_email")  # bulk_email, bulk_email_attachment
+    status = db.Column(db.String(20), nullable=False, default="queued", index=True)  # queued, running, completed, failed
+
+    subject = db.Column(db.String(255), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    recipient_type = db.Column(db.String(50))
+    attachment_path = db.Column(db.String(500))
+
+    created_by = db.Column(db.String(36))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    # worker lease (a crashed worker's job is picked up again once the lease expires)
+    locked_by = db.Column(db.String(100))
+    locked_at = db.Column(db.DateTime)
+
+    error = db.Column(db.Text)
+
+    recipients = db.relationship("EmailJobRecipient", backref="job", lazy="dynamic",
+                                 cascade="all, delete-orphan")
+    attachment = db.relationship("EmailJobAttachment", uselist=False, lazy="select",
+                                 cascade="all, delete-orphan")
+
+    def to_dict(self, counts=None):
+        data = {
+            "job_id": self.id,
+            "job_type": self.job_type,
+            "status": self.status,
+            "subject": self.subject,
+            "recipient_type": self.recipient_type,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+        }
+        if counts is not None:
+            data.update(counts)
+        return data
+
+
+class EmailJobRecipient(db.Model):
+    """One recipient of an EmailJob and the outcome of their delivery."""
+    __tablename__ = "email_job_recipients"
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(36), db.ForeignKey("email_jobs.id"), nullable=False)
+    email = db.Column(db.String(255), nullable=False)
+    recipient_name = db.Column(db.String(255))
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, sent, failed
+    error = db.Column(db.Text)
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index("ix_email_job_recipients_job_status", "job_id", "status"),
+    )
+
+    def to_dict(self):
+        return {
+            "email": self.email,
+            "recipient_name": self.recipient_name,
+            "status": self.status,
+            "error": self.error,
+            "sent_at": self.sent_at.isoformat() if self.sent_at else None,
+        }
+
+
+class EmailJobAttachment(db.Model):
+    """
+    The file sent with a bulk_email_attachment job. The bytes live in the
+    database because the email worker runs as a separate service and cannot
+    read the web service's upload directory.
+    """
+    __tablename__ = "email_job_attachments"
+
+    job_id = db.Column(db.String(36), db.ForeignKey("email_jobs.id"), primary_key=True)
+    filename = db.Column(db.String(255), nullable=False)
+    content = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+def ensure_email_job_tables() -> None:
+    """
+    Create the email job tables if missing.
+    Called once per deploy from migrate-db.
+    """
+    try:
+        engine = db.engine
+        tables = set(db.inspect(engine).get_table_names())
+
+        for model in (EmailJob, EmailJobRecipient, EmailJobAttachment):
+            if model.__tablename__ not in tables:
+                model.__table__.create(bind=engine)
+                current_app.logger.info("Created table %s", model.__tablename__)
+
+        current_app.logger.info("email job tables OK")
+    except SQLAlchemyError as e:
+        try:
+            current_app.logger.exception("Failed to ensure email job tables: %s", e)
+        except Exception:
+            print(f"[ensure_email_job_tables] failed: {e}")
+        raise
@@ -0,0 +1,119 @@
+# src/models/gate_access.py
+"""
+Gate access history: rollup tables and the queue of hours to roll up.
+
+Raw events live in monthly tables (gate_access_logs_YYYYMM, see
+src/utils/gate_history.py). Dashboards read the rollups below instead, so
+their cost depends on the time range asked for, not on how many years of
+events have piled up.
+"""
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+from .user import db
+
+ROLLUP_GRAINS = ("hour", "day")
+
+
+class GateAccessRollup(db.Model):
+    """Events per gate and access type in one hour or day."""
+    __tablename__ = "gate_access_rollups"
+    __table_args__ = (
+        db.Index("ix_gate_access_rollups_gate", "grain", "gate_id", "bucket"),
+    )
+
+    grain = db.Column(db.String(10), primary_key=True)  # hour, day
+    bucket = db.Column(db.DateTime, primary_key=True)  # start of the hour/day (UTC)
+    gate_id = db.Column(db.String(50), primary_key=True)  # '' for events without a gate
+    access_type = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            "bucket": self.bucket.isoformat() if self.bucket else None,
+            "gate_id": self.gate_id or None,
+            "access_type": self.access_type,
+            "count": self.count,
+        }
+
+
+class GateVehicleRollup(db.Model):
+    """Events per plate (registered vehicle or visitor) and access type in one hour or day."""
+    __tablename__ = "gate_vehicle_rollups"
+    __table_args__ = (
+        db.Index("ix_gate_vehicle_rollups_plate", "plate", "grain", "bucket"),
+        db.Index("ix_gate_vehicle_rollups_vehicle", "vehicle_id", "grain", "bucket"),
+    )
+
+    grain = db.Column(db.String(10), primary_key=True)
+    bucket = db.Column(db.DateTime, primary_key=True)
+    plate = db.Column(db.String(50), primary_key=True)
+    access_type = db.Column(db.String(50), primary_key=True)
+    vehicle_id = db.Column(db.String(36))
+    count = db.Column(db.Integer, nullable=False, default=0)
+    first_seen = db.Column(db.DateTime)
+    last_seen = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            "bucket": self.bucket.isoformat() if self.bucket else None,
+            "plate": self.plate,
+            "vehicle_id": self.vehicle_id,
+            "access_type": self.access_type,
+            "count": self.count,
+            "first_seen": self.first_seen.isoformat() if self.first_seen else None,
+            "last_seen": self.last_seen.isoformat() if self.last_seen else None,
+        }
+
+
+class GateAccessPendingHour(db.Model):
+    """An hour with new raw events that the rollup job has not counted yet."""
+    __tablename__ = "gate_access_pending_hours"
+
+    hour = db.Column(db.DateTime, primary_key=True)
+    # re-marking an hour moves this on, so the job only clears what it counted
+    marked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class GateAccessPartition(db.Model):
+    """
+    A raw month that has been dropped. Its counts live on only in the
+    rollups, so events for it are rejected instead of starting a new raw
+    table whose recount would replace those counts.
+    """
+    __tablename__ = "gate_access_partitions"
+
+    month = db.Column(db.String(6), primary_key=True)  # YYYYMM
+    dropped_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    archive = db.Column(db.String(500))  # archive file written before the drop, if any
+
+
+def ensure_gate_access_history() -> None:
+    """
+    Create the rollup tables (and this and next month's raw tables) if
+    missing and move rows from the original single gate_access_logs table
+    into the monthly tables (queued for rollup).
+    Called once per deploy from migrate-db.
+    """
+    try:
+        engine = db.engine
+        for model in (GateAccessRollup, GateVehicleRollup, GateAccessPendingHour, GateAccessPartition):
+            model.__table__.create(bind=engine, checkfirst=True)
+            for index in model.__table__.indexes:
+                index.create(bind=engine, checkfirst=True)
+
+        from src.utils.gate_history import move_unpartitioned_events, ensure_upcoming_shards
+        ensure_upcoming_shards()
+        moved = move_unpartitioned_events()
+        if moved:
+            current_app.logger.info("Moved %s gate events into monthly tables", moved)
+
+        current_app.logger.info("gate access history tables OK")
+    except SQLAlchemyError as e:
+        try:
+            current_app.logger.exception("Failed to ensure gate access history tables: %s", e)
+        except Exception:
+            print(f"[ensure_gate_access_history] failed: {e}")
+        raise
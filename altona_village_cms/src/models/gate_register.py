@@ -0,0 +1,98 @@
+# src/models/gate_register.py
+import json
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+from .user import db
+from .user_change import _add_column_if_missing
+
+
+class GateRegisterEntry(db.Model):
+    """
+    Precomputed gate register row, one per household user.
+
+    Kept up to date by src.utils.gate_register (refreshed for the affected
+    users whenever a change is logged or a transition is migrated), so the
+    guard-station views read this table instead of rebuilding the register.
+    Holds every non-admin user with a Resident/Owner record; the views filter
+    on user_status / records_active.
+    """
+    __tablename__ = "gate_register_entries"
+
+    user_id = db.Column(db.String(36), primary_key=True)
+    user_status = db.Column(db.String(50), nullable=False)
+    records_active = db.Column(db.Boolean, nullable=False, default=True)
+
+    resident_status = db.Column(db.String(20), nullable=False)  # Resident / Owner / Owner-Resident
+    first_name = db.Column(db.String(100))
+    last_name = db.Column(db.String(100))
+    email = db.Column(db.String(255))
+    phone_number = db.Column(db.String(20))
+    street_number = db.Column(db.String(10))
+    street_name = db.Column(db.String(100))
+    full_address = db.Column(db.String(255))
+    erf_number = db.Column(db.String(50))
+    intercom_code = db.Column(db.String(20))
+
+    # JSON list of registration numbers
+    vehicle_registrations = db.Column(db.Text, nullable=False, default="[]")
+
+    sort_key = db.Column(db.String(100), nullable=False, default="")
+    # lower-case words of the row (names, ERF, address, phone digits, normalized
+    # plates) for the admin search; see src.utils.search
+    search_text = db.Column(db.Text)
+    refreshed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index("ix_gate_register_entries_status_sort", "user_status", "sort_key"),
+    )
+
+    def vehicle_list(self):
+        try:
+            return json.loads(self.vehicle_registrations or "[]")
+        except ValueError:
+            return []
+
+
+def ensure_gate_register_table() -> None:
+    """
+    Create the gate_register_entries table if missing and populate it on
+    first run. Called once per deploy from migrate-db.
+    """
+    try:
+        engine = db.engine
+        insp = db.inspect(engine)
+
+        if "gate_register_entries" not in set(insp.get_table_names()):
+            GateRegisterEntry.__table__.create(bind=engine)
+            current_app.logger.info("Created table gate_register_entries")
+
+        _add_column_if_missing(
+            engine, "gate_register_entries", "search_text",
+            "ALTER TABLE gate_register_entries ADD COLUMN search_text TEXT",
+            "ALTER TABLE gate_register_entries ADD COLUMN IF NOT EXISTS search_text TEXT",
+        )
+
+        # empty snapshot, or rows written before search_text existed
+        stale = db.session.query(GateRegisterEntry.user_id).filter(GateRegisterEntry.search_text.is_(None)).first()
+        if stale is not None or db.session.query(GateRegisterEntry.user_id).first() is None:
+            # Lazy import: the utils module imports the models
+            from src.utils.gate_register import rebuild_gate_register
+            count = rebuild_gate_register()
+            db.session.commit()
+            current_app.logger.info("Built gate register snapshot (%s entries)", count)
+
+        if engine.dialect.name == "postgresql":
+            from src.utils.search import ensure_search_indexes
+            ensure_search_indexes(engine)
+
+        current_app.logger.info("gate_register_entries table OK")
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        try:
+            current_app.logger.exception("Failed to ensure gate_register_entries table: %s", e)
+        except Exception:
+            print(f"[ensure_gate_register_table] failed: {e}")
+        raise
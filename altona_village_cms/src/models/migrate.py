@@ -0,0 +1,43 @@
+# src/models/migrate.py
+"""
+One-time schema setup: create missing tables and apply the additive column /
+index upgrades. Run it once per deploy (`flask migrate-db`) rather than in
+every worker's boot path.
+"""
+from flask import current_app
+
+from .user import db, ensure_user_email_column, ensure_vehicle_plate_column, ensure_gate_access_log_table
+from .user_change import ensure_user_changes_table
+from .gate_register import ensure_gate_register_table
+from .email_job import ensure_email_job_tables
+from .gate_access import ensure_gate_access_history
+
+# Order matters: users.email_normalized must exist before anything queries User
+SCHEMA_STEPS = (
+    ("create tables", db.create_all),
+    ("users.email_normalized", ensure_user_email_column),
+    ("vehicles.plate_normalized", ensure_vehicle_plate_column),
+    ("user_changes table", ensure_user_changes_table),
+    ("gate_register_entries table", ensure_gate_register_table),
+    ("email job tables", ensure_email_job_tables),
+    ("gate_access_logs table", ensure_gate_access_log_table),
+    ("gate access history", ensure_gate_access_history),
+)
+
+
+def migrate_schema() -> list:
+    """
+    Run every schema step inside the current app context. The ensure_*
+    helpers log and re-raise their database errors, so a failing step is
+    recorded here and the remaining steps still run. Returns the names of the
+    steps that failed (migrate-db exits non-zero when there are any).
+    """
+    failed = []
+    for name, step in SCHEMA_STEPS:
+        try:
+            step()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception("Schema step '%s' failed: %s", name, e)
+            failed.append(name)
+    return failed
@@ -1,15 +1,31 @@
+import re
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import validates, joinedload, selectinload
 from datetime import datetime
 import uuid
 from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
 
+
+def normalize_email(email):
+    """Canonical form used to match the accounts of one person (multi-ERF)."""
+    return (email or '').strip().lower()
+
+
+def normalize_plate(registration_number):
+    """Canonical vehicle plate: upper case letters and digits only ('ca 123-456' -> 'CA123456')."""
+    return re.sub(r'[^A-Z0-9]', '', (registration_number or '').upper())
+
+
 class User(db.Model):
     __tablename__ = 'users'
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     email = db.Column(db.String(255), nullable=False)  # Removed unique=True to allow multi-ERF registrations
+    # normalize_email(email), kept in sync by _sync_email_normalized; indexed for sibling-account lookups
+    email_normalized = db.Column(db.String(255), index=True)
     password_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(50), nullable=False, default='resident')
     status = db.Column(db.String(50), nullable=False, default='pending')
@@ -30,9 +46,21 @@ class User(db.Model):
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships - Updated for multi-group support
+    # Lazy by default; listings load them up front with the query profiles
+    # (with_household(), with_vehicles(), ...) at the bottom of this module.
     resident = db.relationship('Resident', backref='user', uselist=False, cascade='all, delete-orphan')
     owner = db.relationship('Owner', backref='user', uselist=False, cascade='all, delete-orphan')
 
+    @validates('email')
+    def _sync_email_normalized(self, key, value):
+        self.email_normalized = normalize_email(value)
+        return value
+
+    @classmethod
+    def accounts_for_email(cls, email):
+        """Query for every account (one per ERF) registered with this email, case-insensitively."""
+        return cls.query.filter(cls.email_normalized == normalize_email(email))
+
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
 
@@ -342,6 +370,9 @@ class Vehicle(db.Model):
     resident_id = db.Column(db.String(36), db.ForeignKey('residents.id'), nullable=True)
     owner_id = db.Column(db.String(36), db.ForeignKey('owners.id'), nullable=True)
     registration_number = db.Column(db.String(50), unique=True, nullable=False)
+    # normalize_plate(registration_number), kept in sync by _sync_plate_normalized;
+    # unique so 'CA 123-456' and 'ca123456' are the same vehicle, indexed for gate lookups
+    plate_normalized = db.Column(db.String(50), unique=True, index=True)
     make = db.Column(db.String(100))
     model = db.Column(db.String(100))
     color = db.Column(db.String(50))
@@ -354,6 +385,16 @@ class Vehicle(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    @validates('registration_number')
+    def _sync_plate_normalized(self, key, value):
+        self.plate_normalized = normalize_plate(value) or None
+        return value
+
+    @classmethod
+    def by_plate(cls, registration_number):
+        """Query for the vehicle with this plate, ignoring case, spaces and dashes."""
+        return cls.query.filter(cls.plate_normalized == normalize_plate(registration_number))
+
     def __repr__(self):
         return f'<Vehicle {self.registration_number}>'
 
@@ -363,6 +404,7 @@ class Vehicle(db.Model):
             'resident_id': self.resident_id,
             'owner_id': self.owner_id,
             'registration_number': self.registration_number,
+            'plate_normalized': self.plate_normalized,
             'make': self.make,
             'model': self.model,
             'color': self.color,
@@ -466,6 +508,8 @@ class ComplaintUpdate(db.Model):
     update_text = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
+    author = db.relationship('User')
+
     def __repr__(self):
         return f'<ComplaintUpdate {self.id}>'
 
@@ -598,20 +642,49 @@ class UserTransitionRequest(db.Model):
     def __repr__(self):
         return f'<UserTransitionRequest {self.request_type} - ERF {self.erf_number}>'
 
-    def to_dict(self):
-        # Get user information
-        user = User.query.get(self.user_id) if self.user_id else None
-        
+    # Columns used by to_summary_dict(); listings load only these
+    SUMMARY_FIELDS = (
+        'id', 'user_id', 'erf_number', 'request_type', 'current_role', 'status', 'priority',
+        'intended_moveout_date', 'property_transfer_date', 'expected_transfer_date',
+        'new_occupant_type', 'new_occupant_name', 'new_occupant_movein_date',
+        'assigned_admin', 'migration_completed', 'new_user_id',
+        'created_at', 'updated_at', 'completion_date',
+    )
+
+    def _requester(self):
+        """(user, first_name, last_name) of the requester, via the (possibly eager-loaded) relationship."""
+        user = self.user if self.user_id else None
+
         # Extract first and last names from user's resident or owner record
-        user_first_name = None
-        user_last_name = None
+        first_name = None
+        last_name = None
         if user:
             if user.resident:
-                user_first_name = user.resident.first_name
-                user_last_name = user.resident.last_name
+                first_name = user.resident.first_name
+                last_name = user.resident.last_name
             elif user.owner:
-                user_first_name = user.owner.first_name
-                user_last_name = user.owner.last_name
+                first_name = user.owner.first_name
+                last_name = user.owner.last_name
+        return user, first_name, last_name
+
+    def to_summary_dict(self):
+        """Compact row for admin listings (full details come from to_dict)."""
+        user, user_first_name, user_last_name = self._requester()
+        data = {}
+        for field in self.SUMMARY_FIELDS:
+            value = getattr(self, field)
+            data[field] = value.isoformat() if hasattr(value, 'isoformat') else value
+        data.update({
+            'user_email': user.email if user else None,
+            'user_first_name': user_first_name,
+            'user_last_name': user_last_name,
+            'current_user_first_name': user_first_name,  # For transition linking compatibility
+            'current_user_last_name': user_last_name,    # For transition linking compatibility
+        })
+        return data
+
+    def to_dict(self):
+        user, user_first_name, user_last_name = self._requester()
         
         return {
             'id': self.id,
@@ -745,10 +818,18 @@ class TransitionVehicle(db.Model):
         }
 
 class GateAccessLog(db.Model):
+    # Column layout of the monthly gate_access_logs_YYYYMM tables that hold the events
+    # (src/utils/gate_history.py); this table itself only holds rows awaiting migrate-db.
     __tablename__ = 'gate_access_logs'
+    # time-range scans (all gates) and one vehicle's history
+    __table_args__ = (
+        db.Index('ix_gate_access_logs_access_time', 'access_time'),
+        db.Index('ix_gate_access_logs_vehicle_time', 'vehicle_id', 'access_time'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     vehicle_id = db.Column(db.String(36), db.ForeignKey('vehicles.id'))
+    plate = db.Column(db.String(50))  # normalize_plate() of the plate as read at the gate (kept for unknown vehicles)
     access_time = db.Column(db.DateTime, nullable=False)
     access_type = db.Column(db.String(50), nullable=False)
     gate_id = db.Column(db.String(50))
@@ -762,6 +843,7 @@ class GateAccessLog(db.Model):
         return {
             'id': self.id,
             'vehicle_id': self.vehicle_id,
+            'plate': self.plate,
             'access_time': self.access_time.isoformat() if self.access_time else None,
             'access_type': self.access_type,
             'gate_id': self.gate_id,
@@ -810,27 +892,242 @@ class ErfAddressMapping(db.Model):
         return mapping.to_dict() if mapping else None
     
     @staticmethod
-    def bulk_import_addresses(address_data, uploaded_by_id):
-        """Bulk import address mappings from uploaded data"""
+    def bulk_import_addresses(address_data, uploaded_by_id, mode='replace'):
+        """
+        Bulk import address mappings from uploaded data (dicts with erf_number,
+        street_number, street_name and optional suburb/postal_code).
+        mode='replace' swaps in the full set; mode='diff' writes only new or
+        changed ERFs. See src.utils.address_import.
+        """
+        # Lazy import: the import pipeline imports this module
+        from src.utils.address_import import (
+            import_address_records, AddressImportError, REQUIRED_COLUMNS, OPTIONAL_COLUMNS,
+        )
         try:
-            # Clear existing mappings
-            ErfAddressMapping.query.delete()
-            
-            # Add new mappings
-            for data in address_data:
-                mapping = ErfAddressMapping(
-                    erf_number=str(data['erf_number']).strip(),
-                    street_number=str(data['street_number']).strip(),
-                    street_name=str(data['street_name']).strip(),
-                    full_address=str(data['full_address']).strip(),
-                    suburb=str(data.get('suburb', '')).strip() or None,
-                    postal_code=str(data.get('postal_code', '')).strip() or None,
-                    uploaded_by=uploaded_by_id
-                )
-                db.session.add(mapping)
-            
-            db.session.commit()
-            return True, f"Successfully imported {len(address_data)} address mappings"
+            counts = import_address_records(
+                REQUIRED_COLUMNS + OPTIONAL_COLUMNS, address_data, uploaded_by_id, mode=mode
+            )
+            return True, f"Successfully imported {counts['total']} address mappings"
+        except AddressImportError as e:
+            return False, f"Import failed: {e}"
         except Exception as e:
-            db.session.rollback()
             return False, f"Import failed: {str(e)}"
+
+
+# ---- Query profiles ---------------------------------------------------------
+# Loader options for the listing endpoints, so a page of rows costs a fixed
+# number of queries instead of one per row per relationship. Use them as
+#   User.query.options(*with_household()).filter(...)
+# Single rows join their one-to-one records; collections use selectin loads.
+
+def with_household():
+    """User -> resident and owner records, joined into the same query."""
+    return (joinedload(User.resident), joinedload(User.owner))
+
+
+def with_vehicles():
+    """with_household() plus the vehicles of both records (one extra query each)."""
+    return (
+        joinedload(User.resident).selectinload(Resident.vehicles),
+        joinedload(User.owner).selectinload(Owner.vehicles),
+    )
+
+
+def with_meters():
+    """Property -> resident, builder and meters."""
+    return (
+        joinedload(Property.resident),
+        joinedload(Property.builder),
+        selectinload(Property.meters),
+    )
+
+
+def with_updates():
+    """Complaint -> resident, updates and the name of each update's author."""
+    author = selectinload(Complaint.updates).joinedload(ComplaintUpdate.author)
+    return (
+        joinedload(Complaint.resident),
+        author.joinedload(User.resident),
+        author.joinedload(User.owner),
+    )
+
+
+def ensure_user_email_column() -> None:
+    """
+    Add users.email_normalized (plus its index) to existing databases and
+    fill it for rows created before the column existed.
+    Called once per deploy from migrate-db, before anything queries User.
+    """
+    from flask import current_app
+    from sqlalchemy.exc import SQLAlchemyError
+    from .user_change import _add_column_if_missing
+
+    try:
+        engine = db.engine
+        _add_column_if_missing(
+            engine,
+            "users",
+            "email_normalized",
+            "ALTER TABLE users ADD COLUMN email_normalized VARCHAR(255)",
+            "ALTER TABLE users ADD COLUMN IF NOT EXISTS email_normalized VARCHAR(255)",
+        )
+        for index in User.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+        table = User.__table__
+        with engine.begin() as conn:
+            result = conn.execute(
+                table.update()
+                .where(table.c.email_normalized.is_(None))
+                .values(email_normalized=db.func.lower(db.func.trim(table.c.email)))
+            )
+        if result.rowcount:
+            current_app.logger.info("Normalized %s user email(s)", result.rowcount)
+
+        current_app.logger.info("users.email_normalized OK")
+    except SQLAlchemyError as e:
+        try:
+            current_app.logger.exception("Failed to ensure users.email_normalized: %s", e)
+        except Exception:
+            print(f"[ensure_user_email_column] failed: {e}")
+        raise
+
+
+def ensure_vehicle_plate_column() -> None:
+    """
+    Add vehicles.plate_normalized (plus its unique index) to existing
+    databases and fill it for rows created before the column existed.
+    Legacy rows whose plates collide once normalized are the same car
+    registered twice: one row gets the plate (an active one first, then the
+    oldest) and the others keep plate_normalized NULL so the unique index
+    can be built. They are left as they are (gate access included) for an
+    admin to resolve; see duplicate_vehicle_plates().
+    """
+    from flask import current_app
+    from sqlalchemy.exc import SQLAlchemyError
+    from .user_change import _add_column_if_missing
+
+    try:
+        engine = db.engine
+        _add_column_if_missing(
+            engine,
+            "vehicles",
+            "plate_normalized",
+            "ALTER TABLE vehicles ADD COLUMN plate_normalized VARCHAR(50)",
+            "ALTER TABLE vehicles ADD COLUMN IF NOT EXISTS plate_normalized VARCHAR(50)",
+        )
+
+        table = Vehicle.__table__
+        with engine.begin() as conn:
+            taken = {
+                plate for (plate,) in conn.execute(
+                    db.select(table.c.plate_normalized).where(table.c.plate_normalized.isnot(None))
+                )
+            }
+            missing = conn.execute(
+                db.select(table.c.id, table.c.registration_number)
+                .where(table.c.plate_normalized.is_(None))
+                .order_by(
+                    db.case((table.c.status == 'active', 0), else_=1),
+                    table.c.created_at,
+                    table.c.id,
+                )
+            ).all()
+
+            updates, conflicts = [], 0
+            for vehicle_id, registration_number in missing:
+                plate = normalize_plate(registration_number)
+                if not plate:
+                    continue
+                if plate in taken:
+                    conflicts += 1
+                    continue
+                taken.add(plate)
+                updates.append({"vehicle_id": vehicle_id, "plate": plate})
+
+            if updates:
+                conn.execute(
+                    table.update()
+                    .where(table.c.id == db.bindparam("vehicle_id"))
+                    .values(plate_normalized=db.bindparam("plate")),
+                    updates,
+                )
+
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+        if updates:
+            current_app.logger.info("Normalized %s vehicle plate(s)", len(updates))
+        if conflicts:
+            current_app.logger.warning(
+                "%s vehicle(s) share a plate with another vehicle after normalizing; "
+                "run `flask vehicle-plate-duplicates` (or GET /api/admin/vehicles/duplicate-plates) to resolve them",
+                conflicts,
+            )
+        current_app.logger.info("vehicles.plate_normalized OK")
+    except SQLAlchemyError as e:
+        try:
+            current_app.logger.exception("Failed to ensure vehicles.plate_normalized: %s", e)
+        except Exception:
+            print(f"[ensure_vehicle_plate_column] failed: {e}")
+        raise
+
+
+def duplicate_vehicle_plates() -> list:
+    """
+    Vehicles left without plate_normalized because another vehicle already
+    holds the same normalized plate (see ensure_vehicle_plate_column), each
+    with the vehicle that holds it. An admin resolves them by deleting the
+    duplicate or correcting its registration number.
+    """
+    orphans = [
+        vehicle for vehicle in Vehicle.query.filter(Vehicle.plate_normalized.is_(None)).all()
+        if normalize_plate(vehicle.registration_number)
+    ]
+    plates = {normalize_plate(vehicle.registration_number) for vehicle in orphans}
+    holders = {
+        vehicle.plate_normalized: vehicle
+        for vehicle in Vehicle.query.filter(Vehicle.plate_normalized.in_(plates)).all()
+    } if plates else {}
+
+    duplicates = []
+    for vehicle in orphans:
+        holder = holders.get(normalize_plate(vehicle.registration_number))
+        if holder is not None:
+            duplicates.append({
+                "plate": holder.plate_normalized,
+                "vehicle": vehicle.to_dict(),
+                "kept_on": holder.to_dict(),
+            })
+    duplicates.sort(key=lambda d: (d["plate"], d["vehicle"]["registration_number"]))
+    return duplicates
+
+
+def ensure_gate_access_log_table() -> None:
+    """
+    Add gate_access_logs.plate and the access-time indexes to databases
+    created before the gate feed was ingested.
+    """
+    from flask import current_app
+    from sqlalchemy.exc import SQLAlchemyError
+    from .user_change import _add_column_if_missing
+
+    try:
+        engine = db.engine
+        GateAccessLog.__table__.create(bind=engine, checkfirst=True)
+        _add_column_if_missing(
+            engine,
+            "gate_access_logs",
+            "plate",
+            "ALTER TABLE gate_access_logs ADD COLUMN plate VARCHAR(50)",
+            "ALTER TABLE gate_access_logs ADD COLUMN IF NOT EXISTS plate VARCHAR(50)",
+        )
+        for index in GateAccessLog.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+        current_app.logger.info("gate_access_logs table OK")
+    except SQLAlchemyError as e:
+        try:
+            current_app.logger.exception("Failed to ensure gate_access_logs: %s", e)
+        except Exception:
+            print(f"[ensure_gate_access_log_table] failed: {e}")
+        raise
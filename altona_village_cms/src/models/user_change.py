@@ -6,7 +6,7 @@ from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.engine import Engine
 
-from .user import db
+from .user import db, Resident, Owner
 
 
 class UserChange(db.Model):
@@ -35,6 +35,12 @@ class UserChange(db.Model):
     # NEW: related ERF (nullable for legacy rows)
     erf_number = db.Column(db.String(64), nullable=True)
 
+    __table_args__ = (
+        # review feeds: unreviewed rows by field, newest first
+        db.Index("ix_user_changes_review_field_ts", "admin_reviewed", "field_name", "change_timestamp"),
+        db.Index("ix_user_changes_user_id", "user_id"),
+    )
+
 
 def _add_column_if_missing(engine: Engine, table: str, column: str,
                            ddl_sqlite: str, ddl_pg: str) -> None:
@@ -51,8 +57,9 @@ def _add_column_if_missing(engine: Engine, table: str, column: str,
 
 def ensure_user_changes_table() -> None:
     """
-    Create the user_changes table if missing, and ensure the erf_number column exists.
-    Called once at app startup from main.py.
+    Create the user_changes table if missing, and ensure the erf_number column
+    and the review-feed indexes exist.
+    Called once per deploy from migrate-db.
     """
     try:
         engine = db.engine
@@ -71,9 +78,39 @@ def ensure_user_changes_table() -> None:
             "ALTER TABLE user_changes ADD COLUMN IF NOT EXISTS erf_number VARCHAR(64)",
         )
 
+        # tables created before the indexes were declared
+        for index in UserChange.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+
         current_app.logger.info("user_changes table OK (schema up-to-date)")
     except SQLAlchemyError as e:
         try:
             current_app.logger.exception("Failed to ensure user_changes table: %s", e)
         except Exception:
             print(f"[ensure_user_changes_table] failed: {e}")
+        raise
+
+
+def backfill_user_change_erfs() -> int:
+    """
+    One-off fill of erf_number on rows logged before the column existed,
+    from the user's Resident row, else their Owner row. Single UPDATE, no
+    commit. Returns the number of rows updated.
+    """
+    table = UserChange.__table__
+    resident_erf = (
+        db.select(Resident.erf_number)
+        .where(Resident.user_id == table.c.user_id)
+        .scalar_subquery()
+    )
+    owner_erf = (
+        db.select(Owner.erf_number)
+        .where(Owner.user_id == table.c.user_id)
+        .scalar_subquery()
+    )
+    result = db.session.execute(
+        table.update()
+        .where(db.or_(table.c.erf_number.is_(None), table.c.erf_number == ""))
+        .values(erf_number=db.func.coalesce(resident_erf, owner_erf))
+    )
+    return result.rowcount
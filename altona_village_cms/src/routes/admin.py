@@ -1,54 +1,60 @@
-from flask import Blueprint, request, jsonify, Response
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy import text
 from src.models.user import User, Resident, Owner, Property, Vehicle, Builder, Meter, Complaint, ComplaintUpdate, ErfAddressMapping, db
+from src.models.user import with_household, with_vehicles, with_meters, with_updates, normalize_plate, duplicate_vehicle_plates
 from src.models.user_change import UserChange
 from src.utils.email_service import send_approval_email, send_rejection_email
+from src.utils.gate_register import (
+    load_gate_households, load_gate_register_snapshot, gate_register_snapshot_query,
+    mark_gate_register_dirty, ACTIVE_STATUSES, is_active_status,
+)
+from src.utils.csv_stream import csv_download, EXPORT_BATCH_SIZE
+from src.utils.auth import check_admin
+from src.utils.address_import import (
+    read_csv_upload, read_xlsx_upload, read_xlsx_upload_pandas, close_upload_records, import_address_records,
+    AddressImportError,
+)
+from src.utils.metrics import metrics_snapshot, reset_metrics
+from src.utils.search import search_households, DEFAULT_LIMIT as SEARCH_DEFAULT_LIMIT, MAX_LIMIT as SEARCH_MAX_LIMIT
+from src.utils.resident_directory import (
+    directory_page, count_directory, decode_cursor as decode_directory_cursor,
+    SORT_KEYS as DIRECTORY_SORT_KEYS, TYPE_FILTERS as DIRECTORY_TYPE_FILTERS,
+    DEFAULT_PAGE_SIZE as DIRECTORY_PAGE_SIZE, MAX_PAGE_SIZE as DIRECTORY_MAX_PAGE_SIZE,
+)
+from src.utils.erf_addresses import lookup_erf_address, bump_erf_address_version, CACHE_SECONDS as ERF_CACHE_SECONDS
 from datetime import datetime
+from contextlib import nullcontext
 import io
 import csv
 import os
-
-# Test pandas and openpyxl imports at startup
-try:
-    import pandas as pd
-    print("✅ pandas imported successfully in admin.py")
-except ImportError as e:
-    print(f"❌ pandas import failed in admin.py: {e}")
-
-try:
-    import openpyxl
-    print("✅ openpyxl imported successfully in admin.py")
-except ImportError as e:
-    print(f"❌ openpyxl import failed in admin.py: {e}")
+import time
 
 # Import change tracking function
 try:
-    from src.routes.admin_notifications import log_user_change
+    from src.routes.admin_notifications import log_user_change, change_log_batch, invalidate_change_stats
 except ImportError:
     # Fallback if admin_notifications module doesn't exist yet
     def log_user_change(*args, **kwargs):
         pass
 
-admin_bp = Blueprint('admin', __name__)
+    def change_log_batch(commit=False):
+        return nullcontext()
+
+    def invalidate_change_stats():
+        pass
 
-def admin_required():
-    """Decorator to check if user is admin"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user or user.role != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-    return None
+admin_bp = Blueprint('admin', __name__)
 
 @admin_bp.route('/pending-registrations', methods=['GET'])
 @jwt_required()
 def get_pending_registrations():
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
     try:
-        pending_users = User.query.filter_by(status='pending').all()
+        pending_users = User.query.options(*with_household()).filter_by(status='pending').all()
         result = []
         
         for user in pending_users:
@@ -90,7 +96,7 @@ def get_pending_registrations():
 @admin_bp.route('/approve-registration/<user_id>', methods=['POST'])
 @jwt_required()
 def approve_registration(user_id):
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
@@ -115,6 +121,7 @@ def approve_registration(user_id):
         user.approval_email_sent = email_success
         user.approval_email_sent_at = datetime.utcnow() if email_success else None
         
+        mark_gate_register_dirty(user.id)
         db.session.commit()
         
         return jsonify({
@@ -130,7 +137,7 @@ def approve_registration(user_id):
 @admin_bp.route('/reject-registration/<user_id>', methods=['POST'])
 @jwt_required()
 def reject_registration(user_id):
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
@@ -154,6 +161,7 @@ def reject_registration(user_id):
         
         # Delete user and associated resident data
         db.session.delete(user)
+        mark_gate_register_dirty(user_id)
         db.session.commit()
         
         return jsonify({
@@ -169,106 +177,63 @@ def reject_registration(user_id):
 @admin_bp.route('/residents', methods=['GET'])
 @jwt_required()
 def get_all_residents():
-    admin_check = admin_required()
+    """
+    Resident directory.
+    Query params: sort=street|surname|erf, order=asc|desc, status=active,pending,
+    archived=true|false, type=tenant|owner|owner-resident, q=<text>.
+    With per_page or cursor the response is one keyset page
+    ({data, pagination}); without them it is the full list (legacy array).
+    """
+    admin_check = check_admin()
     if admin_check:
         return admin_check
 
     try:
-        users = User.query.filter((User.resident.has()) | (User.owner.has())).all()
-        out = []
-
-        for user in users:
-            try:
-                row = {
-                    "user_id": user.id,
-                    "email": user.email,
-                    "status": user.status,
-                    "archived": bool(getattr(user, "archived", False)),
-                    "created_at": user.created_at.isoformat() if getattr(user, "created_at", None) else None,
-                    "is_resident": user.resident is not None,
-                    "is_owner": user.owner is not None,
-                }
-
-                # tenant_or_owner
-                if user.resident and user.owner:
-                    row["tenant_or_owner"] = "owner-resident"
-                elif user.owner:
-                    row["tenant_or_owner"] = "owner"
-                elif user.resident:
-                    row["tenant_or_owner"] = "tenant"
-                else:
-                    row["tenant_or_owner"] = ""
-
-                # resident details (if present)
-                if user.resident:
-                    r = user.resident
-                    row.update({
-                        "id": r.id,
-                        "first_name": r.first_name or "",
-                        "last_name": r.last_name or "",
-                        "phone_number": r.phone_number or "",
-                        "emergency_contact_name": r.emergency_contact_name or "",
-                        "emergency_contact_number": r.emergency_contact_number or "",
-                        "id_number": r.id_number or "",
-                        "erf_number": r.erf_number or "",
-                        "street_number": r.street_number or "",
-                        "street_name": r.street_name or "",
-                        "full_address": r.full_address or "",
-                        "intercom_code": r.intercom_code or "",
-                    })
-                # owner details (if resident missing but owner present)
-                elif user.owner:
-                    o = user.owner
-                    row.update({
-                        "id": o.id,
-                        "first_name": o.first_name or "",
-                        "last_name": o.last_name or "",
-                        "phone_number": o.phone_number or "",
-                        "emergency_contact_name": o.emergency_contact_name or "",
-                        "emergency_contact_number": o.emergency_contact_number or "",
-                        "id_number": o.id_number or "",
-                        "erf_number": o.erf_number or "",
-                        "street_number": o.street_number or "",
-                        "street_name": o.street_name or "",
-                        "full_address": o.full_address or "",
-                        "intercom_code": o.intercom_code or "",
-                    })
-
-                # vehicles (manual, JSON-safe)
-                vehicles = []
-                if user.resident:
-                    for v in Vehicle.query.filter_by(resident_id=user.resident.id).all():
-                        vehicles.append({
-                            "id": v.id,
-                            "registration_number": v.registration_number or "",
-                            "make": v.make or "",
-                            "model": v.model or "",
-                            "color": v.color or "",
-                            "status": v.status or "",
-                        })
-                if user.owner:
-                    for v in Vehicle.query.filter_by(owner_id=user.owner.id).all():
-                        vehicles.append({
-                            "id": v.id,
-                            "registration_number": v.registration_number or "",
-                            "make": v.make or "",
-                            "model": v.model or "",
-                            "color": v.color or "",
-                            "status": v.status or "",
-                        })
+        args = request.args
+        sort = args.get("sort", "street")
+        order = args.get("order", "asc").lower()
+        kind = args.get("type") or None
+        if sort not in DIRECTORY_SORT_KEYS:
+            return jsonify({"error": f"sort must be one of: {', '.join(DIRECTORY_SORT_KEYS)}"}), 400
+        if order not in ("asc", "desc"):
+            return jsonify({"error": "order must be asc or desc"}), 400
+        if kind and kind not in DIRECTORY_TYPE_FILTERS:
+            return jsonify({"error": f"type must be one of: {', '.join(DIRECTORY_TYPE_FILTERS)}"}), 400
+
+        archived = args.get("archived")
+        filters = {
+            "sort": sort,
+            "order": order,
+            "type": kind,
+            "status": [v.strip() for v in args.get("status", "").split(",") if v.strip()],
+            "archived": None if archived is None else archived.lower() == "true",
+            "q": args.get("q", "").strip(),
+        }
 
-                row["vehicles"] = vehicles
-                out.append(row)
+        cursor = args.get("cursor")
+        if "per_page" not in args and not cursor:
+            rows, _ = directory_page(filters)
+            return jsonify(rows), 200
 
-            except Exception as build_err:
-                # Don’t fail the whole list if one row is odd
-                out.append({
-                    "user_id": getattr(user, "id", None),
-                    "email": getattr(user, "email", None),
-                    "error": f"row_build_failed: {build_err}",
-                })
+        per_page = args.get("per_page", DIRECTORY_PAGE_SIZE, type=int) or DIRECTORY_PAGE_SIZE
+        per_page = max(1, min(per_page, DIRECTORY_MAX_PAGE_SIZE))
+        try:
+            after = decode_directory_cursor(cursor, sort, order) if cursor else None
+            rows, next_cursor = directory_page(filters, after=after, limit=per_page)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        return jsonify(out), 200
+        return jsonify({
+            "data": rows,
+            "pagination": {
+                "per_page": per_page,
+                "next_cursor": next_cursor,
+                "has_next": next_cursor is not None,
+                "has_prev": bool(cursor),
+                "total_count": count_directory(filters) if args.get("include_total", "false").lower() == "true" else None,
+            },
+            "count": len(rows),
+        }), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -276,7 +241,7 @@ def get_all_residents():
 @admin_bp.route('/residents/<user_id>', methods=['PUT'])
 @jwt_required()
 def update_resident(user_id):
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
@@ -544,31 +509,33 @@ def update_resident(user_id):
                 user_name = user.email
                 erf_number = 'Unknown'
             
-            # Log changes made by admin - only if values actually changed
-            if 'full_name' in data and old_values.get('full_name') != data['full_name']:
-                log_user_change(user.id, user_name, erf_number, 'admin_update', 'full_name', old_values['full_name'], data['full_name'])
+            with change_log_batch():
+                # Log changes made by admin - only if values actually changed
+                if 'full_name' in data and old_values.get('full_name') != data['full_name']:
+                    log_user_change(user.id, user_name, erf_number, 'admin_update', 'full_name', old_values['full_name'], data['full_name'])
             
-            if 'phone' in data and old_values.get('phone') != data['phone']:
-                log_user_change(user.id, user_name, erf_number, 'admin_update', 'cellphone_number', old_values['phone'], data['phone'])
+                if 'phone' in data and old_values.get('phone') != data['phone']:
+                    log_user_change(user.id, user_name, erf_number, 'admin_update', 'cellphone_number', old_values['phone'], data['phone'])
             
-            if 'email' in data and old_values.get('email') != data['email']:
-                log_user_change(user.id, user_name, erf_number, 'admin_update', 'email', old_values['email'], data['email'])
+                if 'email' in data and old_values.get('email') != data['email']:
+                    log_user_change(user.id, user_name, erf_number, 'admin_update', 'email', old_values['email'], data['email'])
             
-            if 'intercom_code' in data and old_values.get('intercom_code') != data['intercom_code']:
-                log_user_change(user.id, user_name, erf_number, 'admin_update', 'intercom_code', old_values['intercom_code'], data['intercom_code'])
+                if 'intercom_code' in data and old_values.get('intercom_code') != data['intercom_code']:
+                    log_user_change(user.id, user_name, erf_number, 'admin_update', 'intercom_code', old_values['intercom_code'], data['intercom_code'])
             
-            if 'property_address' in data and old_values.get('property_address') != data['property_address']:
-                log_user_change(user.id, user_name, erf_number, 'admin_update', 'property_address', old_values['property_address'], data['property_address'])
+                if 'property_address' in data and old_values.get('property_address') != data['property_address']:
+                    log_user_change(user.id, user_name, erf_number, 'admin_update', 'property_address', old_values['property_address'], data['property_address'])
             
-            if ('resident_status_change' in data or 'tenant_or_owner' in data):
-                new_status = data.get('resident_status_change') or data.get('tenant_or_owner')
-                if old_values.get('resident_status') != new_status:
-                    log_user_change(user.id, user_name, erf_number, 'admin_update', 'resident_status', old_values['resident_status'], new_status)
+                if ('resident_status_change' in data or 'tenant_or_owner' in data):
+                    new_status = data.get('resident_status_change') or data.get('tenant_or_owner')
+                    if old_values.get('resident_status') != new_status:
+                        log_user_change(user.id, user_name, erf_number, 'admin_update', 'resident_status', old_values['resident_status'], new_status)
                 
         except Exception as log_error:
             print(f"Error logging admin change: {log_error}")
         
         user.updated_at = datetime.utcnow()
+        mark_gate_register_dirty(user.id)
         db.session.commit()
         
         return jsonify({
@@ -583,7 +550,7 @@ def update_resident(user_id):
 @admin_bp.route('/properties', methods=['GET'])
 @jwt_required()
 def get_all_properties():
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
 
@@ -591,7 +558,7 @@ def get_all_properties():
         return v.isoformat() if hasattr(v, "isoformat") else v
 
     try:
-        props = Property.query.all()
+        props = Property.query.options(*with_meters()).all()
         out = []
 
         for p in props:
@@ -668,7 +635,7 @@ def get_all_properties():
 @admin_bp.route('/properties', methods=['POST'])
 @jwt_required()
 def create_property():
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
@@ -698,7 +665,7 @@ def create_property():
 @admin_bp.route('/builders', methods=['POST'])
 @jwt_required()
 def create_builder():
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
@@ -726,7 +693,7 @@ def create_builder():
 @admin_bp.route('/meters', methods=['POST'])
 @jwt_required()
 def create_meter():
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
@@ -756,7 +723,7 @@ def create_meter():
 @admin_bp.route('/complaints', methods=['GET'])
 @jwt_required()
 def get_all_complaints():
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
 
@@ -764,7 +731,7 @@ def get_all_complaints():
         return v.isoformat() if hasattr(v, "isoformat") else v
 
     try:
-        rows = Complaint.query.all()
+        rows = Complaint.query.options(*with_updates()).all()
         out = []
 
         for c in rows:
@@ -822,7 +789,7 @@ def get_all_complaints():
 @admin_bp.route('/complaints/<complaint_id>/update', methods=['POST'])
 @jwt_required()
 def update_complaint(complaint_id):
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
@@ -864,80 +831,38 @@ def update_complaint(complaint_id):
 @admin_bp.route('/gate-register', methods=['GET'])
 @jwt_required()
 def get_gate_register():
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
     try:
-        # Use similar logic to the export function to ensure consistency
-        active_users = User.query.filter(User.status.in_(['active', 'approved'])).all()
+        # Read the materialized gate register (already sorted by street name)
         result = []
         
-        for user in active_users:
-            if user.role == 'admin':
-                continue
-            
-            resident_data = None
-            owner_data = None
-            status = 'Unknown'
-            
-            # Determine user status and get appropriate data
-            if user.resident and user.owner:
-                status = 'Owner-Resident'
-                resident_data = user.resident
-                owner_data = user.owner
-            elif user.resident:
-                status = 'Resident'
-                resident_data = user.resident
-            elif user.owner:
-                status = 'Owner'
-                owner_data = user.owner
-            
-            primary_data = resident_data if resident_data else owner_data
-            
-            if not primary_data:
-                continue
-            
-            # Additional check: Only include residents/owners with active or approved status
-            # For Owner-Residents, check both records are active
-            if resident_data and resident_data.status not in ['active', 'approved']:
-                continue
-            if owner_data and owner_data.status not in ['active', 'approved']:
-                continue
-            
-            # Get vehicle registrations for this user
-            vehicle_registrations = []
-            if resident_data:
-                vehicles = Vehicle.query.filter_by(resident_id=resident_data.id).all()
-                vehicle_registrations = [v.registration_number for v in vehicles]
-            elif owner_data:
-                vehicles = Vehicle.query.filter_by(owner_id=owner_data.id).all()
-                vehicle_registrations = [v.registration_number for v in vehicles]
+        for row in load_gate_register_snapshot():
+            vehicle_registrations = row.vehicle_list()
             
             # Create entry with all user information and their vehicles
             entry = {
-                'user_id': user.id,
-                'resident_status': status,
-                'first_name': primary_data.first_name or '',
-                'last_name': primary_data.last_name or '',
-                'surname': primary_data.last_name or '',  # For compatibility
-                'street_number': primary_data.street_number or '',
-                'street_name': primary_data.street_name or '',
-                'full_address': primary_data.full_address or '',
-                'erf_number': primary_data.erf_number or '',
-                'intercom_code': primary_data.intercom_code or '',
-                'phone_number': primary_data.phone_number or '',
+                'user_id': row.user_id,
+                'resident_status': row.resident_status,
+                'first_name': row.first_name or '',
+                'last_name': row.last_name or '',
+                'surname': row.last_name or '',  # For compatibility
+                'street_number': row.street_number or '',
+                'street_name': row.street_name or '',
+                'full_address': row.full_address or '',
+                'erf_number': row.erf_number or '',
+                'intercom_code': row.intercom_code or '',
+                'phone_number': row.phone_number or '',
                 'vehicle_registrations': vehicle_registrations,
                 'total_vehicles': len(vehicle_registrations),
-                'email': user.email,
-                'sort_key': (primary_data.street_name or '').upper()
+                'email': row.email,
+                'sort_key': row.sort_key
             }
             
             result.append(entry)
         
-        # Sort by street name alphabetically (same as export)
-        result.sort(key=lambda x: x['sort_key'])
-        
         # Calculate total vehicles across all users
         total_vehicles = sum(len(entry['vehicle_registrations']) for entry in result)
         
@@ -954,86 +879,31 @@ def get_gate_register():
 @admin_bp.route('/gate-register/export', methods=['GET'])
 @jwt_required()
 def export_gate_register():
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
     try:
-        # Use the same logic as the gate register API but format for CSV export
-        active_users = User.query.filter_by(status='active').all()
-        gate_entries = []
-        
-        for user in active_users:
-            if user.role == 'admin':
-                continue
-            
-            resident_data = None
-            owner_data = None
-            status = 'Unknown'
-            
-            # Determine user status and get appropriate data
-            if user.resident and user.owner:
-                status = 'Owner-Resident'
-                resident_data = user.resident
-                owner_data = user.owner
-            elif user.resident:
-                status = 'Resident'
-                resident_data = user.resident
-            elif user.owner:
-                status = 'Owner'
-                owner_data = user.owner
-            
-            primary_data = resident_data if resident_data else owner_data
-            
-            if not primary_data:
-                continue
-            
-            # Get vehicle registrations for this user
-            vehicle_registrations = []
-            if resident_data:
-                vehicles = Vehicle.query.filter_by(resident_id=resident_data.id).all()
-                vehicle_registrations = [v.registration_number for v in vehicles]
-            elif owner_data:
-                vehicles = Vehicle.query.filter_by(owner_id=owner_data.id).all()
-                vehicle_registrations = [v.registration_number for v in vehicles]
-            
-            # Handle multiple vehicles - create separate row for each vehicle
-            if vehicle_registrations:
-                for vehicle_reg in vehicle_registrations:
-                    entry = {
-                        'resident_status': status,
-                        'surname': primary_data.last_name or '',
-                        'street_number': str(primary_data.street_number or ''),
-                        'street_name': primary_data.street_name or '',
-                        'vehicle_registration': vehicle_reg,
-                        'erf_number': str(primary_data.erf_number or ''),
-                        'intercom_code': str(primary_data.intercom_code or ''),
-                        'sort_key': (primary_data.street_name or '').upper()
-                    }
-                    gate_entries.append(entry)
-            else:
-                # No vehicles - still include the resident/owner
-                entry = {
-                    'resident_status': status,
-                    'surname': primary_data.last_name or '',
-                    'street_number': str(primary_data.street_number or ''),
-                    'street_name': primary_data.street_name or '',
-                    'vehicle_registration': '',
-                    'erf_number': str(primary_data.erf_number or ''),
-                    'intercom_code': str(primary_data.intercom_code or ''),
-                    'sort_key': (primary_data.street_name or '').upper()
-                }
-                gate_entries.append(entry)
-        
-        # Sort by street name alphabetically
-        gate_entries.sort(key=lambda x: x['sort_key'])
-        
-        # Create CSV content
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow([
+        # Same snapshot as the gate register API, already sorted by street name;
+        # rows are streamed straight from the cursor
+        query = gate_register_snapshot_query(statuses=('active',), active_records_only=False)
+        
+        def generate_rows():
+            for row in query.yield_per(EXPORT_BATCH_SIZE):
+                # Handle multiple vehicles - create separate row for each vehicle
+                # (no vehicles - still include the resident/owner)
+                for vehicle_reg in row.vehicle_list() or ['']:
+                    yield [
+                        row.resident_status,
+                        row.last_name or '',
+                        row.street_number or '',
+                        row.street_name or '',
+                        vehicle_reg,
+                        row.erf_number or '',
+                        row.intercom_code or ''
+                    ]
+        
+        header = [
             'RESIDENT STATUS',
             'SURNAME', 
             'STREET NR',
@@ -1041,37 +911,13 @@ def export_gate_register():
             'VEHICLE REGISTRATION NR',
             'ERF NR',
             'INTERCOM NR'
-        ])
-        
-        # Write data rows
-        for entry in gate_entries:
-            writer.writerow([
-                entry['resident_status'],
-                entry['surname'],
-                entry['street_number'],
-                entry['street_name'],
-                entry['vehicle_registration'],
-                entry['erf_number'],
-                entry['intercom_code']
-            ])
+        ]
         
         # Generate filename with timestamp
         timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
         filename = f'gate_register_{timestamp}.csv'
         
-        # Create response
-        output.seek(0)
-        csv_content = output.getvalue()
-        output.close()
-        
-        return Response(
-            csv_content,
-            mimetype='text/csv',
-            headers={
-                'Content-Disposition': f'attachment; filename={filename}',
-                'Content-Type': 'text/csv; charset=utf-8'
-            }
-        )
+        return csv_download(header, generate_rows(), filename)
         
     except Exception as e:
         return jsonify({'error': f'Failed to export gate register: {str(e)}'}), 500
@@ -1083,7 +929,7 @@ def get_gate_register_changes():
     Get gate register data with change tracking for notification system,
     using SQLAlchemy (Postgres) instead of direct sqlite file access.
     """
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
 
@@ -1121,37 +967,22 @@ def get_gate_register_changes():
         # 3) Build gate-register style rows for only those users
         result = []
 
-        for user_id, user_change_info in changes_by_user.items():
-            user = User.query.get(user_id)
-            if not user or user.role == 'admin':
-                continue
-
-            # decide status + primary record
-            resident_data = user.resident if user.resident else None
-            owner_data = user.owner if user.owner else None
-
-            if resident_data and owner_data:
-                status = 'Owner-Resident'
-            elif resident_data:
-                status = 'Resident'
-            elif owner_data:
-                status = 'Owner'
-            else:
-                # no usable profile, skip
-                continue
+        households = {
+            h['user'].id: h
+            for h in load_gate_households(
+                statuses=None, user_ids=list(changes_by_user.keys()), active_records_only=False
+            )
+        }
 
-            primary = resident_data or owner_data
-            if not primary:
+        for user_id, user_change_info in changes_by_user.items():
+            h = households.get(user_id)
+            if not h:
                 continue
 
-            # Vehicles tied to the correct entity
-            vehicle_regs = []
-            if resident_data:
-                regs = Vehicle.query.filter_by(resident_id=resident_data.id).all()
-                vehicle_regs = [v.registration_number for v in regs]
-            elif owner_data:
-                regs = Vehicle.query.filter_by(owner_id=owner_data.id).all()
-                vehicle_regs = [v.registration_number for v in regs]
+            user = h['user']
+            status = h['status_label']
+            primary = h['primary']
+            vehicle_regs = h['vehicle_registrations']
 
             # Change flags/values
             phone_changed = 'cellphone_number' in user_change_info
@@ -1231,91 +1062,72 @@ def export_gate_register_changes():
     Only users with at least one unreviewed change are included.
     """
     try:
-        current_user = User.query.get(get_jwt_identity())
-        if not current_user or current_user.role != 'admin':
-            return jsonify({'error': 'Admin access required'}), 403
+        admin_check = check_admin()
+        if admin_check:
+            return admin_check
 
-        # gather unreviewed changes by user
         from src.models.user_change import UserChange
-        pending = (UserChange.query
-                   .filter(UserChange.admin_reviewed.is_(False))
-                   .order_by(UserChange.change_timestamp.desc())
-                   .all())
-
-        # group fields changed by user_id
-        changed_by_user = {}
-        for c in pending:
-            changed_by_user.setdefault(c.user_id, set()).add((c.field_name or '').lower())
-
-        rows = []
-        for user_id, fields in changed_by_user.items():
-            u = User.query.get(user_id)
-            if not u:
-                continue
+        pending_query = (db.session.query(UserChange.user_id, UserChange.field_name)
+                         .filter(UserChange.admin_reviewed.is_(False))
+                         .order_by(UserChange.change_timestamp.desc()))
+
+        def generate_html():
+            yield "<html><head><meta charset='utf-8'><title>Gate Register - Changes</title></head><body>"
+
+            # gather unreviewed changes by user (only user_id/field_name are read)
+            changed_by_user = {}
+            pending_count = 0
+            for user_id, field_name in pending_query.yield_per(EXPORT_BATCH_SIZE):
+                changed_by_user.setdefault(user_id, set()).add((field_name or '').lower())
+                pending_count += 1
+
+            households = {
+                h['user'].id: h
+                for h in load_gate_households(
+                    statuses=None, user_ids=list(changed_by_user.keys()),
+                    active_records_only=False, include_admins=True
+                )
+            }
 
-            # Resolve a profile holder (resident preferred)
-            person = u.resident or u.owner
-            if not person:
-                continue
+            yield f"<h2>Gate Register (Pending Changes: {pending_count})</h2>"
+            yield "<table border='1' cellpadding='6' cellspacing='0'>"
+            yield "<tr><th>NAME</th><th>STREET NR</th><th>STREET NAME</th><th>VEHICLE REGISTRATION</th><th>ERF</th><th>INTERCOM</th></tr>"
 
-            # vehicles list from either resident or owner
-            if u.resident:
-                vehicles = Vehicle.query.filter_by(resident_id=u.resident.id).all()
-            elif u.owner:
-                vehicles = Vehicle.query.filter_by(owner_id=u.owner.id).all()
-            else:
-                vehicles = []
-
-            # flags
-            phone_changed = 'cellphone_number' in fields or 'phone_number' in fields
-            vehicle_changed = 'vehicle_registration' in fields or 'vehicle_registration_2' in fields
-
-            # One row per vehicle (or a blank row if none)
-            if vehicles:
-                for v in vehicles:
-                    rows.append({
-                        'name': f"{(person.first_name or '').strip()} {(person.last_name or '').strip()}",
-                        'street_number': person.street_number or '',
-                        'street_name': person.street_name or '',
-                        'vehicle': v.registration_number or '',
-                        'erf': person.erf_number or '',
-                        'intercom': getattr(person, 'intercom_code', '') or '',
-                        'phone_changed': phone_changed,
-                        'vehicle_changed': vehicle_changed
-                    })
-            else:
-                rows.append({
-                    'name': f"{(person.first_name or '').strip()} {(person.last_name or '').strip()}",
-                    'street_number': person.street_number or '',
-                    'street_name': person.street_name or '',
-                    'vehicle': '',
-                    'erf': person.erf_number or '',
-                    'intercom': getattr(person, 'intercom_code', '') or '',
-                    'phone_changed': phone_changed,
-                    'vehicle_changed': vehicle_changed
-                })
+            for user_id, fields in changed_by_user.items():
+                h = households.get(user_id)
+                if not h:
+                    continue
 
-        # Build a trivial HTML table
-        html = ["<html><head><meta charset='utf-8'><title>Gate Register - Changes</title></head><body>"]
-        html.append(f"<h2>Gate Register (Pending Changes: {len(pending)})</h2>")
-        html.append("<table border='1' cellpadding='6' cellspacing='0'>")
-        html.append("<tr><th>NAME</th><th>STREET NR</th><th>STREET NAME</th><th>VEHICLE REGISTRATION</th><th>ERF</th><th>INTERCOM</th></tr>")
-        for r in rows:
-            name_html = f"<span style='color:red;font-weight:bold'>{r['name']}</span>" if r['phone_changed'] else r['name']
-            veh_html = f"<span style='color:red;font-weight:bold'>{r['vehicle']}</span>" if r['vehicle_changed'] else r['vehicle']
-            html.append(
-                f"<tr><td>{name_html}</td><td>{r['street_number']}</td><td>{r['street_name']}</td><td>{veh_html}</td><td>{r['erf']}</td><td>{r['intercom']}</td></tr>"
-            )
-        html.append("</table>")
-        html.append("</body></html>")
-        return html[0] + ''.join(html[1:])
+                # Resolve a profile holder (resident preferred)
+                person = h['primary']
+                name = f"{(person.first_name or '').strip()} {(person.last_name or '').strip()}"
+
+                # flags
+                phone_changed = 'cellphone_number' in fields or 'phone_number' in fields
+                vehicle_changed = 'vehicle_registration' in fields or 'vehicle_registration_2' in fields
+
+                name_html = f"<span style='color:red;font-weight:bold'>{name}</span>" if phone_changed else name
+
+                # One row per vehicle (or a blank row if none)
+                for reg in h['vehicle_registrations'] or ['']:
+                    reg = reg or ''
+                    veh_html = f"<span style='color:red;font-weight:bold'>{reg}</span>" if vehicle_changed else reg
+                    yield (
+                        f"<tr><td>{name_html}</td><td>{person.street_number or ''}</td><td>{person.street_name or ''}</td>"
+                        f"<td>{veh_html}</td><td>{person.erf_number or ''}</td><td>{getattr(person, 'intercom_code', '') or ''}</td></tr>"
+                    )
+
+            yield "</table>"
+            yield "</body></html>"
+
+        return Response(stream_with_context(generate_html()), mimetype='text/html')
 
     except Exception as e:
         return jsonify({'error': f'Failed to export changes: {str(e)}'}), 500
 @admin_bp.route('/communication/emails', methods=['GET'])
 @jwt_required()
 def get_resident_emails():
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
@@ -1336,9 +1148,9 @@ def mark_change_processed(change_id):
     so we join the first 5 dash-separated segments as the UUID and treat the rest as the field name.
     """
     try:
-        current_user = User.query.get(get_jwt_identity())
-        if not current_user or current_user.role != 'admin':
-            return jsonify({'error': 'Admin access required'}), 403
+        admin_check = check_admin()
+        if admin_check:
+            return admin_check
 
         parts = (change_id or '').split('-')
         if len(parts) < 6:
@@ -1359,6 +1171,7 @@ def mark_change_processed(change_id):
 
         change.admin_reviewed = True
         db.session.commit()
+        invalidate_change_stats()
 
         return jsonify({'success': True, 'message': 'Change marked as processed', 'id': change.id}), 200
 
@@ -1371,7 +1184,7 @@ def mark_change_processed(change_id):
 @admin_bp.route('/communication/phones', methods=['GET'])
 @jwt_required()
 def get_resident_phones():
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
@@ -1387,13 +1200,13 @@ def get_resident_phones():
 @admin_bp.route('/email-status', methods=['GET'])
 @jwt_required()
 def get_email_status():
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
     try:
         # Get all users with email status
-        users = User.query.all()
+        users = User.query.options(*with_household()).all()
         result = []
         
         for user in users:
@@ -1423,13 +1236,13 @@ def get_email_status():
 @jwt_required()
 def get_residents_group():
     """Get all users who are residents (including owner-residents)"""
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
     try:
         # Get all users with resident records
-        users = User.query.join(Resident).filter(User.status == 'active').all()
+        users = User.query.options(*with_household()).join(Resident).filter(User.status == 'active').all()
         result = []
         
         for user in users:
@@ -1442,7 +1255,7 @@ def get_residents_group():
                 'is_owner': user.is_owner(),
                 'is_owner_resident': user.is_owner_resident(),
                 'erf_number': user.resident.erf_number if user.resident else None,
-                'address': user.resident.address if user.resident else None
+                'address': user.resident.display_address if user.resident else None
             }
             result.append(group_data)
         
@@ -1460,13 +1273,13 @@ def get_residents_group():
 @jwt_required()
 def get_owners_group():
     """Get all users who are owners (including owner-residents)"""
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
     try:
         # Get all users with owner records
-        users = User.query.join(Owner).filter(User.status == 'active').all()
+        users = User.query.options(*with_household()).join(Owner).filter(User.status == 'active').all()
         result = []
         
         for user in users:
@@ -1479,8 +1292,8 @@ def get_owners_group():
                 'is_owner': True,
                 'is_owner_resident': user.is_owner_resident(),
                 'erf_number': user.owner.erf_number if user.owner else None,
-                'address': user.owner.address if user.owner else None,
-                'postal_address': user.owner.postal_address if user.owner else None
+                'address': user.owner.display_address if user.owner else None,
+                'postal_address': user.owner.display_postal_address if user.owner else None
             }
             result.append(group_data)
         
@@ -1498,13 +1311,13 @@ def get_owners_group():
 @jwt_required()
 def get_non_resident_owners():
     """Get all users who are owners but not residents"""
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
     try:
         # Get users who have owner record but no resident record
-        users = User.query.join(Owner).outerjoin(Resident).filter(
+        users = User.query.options(*with_household()).join(Owner).outerjoin(Resident).filter(
             User.status == 'active',
             Resident.id == None  # No resident record
         ).all()
@@ -1520,8 +1333,8 @@ def get_non_resident_owners():
                 'is_owner': True,
                 'is_owner_resident': False,
                 'erf_number': user.owner.erf_number if user.owner else None,
-                'address': user.owner.address if user.owner else None,
-                'postal_address': user.owner.postal_address if user.owner else None
+                'address': user.owner.display_address if user.owner else None,
+                'postal_address': user.owner.display_postal_address if user.owner else None
             }
             result.append(group_data)
         
@@ -1539,13 +1352,13 @@ def get_non_resident_owners():
 @jwt_required()
 def get_owner_residents():
     """Get all users who are both owners and residents"""
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
     try:
         # Get users who have both owner and resident records
-        users = User.query.join(Owner).join(Resident).filter(User.status == 'active').all()
+        users = User.query.options(*with_household()).join(Owner).join(Resident).filter(User.status == 'active').all()
         result = []
         
         for user in users:
@@ -1558,8 +1371,8 @@ def get_owner_residents():
                 'is_owner': True,
                 'is_owner_resident': True,
                 'erf_number': user.resident.erf_number if user.resident else None,
-                'address': user.resident.address if user.resident else None,
-                'postal_address': user.owner.postal_address if user.owner else None
+                'address': user.resident.display_address if user.resident else None,
+                'postal_address': user.owner.display_postal_address if user.owner else None
             }
             result.append(group_data)
         
@@ -1667,12 +1480,12 @@ def get_gate_access_register():
 @jwt_required()
 def get_resident_vehicles(user_id):
     """Get vehicles for a specific user (admin access) - supports both residents and owners"""
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
     try:
-        user = User.query.get_or_404(user_id)
+        user = User.query.options(*with_vehicles()).filter_by(id=user_id).first_or_404()
         
         # Check if we should filter by specific ERF (for edit dialogs)
         filter_by_erf = request.args.get('filter_by_erf', 'false').lower() == 'true'
@@ -1683,7 +1496,7 @@ def get_resident_vehicles(user_id):
         if filter_by_erf:
             # Only return vehicles for THIS specific user's ERF (for edit dialog)
             if user.resident:
-                resident_vehicles = Vehicle.query.filter_by(resident_id=user.resident.id).all()
+                resident_vehicles = user.resident.vehicles
                 for vehicle in resident_vehicles:
                     vehicle_dict = vehicle.to_dict()
                     vehicle_dict['erf_number'] = user.resident.erf_number
@@ -1692,7 +1505,7 @@ def get_resident_vehicles(user_id):
                     vehicles.append(vehicle_dict)
             
             if user.owner and not user.resident:  # Only if not already a resident
-                owner_vehicles = Vehicle.query.filter_by(owner_id=user.owner.id).all()
+                owner_vehicles = user.owner.vehicles
                 for vehicle in owner_vehicles:
                     vehicle_dict = vehicle.to_dict()
                     vehicle_dict['erf_number'] = user.owner.erf_number
@@ -1701,12 +1514,12 @@ def get_resident_vehicles(user_id):
                     vehicles.append(vehicle_dict)
         else:
             # Return all vehicles for users with same email (multi-ERF support for comprehensive view)
-            all_user_accounts = User.query.filter_by(email=user.email).all()
+            all_user_accounts = User.accounts_for_email(user.email).options(*with_vehicles()).all()
             
             for user_account in all_user_accounts:
                 # Get vehicles from resident data
                 if user_account.resident:
-                    resident_vehicles = Vehicle.query.filter_by(resident_id=user_account.resident.id).all()
+                    resident_vehicles = user_account.resident.vehicles
                     for vehicle in resident_vehicles:
                         if vehicle.id not in seen_vehicle_ids:
                             vehicle_dict = vehicle.to_dict()
@@ -1719,7 +1532,7 @@ def get_resident_vehicles(user_id):
                 
                 # Get vehicles from owner data (for users who have owner records)
                 if user_account.owner:
-                    owner_vehicles = Vehicle.query.filter_by(owner_id=user_account.owner.id).all()
+                    owner_vehicles = user_account.owner.vehicles
                     for vehicle in owner_vehicles:
                         if vehicle.id not in seen_vehicle_ids:
                             vehicle_dict = vehicle.to_dict()
@@ -1739,7 +1552,7 @@ def get_resident_vehicles(user_id):
 @jwt_required()
 def add_resident_vehicle(user_id):
     """Add a vehicle for a specific user (admin access) - supports both residents and owners"""
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
@@ -1753,11 +1566,11 @@ def add_resident_vehicle(user_id):
         data = request.get_json()
         
         # Validate required fields
-        if not data.get('registration_number'):
+        if not normalize_plate(data.get('registration_number')):
             return jsonify({'error': 'Registration number is required'}), 400
         
-        # Check if registration number already exists
-        existing_vehicle = Vehicle.query.filter_by(registration_number=data['registration_number']).first()
+        # Check if registration number already exists (ignoring case, spaces and dashes)
+        existing_vehicle = Vehicle.by_plate(data['registration_number']).first()
         if existing_vehicle:
             return jsonify({'error': 'Vehicle with this registration number already exists'}), 400
         
@@ -1787,26 +1600,27 @@ def add_resident_vehicle(user_id):
                 user_name = user.email
                 erf_number = 'Unknown'
             
-            # Log the new vehicle addition by admin
-            log_user_change(
-                user.id, 
-                user_name, 
-                erf_number, 
-                'admin_add', 
-                'vehicle_registration', 
-                'None', 
-                data['registration_number']
-            )
+            with change_log_batch(commit=True):
+                # Log the new vehicle addition by admin
+                log_user_change(
+                    user.id, 
+                    user_name, 
+                    erf_number, 
+                    'admin_add', 
+                    'vehicle_registration', 
+                    'None', 
+                    data['registration_number']
+                )
             
-            # Also log other vehicle details if provided
-            if data.get('make'):
-                log_user_change(user.id, user_name, erf_number, 'admin_add', 'vehicle_make', 'None', data['make'])
+                # Also log other vehicle details if provided
+                if data.get('make'):
+                    log_user_change(user.id, user_name, erf_number, 'admin_add', 'vehicle_make', 'None', data['make'])
             
-            if data.get('model'):
-                log_user_change(user.id, user_name, erf_number, 'admin_add', 'vehicle_model', 'None', data['model'])
+                if data.get('model'):
+                    log_user_change(user.id, user_name, erf_number, 'admin_add', 'vehicle_model', 'None', data['model'])
             
-            if data.get('color'):
-                log_user_change(user.id, user_name, erf_number, 'admin_add', 'vehicle_color', 'None', data['color'])
+                if data.get('color'):
+                    log_user_change(user.id, user_name, erf_number, 'admin_add', 'vehicle_color', 'None', data['color'])
                 
         except Exception as log_error:
             print(f"Error logging admin vehicle addition: {log_error}")
@@ -1824,7 +1638,7 @@ def add_resident_vehicle(user_id):
 @jwt_required()
 def update_resident_vehicle(user_id, vehicle_id):
     """Update a vehicle for a specific user (admin access) - supports both residents and owners"""
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
@@ -1844,8 +1658,10 @@ def update_resident_vehicle(user_id, vehicle_id):
         data = request.get_json()
         
         # Check if new registration number conflicts with existing vehicles
+        if 'registration_number' in data and not normalize_plate(data['registration_number']):
+            return jsonify({'error': 'Registration number cannot be empty'}), 400
         if data.get('registration_number') and data['registration_number'] != vehicle.registration_number:
-            existing_vehicle = Vehicle.query.filter_by(registration_number=data['registration_number']).first()
+            existing_vehicle = Vehicle.by_plate(data['registration_number']).filter(Vehicle.id != vehicle.id).first()
             if existing_vehicle:
                 return jsonify({'error': 'Vehicle with this registration number already exists'}), 400
         
@@ -1855,8 +1671,9 @@ def update_resident_vehicle(user_id, vehicle_id):
         old_model = vehicle.model
         old_color = vehicle.color
         
-        # Update vehicle fields
-        if 'registration_number' in data:
+        # Update vehicle fields (an unchanged plate is not re-assigned: that would
+        # re-derive plate_normalized and clash for legacy duplicates left without one)
+        if 'registration_number' in data and data['registration_number'] != old_registration:
             vehicle.registration_number = data['registration_number']
         if 'make' in data:
             vehicle.make = data['make']
@@ -1878,19 +1695,20 @@ def update_resident_vehicle(user_id, vehicle_id):
                 user_name = user.email
                 erf_number = 'Unknown'
             
-            # Log vehicle registration changes (critical field)
-            if 'registration_number' in data and data['registration_number'] != old_registration:
-                log_user_change(user.id, user_name, erf_number, 'admin_update', 'vehicle_registration', old_registration, data['registration_number'])
+            with change_log_batch():
+                # Log vehicle registration changes (critical field)
+                if 'registration_number' in data and data['registration_number'] != old_registration:
+                    log_user_change(user.id, user_name, erf_number, 'admin_update', 'vehicle_registration', old_registration, data['registration_number'])
             
-            # Log other vehicle changes
-            if 'make' in data and data['make'] != old_make:
-                log_user_change(user.id, user_name, erf_number, 'admin_update', 'vehicle_make', old_make, data['make'])
+                # Log other vehicle changes
+                if 'make' in data and data['make'] != old_make:
+                    log_user_change(user.id, user_name, erf_number, 'admin_update', 'vehicle_make', old_make, data['make'])
             
-            if 'model' in data and data['model'] != old_model:
-                log_user_change(user.id, user_name, erf_number, 'admin_update', 'vehicle_model', old_model, data['model'])
+                if 'model' in data and data['model'] != old_model:
+                    log_user_change(user.id, user_name, erf_number, 'admin_update', 'vehicle_model', old_model, data['model'])
             
-            if 'color' in data and data['color'] != old_color:
-                log_user_change(user.id, user_name, erf_number, 'admin_update', 'vehicle_color', old_color, data['color'])
+                if 'color' in data and data['color'] != old_color:
+                    log_user_change(user.id, user_name, erf_number, 'admin_update', 'vehicle_color', old_color, data['color'])
                 
         except Exception as log_error:
             print(f"Error logging admin vehicle change: {log_error}")
@@ -1911,7 +1729,7 @@ def update_resident_vehicle(user_id, vehicle_id):
 @jwt_required()
 def delete_resident_vehicle(user_id, vehicle_id):
     """Delete a vehicle for a specific user (admin access) - supports both residents and owners"""
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
@@ -1929,6 +1747,7 @@ def delete_resident_vehicle(user_id, vehicle_id):
             return jsonify({'error': 'Vehicle not found'}), 404
         
         db.session.delete(vehicle)
+        mark_gate_register_dirty(user.id)
         db.session.commit()
         
         return jsonify({'message': 'Vehicle deleted successfully'}), 200
@@ -1937,6 +1756,85 @@ def delete_resident_vehicle(user_id, vehicle_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@admin_bp.route('/vehicles/lookup/<plate>', methods=['GET'])
+@jwt_required()
+def lookup_vehicle_by_plate(plate):
+    """Owning household of a plate for gate checks ('CA 123-456', 'ca123456', ... all match)"""
+    admin_check = check_admin()
+    if admin_check:
+        return admin_check
+    
+    try:
+        normalized = normalize_plate(plate)
+        if not normalized:
+            return jsonify({'error': 'Plate must contain letters or digits'}), 400
+        
+        # One indexed query: vehicle by plate, then its resident/owner record and account
+        row = (
+            db.session.query(Vehicle, Resident, Owner, User)
+            .outerjoin(Resident, Resident.id == Vehicle.resident_id)
+            .outerjoin(Owner, Owner.id == Vehicle.owner_id)
+            .outerjoin(User, User.id == db.func.coalesce(Resident.user_id, Owner.user_id))
+            .options(*with_household())
+            .filter(Vehicle.plate_normalized == normalized)
+            .first()
+        )
+        if row is None:
+            return jsonify({'error': 'No vehicle registered with this plate', 'plate': normalized}), 404
+        
+        vehicle, resident, owner, user = row
+        record = resident or owner
+        household = None
+        if record:
+            household = {
+                'user_id': user.id if user else record.user_id,
+                'email': user.email if user else None,
+                'user_status': user.status if user else None,
+                'type': 'resident' if resident else 'owner',
+                'first_name': record.first_name,
+                'last_name': record.last_name,
+                'erf_number': record.erf_number,
+                'street_number': record.street_number,
+                'street_name': record.street_name,
+                'full_address': record.full_address,
+                'phone_number': record.phone_number,
+                'intercom_code': record.intercom_code,
+                'status': record.status,
+            }
+        
+        # same rule as the gate register: an active/approved account whose
+        # resident/owner records are all active (and the vehicle itself active)
+        access_allowed = bool(
+            household and user
+            and user.status in ACTIVE_STATUSES
+            and all(is_active_status(rec) for rec in (user.resident, user.owner) if rec)
+            and is_active_status(vehicle)
+        )
+        
+        return jsonify({
+            'plate': normalized,
+            'vehicle': vehicle.to_dict(),
+            'household': household,
+            'access_allowed': access_allowed,
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/vehicles/duplicate-plates', methods=['GET'])
+@jwt_required()
+def get_duplicate_vehicle_plates():
+    """Legacy vehicles sharing a plate with another vehicle (left out of plate lookups until resolved)"""
+    admin_check = check_admin()
+    if admin_check:
+        return admin_check
+    
+    try:
+        duplicates = duplicate_vehicle_plates()
+        return jsonify({'duplicates': duplicates, 'count': len(duplicates)}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @admin_bp.route('/system-status', methods=['GET'])
 def get_system_status():
     """Health check endpoint for Render deployment"""
@@ -1958,12 +1856,56 @@ def get_system_status():
             'timestamp': datetime.now().isoformat()
         }), 500
 
+@admin_bp.route('/search', methods=['GET'])
+@jwt_required()
+def search_households_endpoint():
+    """Ranked fuzzy search over names, ERFs, addresses, phones and plates (?q=...&limit=20)"""
+    admin_check = check_admin()
+    if admin_check:
+        return admin_check
+    
+    try:
+        q = request.args.get('q', '').strip()
+        limit = request.args.get('limit', SEARCH_DEFAULT_LIMIT, type=int) or SEARCH_DEFAULT_LIMIT
+        limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+        
+        started = time.perf_counter()
+        hits, backend = search_households(q, limit=limit)
+        
+        return jsonify({
+            'query': q,
+            'results': hits,
+            'count': len(hits),
+            'backend': backend,
+            'took_ms': round((time.perf_counter() - started) * 1000, 1)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/metrics', methods=['GET'])
+@jwt_required()
+def get_request_metrics():
+    """Per-route latency / SQL percentiles for this worker process (?reset=true clears them)"""
+    admin_check = check_admin()
+    if admin_check:
+        return admin_check
+    
+    try:
+        snapshot = metrics_snapshot()
+        if request.args.get('reset', 'false').lower() == 'true':
+            reset_metrics()
+        return jsonify(snapshot), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # ERF Address Mapping Routes
 @admin_bp.route('/address-mappings', methods=['GET'])
 @jwt_required()
 def get_address_mappings():
     """Get all ERF address mappings"""
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
@@ -1982,7 +1924,7 @@ def get_address_mappings():
 @jwt_required()
 def upload_address_mappings():
     """Upload and process ERF address mappings from CSV file"""
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
@@ -1999,24 +1941,22 @@ def upload_address_mappings():
             return jsonify({'error': 'File must be CSV or Excel format'}), 400
         
         current_user_id = get_jwt_identity()
+        mode = (request.form.get('mode') or request.args.get('mode') or 'replace').lower()
         
-        # Read file content
+        # Read file content (records are consumed lazily by the import pipeline)
         try:
             if file.filename.lower().endswith('.csv'):
-                # Read CSV file using built-in csv module
-                content = file.read().decode('utf-8')
-                import csv
-                reader = csv.DictReader(io.StringIO(content))
-                data = list(reader)
+                columns, records = read_csv_upload(file.stream)
             else:
-                # Read Excel file (requires pandas)
+                # Read Excel file row by row (openpyxl); pandas only for the opt-in legacy reader
+                legacy = current_app.config.get("ADDRESS_IMPORT_PANDAS_EXCEL")
                 try:
-                    import pandas as pd
-                    df = pd.read_excel(file)
-                    data = df.to_dict('records')
+                    reader = read_xlsx_upload_pandas if legacy else read_xlsx_upload
+                    columns, records = reader(file.stream)
                 except ImportError as e:
+                    missing = 'pandas and openpyxl' if legacy else 'openpyxl'
                     return jsonify({
-                        'error': f'pandas and openpyxl libraries are required for Excel file processing. ImportError: {str(e)}. Please install them with: pip install pandas openpyxl'
+                        'error': f'{missing} is required for Excel file processing. ImportError: {str(e)}. Please install it with: pip install {missing.replace(" and ", " ")}'
                     }), 500
                 except Exception as e:
                     return jsonify({
@@ -2025,87 +1965,28 @@ def upload_address_mappings():
         except Exception as e:
             return jsonify({'error': f'Failed to read file: {str(e)}'}), 400
         
-        # Validate required columns
-        required_columns = ['erf_number', 'street_number', 'street_name']
-        if data:
-            first_row = data[0]
-            missing_columns = [col for col in required_columns if col not in first_row.keys()]
-            
-            if missing_columns:
-                return jsonify({
-                    'error': f'Missing required columns: {", ".join(missing_columns)}',
-                    'required_columns': required_columns,
-                    'found_columns': list(first_row.keys())
-                }), 400
-        
-        # Process and validate data
-        address_data = []
-        errors = []
-        
-        for index, row in enumerate(data):
-            try:
-                erf_number = str(row['erf_number']).strip()
-                street_number = str(row['street_number']).strip()
-                street_name = str(row['street_name']).strip()
-                
-                # Validate required fields
-                if not erf_number or erf_number.lower() in ['nan', 'none', '']:
-                    errors.append(f"Row {index + 2}: ERF number is required")
-                    continue
-                
-                if not street_number or street_number.lower() in ['nan', 'none', '']:
-                    errors.append(f"Row {index + 2}: Street number is required")
-                    continue
-                
-                if not street_name or street_name.lower() in ['nan', 'none', '']:
-                    errors.append(f"Row {index + 2}: Street name is required")
-                    continue
-                
-                # Create full address
-                full_address = f"{street_number} {street_name}"
-                
-                # Optional fields
-                suburb = str(row.get('suburb', '')).strip() if 'suburb' in row and row.get('suburb') not in [None, '', 'nan', 'NaN'] else ''
-                postal_code = str(row.get('postal_code', '')).strip() if 'postal_code' in row and row.get('postal_code') not in [None, '', 'nan', 'NaN'] else ''
-                
-                if suburb:
-                    full_address += f", {suburb}"
-                if postal_code:
-                    full_address += f", {postal_code}"
-                
-                address_data.append({
-                    'erf_number': erf_number,
-                    'street_number': street_number,
-                    'street_name': street_name,
-                    'full_address': full_address,
-                    'suburb': suburb,
-                    'postal_code': postal_code
-                })
-                
-            except Exception as e:
-                errors.append(f"Row {index + 2}: {str(e)}")
-        
-        if errors:
-            return jsonify({
-                'error': 'Data validation failed',
-                'errors': errors[:10],  # Limit to first 10 errors
-                'total_errors': len(errors)
-            }), 400
-        
-        if not address_data:
-            return jsonify({'error': 'No valid data found in file'}), 400
-        
-        # Import data
-        success, message = ErfAddressMapping.bulk_import_addresses(address_data, current_user_id)
+        # Validate and import in one transaction (nothing changes if any row is invalid)
+        try:
+            counts = import_address_records(columns, records, current_user_id, mode=mode, numbered=True)
+        except AddressImportError as e:
+            return jsonify(e.payload), 400
+        except UnicodeDecodeError as e:
+            return jsonify({'error': f'Failed to read file: {str(e)}'}), 400
+        except Exception as e:
+            return jsonify({'error': f'Import failed: {str(e)}'}), 500
+        finally:
+            # also when the header is rejected before any row is read
+            close_upload_records(records)
         
-        if success:
-            return jsonify({
-                'success': True,
-                'message': message,
-                'imported_count': len(address_data)
-            }), 200
-        else:
-            return jsonify({'error': message}), 500
+        return jsonify({
+            'success': True,
+            'message': f"Successfully imported {counts['total']} address mappings",
+            'imported_count': counts['total'],
+            'mode': mode,
+            'inserted': counts['inserted'],
+            'updated': counts['updated'],
+            'unchanged': counts['unchanged'],
+        }), 200
             
     except Exception as e:
         return jsonify({'error': f'Upload failed: {str(e)}'}), 500
@@ -2115,13 +1996,16 @@ def upload_address_mappings():
 def lookup_address_by_erf(erf_number):
     """Get address details for a specific ERF number"""
     try:
-        address_data = ErfAddressMapping.get_address_by_erf(erf_number)
+        address_data = lookup_erf_address(erf_number)
         
         if address_data:
-            return jsonify({
+            response = jsonify({
                 'success': True,
                 'data': address_data
-            }), 200
+            })
+            response.headers['Cache-Control'] = f'private, max-age={ERF_CACHE_SECONDS}'
+            response.add_etag()
+            return response.make_conditional(request)
         else:
             return jsonify({
                 'success': False,
@@ -2135,7 +2019,7 @@ def lookup_address_by_erf(erf_number):
 @jwt_required()
 def download_address_template():
     """Download CSV template for address mappings"""
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
@@ -2197,53 +2081,36 @@ def download_address_template():
 @jwt_required()
 def export_address_mappings():
     """Export all current address mappings to CSV"""
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
     try:
-        # Get all current address mappings
-        mappings = ErfAddressMapping.query.order_by(ErfAddressMapping.erf_number).all()
-        
-        # Create CSV output
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow([
+        # Stream current address mappings from the cursor
+        query = ErfAddressMapping.query.order_by(ErfAddressMapping.erf_number)
+        
+        def generate_rows():
+            for mapping in query.yield_per(EXPORT_BATCH_SIZE):
+                yield [
+                    mapping.erf_number,
+                    mapping.street_number,
+                    mapping.street_name,
+                    mapping.suburb or '',
+                    mapping.postal_code or ''
+                ]
+        
+        header = [
             'erf_number',
             'street_number', 
             'street_name',
             'suburb',
             'postal_code'
-        ])
-        
-        # Write current data
-        for mapping in mappings:
-            writer.writerow([
-                mapping.erf_number,
-                mapping.street_number,
-                mapping.street_name,
-                mapping.suburb or '',
-                mapping.postal_code or ''
-            ])
-        
-        # Generate response
-        output.seek(0)
-        csv_content = output.getvalue()
-        output.close()
+        ]
         
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f'address_mappings_backup_{timestamp}.csv'
         
-        return Response(
-            csv_content,
-            mimetype='text/csv',
-            headers={
-                'Content-Disposition': f'attachment; filename={filename}',
-                'Content-Type': 'text/csv; charset=utf-8'
-            }
-        )
+        return csv_download(header, generate_rows(), filename)
         
     except Exception as e:
         return jsonify({'error': f'Failed to export address mappings: {str(e)}'}), 500
@@ -2252,7 +2119,7 @@ def export_address_mappings():
 @jwt_required()
 def delete_address_mapping(mapping_id):
     """Delete a specific address mapping"""
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
@@ -2263,6 +2130,7 @@ def delete_address_mapping(mapping_id):
         
         db.session.delete(mapping)
         db.session.commit()
+        bump_erf_address_version()
         
         return jsonify({'message': 'Address mapping deleted successfully'}), 200
         
@@ -2274,7 +2142,7 @@ def delete_address_mapping(mapping_id):
 @jwt_required()
 def clear_all_address_mappings():
     """Clear all address mappings"""
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
@@ -2282,6 +2150,7 @@ def clear_all_address_mappings():
         count = ErfAddressMapping.query.count()
         ErfAddressMapping.query.delete()
         db.session.commit()
+        bump_erf_address_version()
         
         return jsonify({
             'message': f'Successfully cleared {count} address mappings'
@@ -2299,7 +2168,7 @@ def permanently_delete_user(user_id):
     This is for cases where users were incorrectly approved or registered by mistake.
     WARNING: This is a PERMANENT deletion that cannot be undone!
     """
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
@@ -2391,7 +2260,7 @@ def permanently_delete_user(user_id):
 @jwt_required()
 def get_deletion_logs():
     """Get recent user deletion logs for audit purposes"""
-    admin_check = admin_required()
+    admin_check = check_admin()
     if admin_check:
         return admin_check
     
@@ -1,14 +1,19 @@
 # src/routes/admin_notifications.py
 # Admin Notifications Route - Track Critical User Updates (SQLAlchemy version)
 
-from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from functools import wraps
-from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app, g, has_app_context
+import base64
+import json
+import threading
+import time
+from datetime import datetime, timedelta
 from typing import Optional
 
-from sqlalchemy import case, desc
+from sqlalchemy import and_, case, event, or_
+from sqlalchemy.orm import Session
 from src.models.user import db, User, Resident, Owner  # include Resident/Owner to resolve ERF
+from src.utils.gate_register import mark_gate_register_dirty
+from src.utils.auth import admin_required
 # IMPORTANT: do NOT import UserChange at module import time; we lazy-import inside functions
 # from src.models.user_change import UserChange
 # --- PATCH A: add once near the top ---
@@ -47,37 +52,6 @@ def normalize_field_name(name: str) -> str:
 admin_notifications = Blueprint("admin_notifications", __name__)
 
 # ---------------------------- helpers ---------------------------------
-def admin_required(f):
-    @wraps(f)
-    @jwt_required()
-    def decorated(*args, **kwargs):
-        uid = get_jwt_identity()
-        u = User.query.get(uid)
-        if not u or u.role != "admin":
-            return jsonify({"error": "Admin access required"}), 403
-        return f(*args, **kwargs)
-    return decorated
-
-
-def _resolve_erf_for_user(user_id: str) -> Optional[str]:
-    """
-    Best-effort ERF resolver if a change comes in without an explicit erf_number.
-    Looks on the user's Resident first, then Owner.
-    """
-    try:
-        user = User.query.get(user_id)
-        if not user:
-            return None
-        # Prefer resident ERF if present
-        if getattr(user, "resident", None) and getattr(user.resident, "erf_number", None):
-            return user.resident.erf_number
-        if getattr(user, "owner", None) and getattr(user.owner, "erf_number", None):
-            return user.owner.erf_number
-    except Exception:
-        pass
-    return None
-
-
 def serialize_change(c) -> dict:
     # Works whether c is a model instance that *has* erf_number or not
     erf = getattr(c, "erf_number", None)
@@ -96,117 +70,359 @@ def serialize_change(c) -> dict:
     }
 
 
-# Keep the signature used by admin.py, but now store erf_number too
-def log_user_change(user_id, user_name, erf_number, change_type, field_name, old_value, new_value):
+def _serialize_changes(rows) -> list:
     """
-    Safe, lazy logging of a single change.
-    We import the model *inside* the function so the module can import even if
-    migrations/tables aren’t ready yet (prevents a no-op fallback).
+    Serialize a page of changes. Rows that predate the erf_number column get
+    their ERF filled in with one lookup for the whole page (not persisted;
+    `flask backfill-change-erfs` fixes them for good).
     """
+    missing = {r.user_id for r in rows if not getattr(r, "erf_number", None)}
+    erfs = _resolve_erfs(missing) if missing else {}
+    out = []
+    for r in rows:
+        data = serialize_change(r)
+        if not data["erf_number"]:
+            data["erf_number"] = data["erf"] = erfs.get(r.user_id)
+        out.append(data)
+    return out
+
+
+# ---------------------------- keyset paging ----------------------------
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _encode_cursor(segment: str, row=None) -> str:
+    payload = [segment, row.change_timestamp.isoformat(), row.id] if row is not None else [segment]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def _decode_cursor(cursor: Optional[str]):
+    """(segment, (timestamp, id) or None); raises ValueError on a malformed cursor."""
     try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        segment = str(payload[0])
+        if len(payload) == 1:
+            return segment, None
+        return segment, (datetime.fromisoformat(payload[1]), int(payload[2]))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _page_size() -> int:
+    per_page = request.args.get("per_page", DEFAULT_PAGE_SIZE, type=int) or DEFAULT_PAGE_SIZE
+    return max(1, min(per_page, MAX_PAGE_SIZE))
+
+
+def _non_critical(UserChange):
+    """Rows outside CRITICAL_FIELDS (a NULL field_name counts as non-critical, as in the stats)."""
+    return or_(~UserChange.field_name.in_(CRITICAL_FIELDS), UserChange.field_name.is_(None))
+
+
+def _keyset_page(q, after, limit):
+    """
+    Next `limit` rows of q (newest first) strictly after the (timestamp, id)
+    position `after`. Returns (rows, has_more).
+    """
+    from src.models.user_change import UserChange
+
+    if after is not None:
+        ts, change_id = after
+        q = q.filter(or_(
+            UserChange.change_timestamp < ts,
+            and_(UserChange.change_timestamp == ts, UserChange.id < change_id),
+        ))
+    rows = (
+        q.order_by(UserChange.change_timestamp.desc(), UserChange.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    return rows[:limit], len(rows) > limit
+
+
+def _offset_page(q, order_by, per_page):
+    """
+    ?page=N, for clients that predate the cursors: the old OFFSET page with
+    exact totals from q itself. Returns (rows, pagination dict).
+    """
+    page = max(request.args.get("page", 1, type=int) or 1, 1)
+    total = q.count()
+    rows = q.order_by(*order_by).limit(per_page).offset((page - 1) * per_page).all()
+    total_pages = (total + per_page - 1) // per_page
+    return rows, {
+        "page": page,
+        "per_page": per_page,
+        "next_cursor": None,
+        "has_next": page < total_pages,
+        "has_prev": page > 1,
+        "total_count": total,
+        "total_pages": total_pages,
+        "total_is_estimate": False,
+    }
+
+
+def _resolve_erfs(user_ids) -> dict:
+    """
+    ERF per user id for changes logged without an explicit erf_number,
+    in one query (Resident ERF preferred, then Owner).
+    """
+    rows = (
+        db.session.query(User.id, Resident.erf_number, Owner.erf_number)
+        .outerjoin(Resident, Resident.user_id == User.id)
+        .outerjoin(Owner, Owner.user_id == User.id)
+        .filter(User.id.in_([str(uid) for uid in user_ids]))
+        .all()
+    )
+    return {uid: (res_erf or own_erf) for uid, res_erf, own_erf in rows}
+
+
+_BATCH_ATTR = "_change_log_batch"
+
+
+class ChangeLogBatch:
+    """
+    Buffers log_user_change() calls and writes them with a single INSERT.
+
+        with change_log_batch():
+            log_user_change(...)   # buffered, no commit
+            log_user_change(...)
+        db.session.commit()        # change rows commit together with the update
+
+    On exit the rows are inserted into the caller's transaction. Pass
+    commit=True when logging after the caller's own commit. Nested batches
+    fold into the outermost one; an exception inside the block drops the
+    buffered rows.
+    """
+
+    def __init__(self, commit: bool = False):
+        self.commit = commit
+        self.entries = []
+        self.ok = True
+        self._outer = None
+
+    def add(self, user_id, user_name, erf_number, change_type, field_name, old_value, new_value):
+        row = {
+            "user_id": str(user_id),
+            "field_name": normalize_field_name(field_name),
+            "old_value": str(old_value) if old_value is not None else None,
+            "new_value": str(new_value) if new_value is not None else None,
+            "change_type": str(change_type or "update"),
+            "change_timestamp": datetime.utcnow(),
+            "admin_reviewed": False,
+            "erf_number": str(erf_number) if erf_number else None,
+        }
+        self.entries.append((row, user_name))
+        return True
+
+    def flush(self) -> int:
+        """Insert the buffered rows into the current session; returns how many were written."""
+        entries, self.entries = self.entries, []
+        if not entries:
+            return 0
+
         # Lazy import avoids import-time failures / circular deps
         from src.models.user_change import UserChange
 
-        erf = erf_number or _resolve_erf_for_user(user_id)
-
-        entry = UserChange(
-            user_id=str(user_id),
-            field_name=normalize_field_name(field_name),
-            old_value=str(old_value) if old_value is not None else None,
-            new_value=str(new_value) if new_value is not None else None,
-            change_type=str(change_type or "update"),
-            change_timestamp=datetime.utcnow(),
-            admin_reviewed=False,
-            erf_number=str(erf) if erf else None,
-        )
-        db.session.add(entry)
-        db.session.commit()
-        current_app.logger.info(
-            "Change logged: %s.%s (%s) '%s' → '%s' [user_id=%s, erf=%s]",
-            entry.change_type,
-            entry.field_name,
-            user_name,
-            old_value,
-            new_value,
-            user_id,
-            erf,
-        )
-        return True
-    except Exception:
-        current_app.logger.exception("log_user_change failed")
+        rows = [row for row, _ in entries]
         try:
-            db.session.rollback()
+            missing = {row["user_id"] for row in rows if not row["erf_number"]}
+            if missing:
+                erfs = _resolve_erfs(missing)
+                for row in rows:
+                    if not row["erf_number"] and erfs.get(row["user_id"]):
+                        row["erf_number"] = str(erfs[row["user_id"]])
+
+            # savepoint: a failed insert must not poison the caller's transaction
+            with db.session.begin_nested():
+                db.session.execute(UserChange.__table__.insert(), rows)
+
+            # refresh these households' gate register rows in the same commit
+            mark_gate_register_dirty(*{row["user_id"] for row in rows})
+            # the stats cache is dropped once these rows are committed (see below)
+            db.session.info[_STATS_CHANGED_KEY] = True
+            if self.commit:
+                db.session.commit()
         except Exception:
-            pass
+            self.ok = False
+            current_app.logger.exception("log_user_change failed (%s change(s))", len(rows))
+            if self.commit:
+                try:
+                    db.session.rollback()
+                except Exception:
+                    pass
+            return 0
+
+        for row, user_name in entries:
+            current_app.logger.info(
+                "Change logged: %s.%s (%s) '%s' → '%s' [user_id=%s, erf=%s]",
+                row["change_type"],
+                row["field_name"],
+                user_name,
+                row["old_value"],
+                row["new_value"],
+                row["user_id"],
+                row["erf_number"],
+            )
+        return len(rows)
+
+    def __enter__(self):
+        self._outer = current_change_log_batch()
+        setattr(g, _BATCH_ATTR, self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        setattr(g, _BATCH_ATTR, self._outer)
+        if exc_type is not None:
+            self.entries = []
+            return False
+        if self._outer is not None:
+            self._outer.entries.extend(self.entries)
+            self.entries = []
+            return False
+        self.flush()
+        return False
+
+
+def change_log_batch(commit: bool = False) -> ChangeLogBatch:
+    """Context manager collecting every change logged inside it into one INSERT."""
+    return ChangeLogBatch(commit=commit)
+
+
+def current_change_log_batch() -> Optional[ChangeLogBatch]:
+    """The batch log_user_change() currently writes into, if any."""
+    if not has_app_context():
+        return None
+    return getattr(g, _BATCH_ATTR, None)
+
+
+# Keep the signature used by admin.py, but now store erf_number too
+def log_user_change(user_id, user_name, erf_number, change_type, field_name, old_value, new_value):
+    """
+    Log a single change.
+    Inside change_log_batch() the row is buffered and written with the rest of
+    the batch in the caller's transaction. Outside a batch it is written and
+    committed straight away (legacy behaviour for callers that log after
+    their own commit).
+    Never raises; returns False if the change could not be stored.
+    """
+    try:
+        batch = current_change_log_batch()
+        if batch is not None:
+            return batch.add(user_id, user_name, erf_number, change_type, field_name, old_value, new_value)
+
+        with change_log_batch(commit=True) as single:
+            single.add(user_id, user_name, erf_number, change_type, field_name, old_value, new_value)
+        return single.ok
+    except Exception:
+        current_app.logger.exception("log_user_change failed")
         # Don’t crash the caller; just report failure
         return False
 
 
-# ----------------------------- routes ---------------------------------
+# ----------------------------- stats ----------------------------------
 
-@admin_notifications.route("/admin/changes/stats", methods=["GET"])
-@admin_required
-def get_change_stats():
-    """Counts used by the dashboard."""
-    # 👇 lazy import here fixes the Pylance “UserChange is not defined” warning
+# The dashboard polls the stats; recompute at most this often per process
+# (sooner when a change is logged or reviewed here).
+STATS_CACHE_SECONDS = 30
+
+_STATS_CHANGED_KEY = "user_change_stats_changed"
+
+_stats_cache = {"value": None, "expires": 0.0}
+_stats_lock = threading.Lock()
+
+
+def invalidate_change_stats() -> None:
+    with _stats_lock:
+        _stats_cache["value"] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _changes_committed(session):
+    if session.info.pop(_STATS_CHANGED_KEY, None):
+        invalidate_change_stats()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_logged_changes(session):
+    session.info.pop(_STATS_CHANGED_KEY, None)
+
+
+def compute_change_stats() -> dict:
+    """
+    All dashboard counts from one conditional-aggregation query grouped by
+    (change_type, field_name). The time windows are bound as parameters, so
+    the SQL is the same on SQLite and Postgres.
+    """
     from src.models.user_change import UserChange
 
-    try:
-        # today
-        today_count = UserChange.query.filter(
-            db.func.date(UserChange.change_timestamp) == db.func.current_date()
-        ).count()
+    now = datetime.utcnow()
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    week_start = now - timedelta(days=7)
 
-        # last 7 days (works on SQLite; if you later need cross-DB, switch to date_trunc/interval for Postgres)
-        week_count = UserChange.query.filter(
-            UserChange.change_timestamp >= db.func.datetime(db.func.current_timestamp(), "-7 days")
-        ).count()
+    def _count_where(cond):
+        return db.func.sum(case((cond, 1), else_=0))
 
-        critical_fields = CRITICAL_FIELDS
+    rows = (
+        db.session.query(
+            UserChange.change_type,
+            UserChange.field_name,
+            _count_where(UserChange.change_timestamp >= today_start),
+            _count_where(UserChange.change_timestamp >= week_start),
+            _count_where(UserChange.admin_reviewed.is_(False)),
+        )
+        .group_by(UserChange.change_type, UserChange.field_name)
+        .all()
+    )
+
+    today = week = critical = non_critical = 0
+    by_change_type = {}
+    by_field_name = {}
+    for change_type, field_name, n_today, n_week, n_pending in rows:
+        n_pending = int(n_pending or 0)
+        today += int(n_today or 0)
+        week += int(n_week or 0)
+        if field_name in CRITICAL_FIELDS:
+            critical += n_pending
+        else:
+            non_critical += n_pending
+        if n_pending:
+            by_change_type[change_type] = by_change_type.get(change_type, 0) + n_pending
+            by_field_name[field_name] = by_field_name.get(field_name, 0) + n_pending
 
-        critical_pending = UserChange.query.filter(
-            UserChange.field_name.in_(critical_fields),
-            UserChange.admin_reviewed.is_(False),
-        ).count()
+    return {
+        "today": today,
+        "this_week": week,
+        "critical_pending": critical,
+        "non_critical_pending": non_critical,
+        "total_pending": critical + non_critical,
+        "by_change_type": by_change_type,
+        "by_field_name": dict(sorted(by_field_name.items(), key=lambda kv: kv[1], reverse=True)),
+    }
 
-        non_critical_pending = UserChange.query.filter(
-            ~UserChange.field_name.in_(critical_fields),
-            UserChange.admin_reviewed.is_(False),
-        ).count()
-
-        total_pending = UserChange.query.filter(
-            UserChange.admin_reviewed.is_(False)
-        ).count()
-
-        # breakdowns
-        by_change_type = {
-            k: v for k, v in db.session.query(
-                UserChange.change_type, db.func.count(UserChange.id)
-            ).filter(
-                UserChange.admin_reviewed.is_(False)
-            ).group_by(UserChange.change_type).all()
-        }
 
-        by_field_name = {
-            k: v for k, v in db.session.query(
-                UserChange.field_name, db.func.count(UserChange.id)
-            ).filter(
-                UserChange.admin_reviewed.is_(False)
-            ).group_by(UserChange.field_name).order_by(db.func.count(UserChange.id).desc()).all()
-        }
+def _cached_change_stats() -> dict:
+    now = time.monotonic()
+    with _stats_lock:
+        if _stats_cache["value"] is not None and now < _stats_cache["expires"]:
+            return _stats_cache["value"]
 
-        return jsonify({
-            "success": True,
-            "stats": {
-                "today": today_count,
-                "this_week": week_count,
-                "critical_pending": critical_pending,
-                "non_critical_pending": non_critical_pending,
-                "total_pending": total_pending,
-                "by_change_type": by_change_type,
-                "by_field_name": by_field_name,
-            }
-        }), 200
+    stats = compute_change_stats()
+    with _stats_lock:
+        _stats_cache["value"] = stats
+        _stats_cache["expires"] = now + STATS_CACHE_SECONDS
+    return stats
+
+
+# ----------------------------- routes ---------------------------------
+
+@admin_notifications.route("/admin/changes/stats", methods=["GET"])
+@admin_required
+def get_change_stats():
+    """Counts used by the dashboard."""
+    try:
+        stats = _cached_change_stats()
+        return jsonify({"success": True, "stats": stats}), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get stats: {e}"}), 500
 
@@ -218,16 +434,11 @@ def get_critical_changes():
         from src.models.user_change import UserChange  # local import for consistency
         critical_fields = CRITICAL_FIELDS
         rows = UserChange.query.filter(
-            UserChange.field_name.in_(critical_fields),
             UserChange.admin_reviewed.is_(False),
+            UserChange.field_name.in_(critical_fields),
         ).order_by(UserChange.change_timestamp.desc()).all()
 
-        # Backfill ERF in the payload if older rows predate the new column
-        out = []
-        for r in rows:
-            if not getattr(r, "erf_number", None):
-                r.erf_number = _resolve_erf_for_user(r.user_id)
-            out.append(serialize_change(r))
+        out = _serialize_changes(rows)
 
         return jsonify({
             "success": True,
@@ -241,42 +452,54 @@ def get_critical_changes():
 @admin_notifications.route("/admin/changes/non-critical", methods=["GET"])
 @admin_required
 def get_non_critical_changes():
+    """
+    Non-critical changes, newest first, keyset paginated: pass the returned
+    pagination.next_cursor as ?cursor= to get the next page. ?page=N still
+    serves the old OFFSET pages.
+    """
     try:
         from src.models.user_change import UserChange  # local import for consistency
-        page = request.args.get("page", 1, type=int)
-        per_page = request.args.get("per_page", 50, type=int)
+        per_page = _page_size()
         show_reviewed = request.args.get("show_reviewed", "false").lower() == "true"
 
-        q = UserChange.query.filter(~UserChange.field_name.in_(CRITICAL_FIELDS))
+        cursor = request.args.get("cursor")
+        if cursor and "page" in request.args:
+            return jsonify({"error": "Pass either cursor or page, not both"}), 400
+        try:
+            after = _decode_cursor(cursor)[1] if cursor else None
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
+        q = UserChange.query.filter(_non_critical(UserChange))
         if not show_reviewed:
             q = q.filter(UserChange.admin_reviewed.is_(False))
 
-        total = q.count()
-        rows = q.order_by(UserChange.change_timestamp.desc()) \
-                .limit(per_page).offset((page - 1) * per_page).all()
-
-        total_pages = (total + per_page - 1) // per_page
-
-        out = []
-        for r in rows:
-            if not getattr(r, "erf_number", None):
-                r.erf_number = _resolve_erf_for_user(r.user_id)
-            out.append(serialize_change(r))
+        if "page" in request.args:
+            rows, pagination = _offset_page(
+                q, (UserChange.change_timestamp.desc(), UserChange.id.desc()), per_page
+            )
+            total_pending = None if show_reviewed else pagination["total_count"]
+        else:
+            rows, has_next = _keyset_page(q, after, per_page)
+            # pending totals come from the (cached) dashboard aggregate, not a COUNT per
+            # page, so they can lag the rows by up to STATS_CACHE_SECONDS
+            total_pending = _cached_change_stats()["non_critical_pending"]
+            pagination = {
+                "per_page": per_page,
+                "next_cursor": _encode_cursor("non_critical", rows[-1]) if has_next else None,
+                "has_next": has_next,
+                "has_prev": bool(cursor),
+                "total_count": None if show_reviewed else total_pending,
+                "total_is_estimate": True,
+            }
+        out = _serialize_changes(rows)
 
         return jsonify({
             "success": True,
             "non_critical_changes": out,
-            "pagination": {
-                "page": page,
-                "per_page": per_page,
-                "total_count": total,
-                "total_pages": total_pages,
-                "has_next": page < total_pages,
-                "has_prev": page > 1,
-            },
+            "pagination": pagination,
             "count": len(out),
-            "total_pending": total,
+            "total_pending": total_pending,
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to fetch non-critical changes: {e}"}), 500
@@ -285,49 +508,81 @@ def get_non_critical_changes():
 @admin_notifications.route("/admin/changes/pending", methods=["GET"])
 @admin_required
 def get_pending_changes():
-    """All unreviewed changes, critical first."""
+    """
+    All unreviewed changes, critical first, keyset paginated (?cursor=).
+    The critical rows are paged first, then the rest, each newest first, so
+    every page is an index range scan instead of a CASE sort plus OFFSET.
+    ?page=N still serves the old OFFSET pages (same order).
+    """
     try:
         from src.models.user_change import UserChange  # local import for consistency
-        page = request.args.get("page", 1, type=int)
-        per_page = request.args.get("per_page", 50, type=int)
-
-        priority = case(
-    (UserChange.field_name.in_(CRITICAL_FIELDS), 0),
-    else_=1
-)
-
-        q = UserChange.query.filter(UserChange.admin_reviewed.is_(False))
-        total = q.count()
-        rows = q.order_by(priority, desc(UserChange.change_timestamp)) \
-                .limit(per_page).offset((page - 1) * per_page).all()
+        per_page = _page_size()
 
-        total_pages = (total + per_page - 1) // per_page
-
-        # critical count
-        critical_count = UserChange.query.filter(
-    UserChange.admin_reviewed.is_(False),
-    UserChange.field_name.in_(CRITICAL_FIELDS),
-).count()
-
-        out = []
-        for r in rows:
-            if not getattr(r, "erf_number", None):
-                r.erf_number = _resolve_erf_for_user(r.user_id)
-            out.append(serialize_change(r))
+        cursor = request.args.get("cursor")
+        if cursor and "page" in request.args:
+            return jsonify({"error": "Pass either cursor or page, not both"}), 400
+        try:
+            segment, after = _decode_cursor(cursor) if cursor else ("critical", None)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        pending = UserChange.query.filter(UserChange.admin_reviewed.is_(False))
+
+        if "page" in request.args:
+            priority = case((UserChange.field_name.in_(CRITICAL_FIELDS), 0), else_=1)
+            rows, pagination = _offset_page(
+                pending, (priority, UserChange.change_timestamp.desc(), UserChange.id.desc()), per_page
+            )
+            critical_pending = pending.filter(UserChange.field_name.in_(CRITICAL_FIELDS)).count()
+            out = _serialize_changes(rows)
+            return jsonify({
+                "success": True,
+                "changes": out,
+                "pagination": pagination,
+                "total_pending": pagination["total_count"],
+                "critical_pending": critical_pending,
+                "showing_count": len(out),
+            }), 200
+
+        rows = []
+        next_cursor = None
+
+        if segment == "critical":
+            rows, has_more = _keyset_page(
+                pending.filter(UserChange.field_name.in_(CRITICAL_FIELDS)), after, per_page
+            )
+            if has_more:
+                next_cursor = _encode_cursor("critical", rows[-1])
+            segment, after = "other", None
+
+        if next_cursor is None:
+            others = pending.filter(_non_critical(UserChange))
+            more_rows, has_more = _keyset_page(others, after, per_page - len(rows))
+            if more_rows:
+                rows += more_rows
+                if has_more:
+                    next_cursor = _encode_cursor("other", more_rows[-1])
+            elif has_more:
+                # page filled by critical rows; the rest start on the next page
+                next_cursor = _encode_cursor("other")
+
+        stats = _cached_change_stats()
+        out = _serialize_changes(rows)
 
         return jsonify({
             "success": True,
             "changes": out,
             "pagination": {
-                "page": page,
                 "per_page": per_page,
-                "total_count": total,
-                "total_pages": total_pages,
-                "has_next": page < total_pages,
-                "has_prev": page > 1,
+                "next_cursor": next_cursor,
+                "has_next": next_cursor is not None,
+                "has_prev": bool(cursor),
+                # cached dashboard aggregate (may lag by up to STATS_CACHE_SECONDS)
+                "total_count": stats["total_pending"],
+                "total_is_estimate": True,
             },
-            "total_pending": total,
-            "critical_pending": critical_count,
+            "total_pending": stats["total_pending"],
+            "critical_pending": stats["critical_pending"],
             "showing_count": len(out),
         }), 200
     except Exception as e:
@@ -349,6 +604,7 @@ def review_changes():
             {UserChange.admin_reviewed: True}, synchronize_session=False
         )
         db.session.commit()
+        invalidate_change_stats()
         return jsonify({"success": True, "message": f"Reviewed {len(change_ids)} changes"}), 200
     except Exception as e:
         db.session.rollback()
@@ -1,5 +1,8 @@
+import hashlib
+import threading
+from contextlib import nullcontext
 from datetime import timedelta
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify
 from flask_cors import CORS, cross_origin
 from flask_jwt_extended import (
     create_access_token,
@@ -7,14 +10,19 @@ from flask_jwt_extended import (
     verify_jwt_in_request,
 )
 
+from sqlalchemy.orm import aliased, joinedload
+
 from src.models.user import User, Resident, Owner, db
 from src.utils.email_service import send_registration_notification_to_admin
+from src.utils.gate_register import mark_gate_register_dirty
+from src.utils.auth import token_claims
 
 # Prefer importing the real logger + normalizer; fallback to safe no-ops
 try:
-    from src.routes.admin.notifications import log_user_change, normalize_field_name
+    from src.routes.admin_notifications import log_user_change, normalize_field_name, change_log_batch
 except Exception:
     def log_user_change(*args, **kwargs): pass
+    def change_log_batch(commit=False): return nullcontext()
     def normalize_field_name(name: str) -> str:
         return name
 
@@ -58,6 +66,57 @@ auth_bp = Blueprint("auth", __name__)
 CORS(auth_bp, origins=["http://localhost:3000", "http://localhost:3001", "http://localhost:5173"], supports_credentials=True)
 
 
+class PasswordChecker:
+    """
+    Checks one password against several accounts, running the (deliberately
+    slow) hash verification once per distinct stored hash.
+    """
+
+    def __init__(self, password):
+        self.password = password
+        self._results = {}
+
+    def matches(self, user) -> bool:
+        stored = user.password_hash
+        if stored not in self._results:
+            self._results[stored] = bool(stored) and user.check_password(self.password)
+        return self._results[stored]
+
+
+# (account id, its hash, matched hash) already found to hold a different password,
+# so each sibling costs at most one extra verification per process
+_checked_siblings = set()
+_checked_lock = threading.Lock()
+MAX_CHECKED_SIBLINGS = 10000
+
+
+def _share_password_hash(accounts, matched_user, checker) -> int:
+    """
+    Opt-in (SHARE_PASSWORD_HASH_PER_EMAIL): point every sibling account that
+    has the same password at matched_user's stored hash, so later logins
+    verify a single hash. Accounts with a different password are untouched
+    and remembered, so they are not verified again on the next login.
+    Changes are left in the session for the caller to commit.
+    """
+    changed = 0
+    for acct in accounts:
+        if not acct.password_hash or acct.password_hash == matched_user.password_hash:
+            continue
+        key = (acct.id, acct.password_hash, matched_user.password_hash)
+        with _checked_lock:
+            if key in _checked_siblings:
+                continue
+        if checker.matches(acct):
+            acct.password_hash = matched_user.password_hash
+            changed += 1
+        else:
+            with _checked_lock:
+                if len(_checked_siblings) >= MAX_CHECKED_SIBLINGS:
+                    _checked_siblings.clear()
+                _checked_siblings.add(key)
+    return changed
+
+
 @auth_bp.route("/register", methods=["POST"])
 def register():
     """
@@ -101,7 +160,18 @@ def register():
             role="pending",   # your app promotes this once approved
             status="pending",
         )
-        user.set_password(data["password"])
+        shared_hash = None
+        if current_app.config.get("SHARE_PASSWORD_HASH_PER_EMAIL"):
+            # reuse the stored credential of a sibling ERF account with the same password
+            checker = PasswordChecker(data["password"])
+            shared_hash = next(
+                (u.password_hash for u in User.accounts_for_email(data["email"]) if checker.matches(u)),
+                None,
+            )
+        if shared_hash:
+            user.password_hash = shared_hash
+        else:
+            user.set_password(data["password"])
         db.session.add(user)
         db.session.flush()  # ensure user.id
 
@@ -153,6 +223,8 @@ def register():
             )
             db.session.add(owner)
 
+        # pending registrations show up in the gate register snapshot (and the admin search)
+        mark_gate_register_dirty(user.id)
         db.session.commit()
 
         # Best effort: notify admin
@@ -204,29 +276,37 @@ def login():
             return jsonify({"error": "Email and password are required"}), 400
 
         # Retrieve all users with the given email, as email is not unique
-        potential_users = User.query.filter_by(email=email).all()
+        potential_users = User.accounts_for_email(email).all()
+
+        # Each distinct stored hash is verified at most once, however many ERFs share it
+        checker = PasswordChecker(password)
 
         authenticated_user = None
         # Prioritize admin user: find an admin with the correct password first.
-        admin_user = next((u for u in potential_users if u.role == 'admin' and u.check_password(password)), None)
+        admin_user = next((u for u in potential_users if u.role == 'admin' and checker.matches(u)), None)
 
         if admin_user:
             authenticated_user = admin_user
         else:
             # If no admin matches, find the first non-admin user that matches.
-            authenticated_user = next((u for u in potential_users if u.role != 'admin' and u.check_password(password)), None)
+            authenticated_user = next((u for u in potential_users if u.role != 'admin' and checker.matches(u)), None)
         
         if not authenticated_user:
             return jsonify({"error": "Invalid email or password"}), 401
 
         user = authenticated_user # Use the found and authenticated user
 
+        if current_app.config.get("SHARE_PASSWORD_HASH_PER_EMAIL"):
+            _share_password_hash(potential_users, user, checker)
+
         # Admin bypass + auto-activate safeguard
-        if user.role == "admin":
-            if user.status != "active":
-                user.status = "active"
-                db.session.commit()
-        else:
+        if user.role == "admin" and user.status != "active":
+            user.status = "active"
+        # one commit for the activation and any shared hashes
+        if db.session.dirty:
+            db.session.commit()
+
+        if user.role != "admin":
             # Non-admin users must be active
             if user.status != "active":
                 if user.status == "pending":
@@ -240,7 +320,9 @@ def login():
                 ), 401
 
         access_token = create_access_token(
-            identity=user.id, expires_delta=timedelta(days=7)
+            identity=user.id,
+            expires_delta=timedelta(days=7),
+            additional_claims=token_claims(user),
         )
         return jsonify({"access_token": access_token, "user": user.to_dict()}), 200
 
@@ -248,6 +330,41 @@ def login():
         return jsonify({"error": str(e)}), 500
 
 
+def _caller_email_normalized(user_id):
+    caller = aliased(User)
+    return (
+        db.select(caller.email_normalized)
+        .where(caller.id == user_id)
+        .scalar_subquery()
+    )
+
+
+def _profile_etag(user_id):
+    """
+    Fingerprint of everything the profile is built from (all sibling accounts
+    and their Resident/Owner rows), from one aggregate query. None if unknown user.
+    """
+    row = (
+        db.session.query(
+            db.func.count(User.id),
+            db.func.max(User.updated_at),
+            db.func.count(Resident.id),
+            db.func.max(Resident.updated_at),
+            db.func.count(Owner.id),
+            db.func.max(Owner.updated_at),
+        )
+        .select_from(User)
+        .outerjoin(Resident, Resident.user_id == User.id)
+        .outerjoin(Owner, Owner.user_id == User.id)
+        .filter(User.email_normalized == _caller_email_normalized(user_id))
+        .one()
+    )
+    if not row[0]:
+        return None
+    raw = "|".join([str(user_id)] + [str(v) for v in row])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
 @auth_bp.route("/profile", methods=["GET", "OPTIONS"])
 @cross_origin(
     supports_credentials=True,
@@ -269,13 +386,26 @@ def profile():
     """
     Returns a consolidated profile for all accounts sharing the same email:
     a list of ERFs with role/status/type details plus legacy fields for the UI.
+    Sends an ETag; a matching If-None-Match gets 304 without building the profile.
     """
-    user = User.query.get(user_id)
+    etag = _profile_etag(user_id)
+    if etag and etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+
+    # every account sharing the caller's email, with Resident/Owner rows, in one query
+    all_accounts = (
+        User.query.options(joinedload(User.resident), joinedload(User.owner))
+        .filter(User.email_normalized == _caller_email_normalized(user_id))
+        .order_by(User.created_at, User.id)
+        .all()
+    )
+    user = next((acct for acct in all_accounts if acct.id == user_id), None)
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    all_accounts = User.query.filter_by(email=user.email).all()
-
     erfs = []
     primary_profile = None
 
@@ -371,7 +501,11 @@ def profile():
         "is_owner_resident": any(erf.get("type") == "owner-resident" for erf in erfs),
     }
 
-    return jsonify(profile_data), 200
+    response = jsonify(profile_data)
+    if etag:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+    return response, 200
 
 
 @auth_bp.route("/profile", methods=["PUT", "OPTIONS"])
@@ -432,37 +566,39 @@ def update_profile():
                 # Do not break the update flow due to logging
                 print(f"Failed to log change for {field_name}: {e}")
 
-        # Update Resident fields if exists
-        if current_user.resident:
-            r = current_user.resident
-            for key in [
-                "phone_number",
-                "emergency_contact_name",
-                "emergency_contact_number",
-                "intercom_code",
-                "full_address",
-                "street_number",
-                "street_name",
-            ]:
-                if key in data:
-                    _track(key, getattr(r, key), data[key])
-                    setattr(r, key, data[key])
-
-        # Update Owner fields if exists
-        if current_user.owner:
-            o = current_user.owner
-            for key in [
-                "phone_number",
-                "full_address",
-                "street_number",
-                "street_name",
-                "full_postal_address",
-                "title_deed_number",
-            ]:
-                if key in data:
-                    _track(key, getattr(o, key), data[key])
-                    setattr(o, key, data[key])
-
+        with change_log_batch():
+            # Update Resident fields if exists
+            if current_user.resident:
+                r = current_user.resident
+                for key in [
+                    "phone_number",
+                    "emergency_contact_name",
+                    "emergency_contact_number",
+                    "intercom_code",
+                    "full_address",
+                    "street_number",
+                    "street_name",
+                ]:
+                    if key in data:
+                        _track(key, getattr(r, key), data[key])
+                        setattr(r, key, data[key])
+
+            # Update Owner fields if exists
+            if current_user.owner:
+                o = current_user.owner
+                for key in [
+                    "phone_number",
+                    "full_address",
+                    "street_number",
+                    "street_name",
+                    "full_postal_address",
+                    "title_deed_number",
+                ]:
+                    if key in data:
+                        _track(key, getattr(o, key), data[key])
+                        setattr(o, key, data[key])
+
+        mark_gate_register_dirty(current_user.id)
         db.session.commit()
         return jsonify({"message": "Profile updated successfully"}), 200
 
@@ -20,7 +20,7 @@ def bootstrap_admin():
     if not email or not password:
         return jsonify({"error": "email and password required"}), 400
 
-    users = User.query.filter_by(email=email).all()
+    users = User.accounts_for_email(email).all()
     if not users:
         u = User(email=email)
         db.session.add(u)
@@ -1,34 +1,25 @@
 # altona_village_cms/src/routes/communication.py
 from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import get_jwt_identity
 from werkzeug.utils import secure_filename
-from functools import wraps
 from datetime import datetime
 from sqlalchemy import or_
 
 import os
 import uuid
 
-from src.models.user import User, Resident, Owner, db
+from src.models.user import User, Resident, Owner, db, with_household
+from src.utils.auth import admin_required
+from src.models.email_job import EmailJob, EmailJobRecipient
 from src.utils.email_service import send_custom_email, send_email_with_attachment
+from src.utils.email_jobs import (
+    enqueue_email_job, job_counts, JOB_BULK_EMAIL, JOB_BULK_EMAIL_ATTACHMENT,
+)
 
 communication_bp = Blueprint("communication", __name__)
 
 # ------------------------- helpers & guards -------------------------
 
-def admin_required(f):
-    """Decorator to allow only admin users."""
-    @wraps(f)
-    @jwt_required()
-    def wrapper(*args, **kwargs):
-        uid = get_jwt_identity()
-        user = User.query.get(uid)
-        if not user or user.role != "admin":
-            return jsonify({"error": "Admin access required"}), 403
-        return f(*args, **kwargs)
-    return wrapper
-
-
 def _upload_dir() -> str:
     """Prefer app-configured UPLOAD_FOLDER; fallback to ./uploads."""
     base = current_app.config.get("UPLOAD_FOLDER")
@@ -43,14 +34,14 @@ def _recipient_users(recipient_type: str):
     Return a de-duped list of active Users with emails,
     filtered by recipient_type: 'all' | 'owners' | 'residents'
     """
-    q_base = User.query.filter(
+    q_base = User.query.options(*with_household()).filter(
         User.status == "active",
         User.email.isnot(None),
         User.email != "",
     )
 
     if recipient_type == "owners":
-        q = db.session.query(User).join(Owner).filter(
+        q = db.session.query(User).options(*with_household()).join(Owner).filter(
             User.id == Owner.user_id,
             User.status == "active",
             User.email.isnot(None),
@@ -58,7 +49,7 @@ def _recipient_users(recipient_type: str):
         )
         users = q.all()
     elif recipient_type == "residents":
-        q = db.session.query(User).join(Resident).filter(
+        q = db.session.query(User).options(*with_household()).join(Resident).filter(
             User.id == Resident.user_id,
             User.status == "active",
             User.email.isnot(None),
@@ -99,36 +90,57 @@ def send_bulk_email():
         if not recipients:
             return jsonify({"error": "No recipients found"}), 404
 
-        sent_count = 0
-        failed = []
-
-        for u in recipients:
-            try:
-                ok, err = send_custom_email(
-                    to_email=u.email,
-                    subject=subject,
-                    message=message,
-                    recipient_name=u.get_full_name() if hasattr(u, "get_full_name") else (u.email or "Resident"),
-                )
-                if ok:
-                    sent_count += 1
-                else:
-                    failed.append({"email": u.email, "error": err or "unknown error"})
-            except Exception as e:
-                failed.append({"email": u.email, "error": str(e)})
+        # queued for the email worker; the request returns immediately
+        job = enqueue_email_job(
+            JOB_BULK_EMAIL,
+            subject=subject,
+            message=message,
+            recipients=[
+                (u.email, u.get_full_name() if hasattr(u, "get_full_name") else (u.email or "Resident"))
+                for u in recipients
+            ],
+            recipient_type=recipient_type,
+            created_by=get_jwt_identity(),
+        )
 
         return jsonify({
-            "message": f"Email sent successfully to {sent_count} recipients",
-            "sent_count": sent_count,
-            "failed_count": len(failed),
-            "failed_emails": failed,
-        }), 200
+            "success": True,
+            "job_id": job.id,
+            "status": job.status,
+            "total_recipients": len(recipients),
+            "message": f"Email queued for {len(recipients)} recipients",
+        }), 202
 
     except Exception as e:
         current_app.logger.exception("Bulk email failed")
         return jsonify({"error": str(e)}), 500
 
 
+@communication_bp.route("/jobs/<job_id>", methods=["GET"])
+@admin_required
+def get_email_job_status(job_id):
+    """Progress of a queued bulk send: sent/failed/pending counts + per-recipient errors."""
+    try:
+        job = EmailJob.query.get(job_id)
+        if not job:
+            return jsonify({"error": "Email job not found"}), 404
+
+        failed = (
+            db.session.query(EmailJobRecipient.email, EmailJobRecipient.error)
+            .filter(EmailJobRecipient.job_id == job.id, EmailJobRecipient.status == "failed")
+            .order_by(EmailJobRecipient.id)
+            .all()
+        )
+
+        data = job.to_dict(job_counts(job.id))
+        data["failed_emails"] = [{"email": email, "error": error} for email, error in failed]
+        return jsonify(data), 200
+
+    except Exception as e:
+        current_app.logger.exception("get_email_job_status failed")
+        return jsonify({"error": str(e)}), 500
+
+
 @communication_bp.route("/send-whatsapp", methods=["POST"])
 @admin_required
 def send_whatsapp_message():
@@ -490,35 +502,36 @@ def send_bulk_email_with_attachment():
         if not recipients:
             return jsonify({"error": "No active users found for the selected recipient type"}), 404
 
-        sent_ok = 0
-        sent_fail = 0
+        # the worker runs as a separate service, so the file travels with the job
+        with open(path, "rb") as fh:
+            attachment = (os.path.basename(path), fh.read())
 
-        for u in recipients:
-            try:
-                send_email_with_attachment(
-                    to_email=u.email,
-                    subject=subject,
-                    message=message,
-                    attachment_path=path,
-                )
-                sent_ok += 1
-            except Exception as e:
-                sent_fail += 1
-                current_app.logger.warning("Bulk attach send failed to %s: %s", u.email, e)
+        job = enqueue_email_job(
+            JOB_BULK_EMAIL_ATTACHMENT,
+            subject=subject,
+            message=message,
+            recipients=[
+                (u.email, u.get_full_name() if hasattr(u, "get_full_name") else (u.email or "Resident"))
+                for u in recipients
+            ],
+            recipient_type=recipient_type,
+            attachment=attachment,
+            created_by=get_jwt_identity(),
+        )
 
-        # optional cleanup
+        # uploaded attachments are single-use; the queued copy is the one that gets sent
         try:
             os.remove(path)
-        except Exception:
+        except OSError:
             pass
 
         return jsonify({
             "success": True,
-            "sent_count": sent_ok,
-            "failed_count": sent_fail,
+            "job_id": job.id,
+            "status": job.status,
             "total_recipients": len(recipients),
-            "message": f"Email with attachment sent to {sent_ok} recipients" + (f", {sent_fail} failed" if sent_fail else ""),
-        }), 200
+            "message": f"Email with attachment queued for {len(recipients)} recipients",
+        }), 202
 
     except Exception as e:
         current_app.logger.exception("send_bulk_email_with_attachment failed")
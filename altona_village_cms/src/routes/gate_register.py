@@ -1,11 +1,19 @@
-from flask import Blueprint, jsonify, Response
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime
+from flask import Blueprint, jsonify, request, current_app
+from flask_jwt_extended import jwt_required, verify_jwt_in_request
+from datetime import datetime, timedelta
 from collections import defaultdict
-import csv
-import io
-
-from src.models.user import db, User, Resident, Owner, Vehicle
+from itertools import islice
+import hmac
+import time
+
+from src.models.user import db, normalize_plate
+from src.utils.gate_register import load_gate_register_snapshot, gate_register_snapshot_query
+from src.utils.csv_stream import csv_download, EXPORT_BATCH_SIZE
+from src.utils.auth import is_admin
+from src.utils.gate_access import (
+    ingest_events, read_json_events, read_ndjson_events, parse_access_time, GateEventError, MAX_REQUEST_EVENTS,
+)
+from src.utils.gate_history import rollup_rows, last_seen, pending_rollup_hours, MAX_ROLLUP_ROWS
 
 gate_register_bp = Blueprint("gate_register", __name__)
 
@@ -13,94 +21,37 @@ gate_register_bp = Blueprint("gate_register", __name__)
 CRITICAL_FIELDS = ("cellphone_number", "vehicle_registration", "vehicle_registration_2")
 
 
-def _is_active_status(model_obj) -> bool:
-    """
-    Treat missing/None status as active to be permissive.
-    Works for Resident/Owner models that may or may not have a 'status' column.
-    """
-    status = getattr(model_obj, "status", None)
-    if status is None:
-        return True
-    return status in ("active", "approved")
-
-
-def _admin_required() -> User | None:
-    uid = get_jwt_identity()
-    u = User.query.get(uid)
-    return u if u and u.role == "admin" else None
-
-
-def _build_gate_entries(active_users, pending_map, latest_map):
+def _build_gate_entries(rows, pending_map, latest_map):
     """
-    Convert a list of active users into gate entries.
+    Convert gate register snapshot rows (see load_gate_register_snapshot) into gate entries.
     pending_map: dict(user_id -> set of critical fields pending review)
     latest_map:  dict(user_id -> latest change timestamp)
     """
     gate_entries = []
 
-    for user in active_users:
-        # skip admin accounts
-        if user.role == "admin":
-            continue
-
-        resident_data = user.resident if user.is_resident() else None
-        owner_data = user.owner if user.is_owner() else None
-
-        # decide status label
-        if resident_data and owner_data:
-            status_label = "Owner-Resident"
-        elif resident_data:
-            status_label = "Resident"
-        elif owner_data:
-            status_label = "Owner"
-        else:
-            # no resident/owner data — skip from gate register
-            continue
-
-        # prefer resident as the "primary" record (intercom, address)
-        primary = resident_data or owner_data
-
-        # only include if their attached person records are "active/approved"
-        if resident_data and not _is_active_status(resident_data):
-            continue
-        if owner_data and not _is_active_status(owner_data):
-            continue
-
-        # vehicles: resident first, else owner
-        vehicle_regs = []
-        if resident_data:
-            vehicle_regs = [
-                v.registration_number
-                for v in Vehicle.query.filter_by(resident_id=resident_data.id).all()
-                if v.registration_number
-            ]
-        elif owner_data:
-            vehicle_regs = [
-                v.registration_number
-                for v in Vehicle.query.filter_by(owner_id=owner_data.id).all()
-                if v.registration_number
-            ]
+    for row in rows:
+        vehicle_regs = [reg for reg in row.vehicle_list() if reg]
 
         # pending critical changes for this user
-        pending_fields = sorted(list(pending_map.get(user.id, set())))
+        pending_fields = sorted(list(pending_map.get(row.user_id, set())))
         has_critical = bool(pending_fields)
 
         entry = {
-            "user_id": user.id,
-            "resident_status": status_label,
-            "surname": primary.last_name or "",
-            "first_name": primary.first_name or "",
-            "street_number": primary.street_number or "",
-            "street_name": primary.street_name or "",
+            "user_id": row.user_id,
+            "resident_status": row.resident_status,
+            "surname": row.last_name or "",
+            "first_name": row.first_name or "",
+            "street_number": row.street_number or "",
+            "street_name": row.street_name or "",
             "vehicle_registrations": vehicle_regs,  # list for JSON view
-            "erf_number": primary.erf_number or "",
-            "intercom_code": getattr(primary, "intercom_code", "") or "",
-            "sort_key": (primary.street_name or "").upper(),
+            "erf_number": row.erf_number or "",
+            "intercom_code": row.intercom_code or "",
+            "sort_key": row.sort_key,
             # NEW flags for UI highlighting:
             "pending_critical_changes": has_critical,
             "pending_fields": pending_fields,
             "changes_count": len(pending_fields),
-            "latest_change_at": latest_map.get(user.id),
+            "latest_change_at": latest_map.get(row.user_id),
         }
 
         gate_entries.append(entry)
@@ -161,19 +112,18 @@ def get_gate_register():
                       VEHICLE REGISTRATIONS (list), ERF NR, INTERCOM NR
     + NEW flags: pending_critical_changes, pending_fields, changes_count
     """
-    admin = _admin_required()
-    if not admin:
+    if not is_admin():
         return jsonify({"error": "Unauthorized access"}), 403
 
     try:
-        # fetch active/approved user shell rows
-        active_users = User.query.filter(User.status.in_(["active", "approved"])).all()
-        user_ids = [u.id for u in active_users]
+        # active/approved households from the materialized register
+        rows = load_gate_register_snapshot()
+        user_ids = [row.user_id for row in rows]
 
         # get all unreviewed critical changes (single query)
         pending_map, latest_map = _collect_pending_changes(user_ids)
 
-        entries = _build_gate_entries(active_users, pending_map, latest_map)
+        entries = _build_gate_entries(rows, pending_map, latest_map)
 
         return jsonify(
             {
@@ -197,82 +147,162 @@ def export_gate_register_csv():
     Export gate register as CSV file for printing.
     NOTE: CSV columns remain unchanged to avoid breaking existing processes.
     """
-    admin = _admin_required()
-    if not admin:
+    if not is_admin():
         return jsonify({"error": "Unauthorized access"}), 403
 
     try:
-        active_users = User.query.filter(User.status.in_(["active", "approved"])).all()
-        user_ids = [u.id for u in active_users]
-
-        # still compute pending to keep the same order as JSON
-        pending_map, latest_map = _collect_pending_changes(user_ids)
-        entries = _build_gate_entries(active_users, pending_map, latest_map)
-
-        # Flatten to one row per vehicle (or blank if none), keep your original headers
-        flat_rows = []
-        for e in entries:
-            regs = e["vehicle_registrations"] or [""]
-            for reg in regs:
-                flat_rows.append(
-                    {
-                        "resident_status": e["resident_status"],
-                        "surname": e["surname"],
-                        "street_number": e["street_number"],
-                        "street_name": e["street_name"],
-                        "vehicle_registration": reg,
-                        "erf_number": e["erf_number"],
-                        "intercom_code": e["intercom_code"],
-                        "sort_key": e["sort_key"],
-                    }
-                )
-
-        flat_rows.sort(key=lambda x: x["sort_key"])
-
-        output = io.StringIO()
-        writer = csv.writer(output)
+        # Snapshot is already ordered by street name (same order as JSON);
+        # flatten to one row per vehicle (or blank if none) while streaming
+        query = gate_register_snapshot_query()
+
+        def generate_rows():
+            for row in query.yield_per(EXPORT_BATCH_SIZE):
+                regs = [reg for reg in row.vehicle_list() if reg] or [""]
+                for reg in regs:
+                    yield [
+                        row.resident_status,
+                        row.last_name or "",
+                        row.street_number or "",
+                        row.street_name or "",
+                        reg,
+                        row.erf_number or "",
+                        row.intercom_code or "",
+                    ]
 
         # header (unchanged)
-        writer.writerow(
-            [
-                "RESIDENT STATUS",
-                "SURNAME",
-                "STREET NR",
-                "STREET NAME",
-                "VEHICLE REGISTRATION NR",
-                "ERF NR",
-                "INTERCOM NR",
-            ]
-        )
-
-        for r in flat_rows:
-            writer.writerow(
-                [
-                    r["resident_status"],
-                    r["surname"],
-                    r["street_number"],
-                    r["street_name"],
-                    r["vehicle_registration"],
-                    r["erf_number"],
-                    r["intercom_code"],
-                ]
-            )
+        header = [
+            "RESIDENT STATUS",
+            "SURNAME",
+            "STREET NR",
+            "STREET NAME",
+            "VEHICLE REGISTRATION NR",
+            "ERF NR",
+            "INTERCOM NR",
+        ]
 
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
         filename = f"gate_register_{timestamp}.csv"
 
-        output.seek(0)
-        csv_content = output.getvalue()
-        output.close()
-
-        return Response(
-            csv_content,
-            mimetype="text/csv",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}",
-                "Content-Type": "text/csv; charset=utf-8",
-            },
-        )
+        return csv_download(header, generate_rows(), filename)
 
     except Exception as e:
         return jsonify({"error": f"Failed to export gate register: {e}"}), 500
+
+
+# ------------------------------ Gate Access Feed ------------------------------
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines")
+
+
+def _gate_feed_authorized() -> bool:
+    """Gate controllers send X-Gate-Key (GATE_INGEST_KEY); admins may post with their JWT."""
+    key = current_app.config.get("GATE_INGEST_KEY")
+    sent = request.headers.get("X-Gate-Key")
+    if key and sent:
+        return hmac.compare_digest(sent, key)
+    verify_jwt_in_request()
+    return is_admin()
+
+
+@gate_register_bp.route("/gate-access/events", methods=["POST"])
+def ingest_gate_access_events():
+    """
+    Store a batch of boom-gate / ANPR events (see src/utils/gate_access.py).
+    Body: JSON array or {"events": [...]}, or NDJSON with an NDJSON content type.
+    """
+    if not _gate_feed_authorized():
+        return jsonify({"error": "Unauthorized access"}), 403
+
+    try:
+        if request.mimetype in NDJSON_TYPES:
+            events = list(islice(read_ndjson_events(request.stream), MAX_REQUEST_EVENTS + 1))
+        else:
+            payload = request.get_json(silent=True)
+            if payload is None:
+                return jsonify({"error": "Body must be JSON (array or {\"events\": [...]}) or NDJSON"}), 400
+            events = list(read_json_events(payload))
+
+        if len(events) > MAX_REQUEST_EVENTS:
+            return jsonify({"error": f"At most {MAX_REQUEST_EVENTS} events per request"}), 413
+
+        started = time.perf_counter()
+        result = ingest_events(events)
+        result["took_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        return jsonify(result), 200 if not result["rejected"] else 207
+
+    except Exception:
+        current_app.logger.exception("ingest_gate_access_events failed")
+        return jsonify({"error": "Failed to ingest gate events"}), 500
+
+
+# Default window of a rollup query, by grain
+ROLLUP_DEFAULT_RANGE = {"hour": timedelta(days=2), "day": timedelta(days=31)}
+
+
+@gate_register_bp.route("/gate-access/rollups", methods=["GET"])
+@jwt_required()
+def get_gate_access_rollups():
+    """
+    Gate traffic counts from the rollup tables.
+    ?by=gate|vehicle  &grain=hour|day  &from=&to= (ISO 8601, UTC; default the last 2 days / 31 days)
+    &gate_id=  &plate=  &access_type=  &limit=
+    """
+    if not is_admin():
+        return jsonify({"error": "Unauthorized access"}), 403
+
+    try:
+        by = request.args.get("by", "gate")
+        grain = request.args.get("grain", "hour")
+        if by not in ("gate", "vehicle") or grain not in ROLLUP_DEFAULT_RANGE:
+            return jsonify({"error": "by must be gate|vehicle and grain hour|day"}), 400
+
+        try:
+            end = parse_access_time(request.args["to"]) if request.args.get("to") else datetime.utcnow()
+            start = parse_access_time(request.args["from"]) if request.args.get("from") else end - ROLLUP_DEFAULT_RANGE[grain]
+        except GateEventError as e:
+            return jsonify({"error": str(e).replace("access_time", "from/to")}), 400
+
+        limit = request.args.get("limit", MAX_ROLLUP_ROWS, type=int) or MAX_ROLLUP_ROWS
+        rows = rollup_rows(
+            by, grain, start, end,
+            gate_id=request.args.get("gate_id"),
+            plate=normalize_plate(request.args.get("plate")) or None,
+            access_type=(request.args.get("access_type") or "").lower() or None,
+            limit=max(1, min(limit, MAX_ROLLUP_ROWS)),
+        )
+
+        return jsonify({
+            "by": by,
+            "grain": grain,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "data": rows,
+            "count": len(rows),
+            # hours with events the rollup job has not counted yet
+            "pending_hours": pending_rollup_hours(),
+        })
+
+    except Exception as e:
+        return jsonify({"error": f"Failed to load gate access rollups: {e}"}), 500
+
+
+@gate_register_bp.route("/gate-access/last-seen/<plate>", methods=["GET"])
+@jwt_required()
+def get_plate_last_seen(plate):
+    """Latest gate sighting of a plate (from the hourly rollups)."""
+    if not is_admin():
+        return jsonify({"error": "Unauthorized access"}), 403
+
+    try:
+        normalized = normalize_plate(plate)
+        if not normalized:
+            return jsonify({"error": "Plate must contain letters or digits"}), 400
+
+        seen = last_seen(normalized)
+        if seen is None:
+            return jsonify({"error": "Plate not seen at the gates", "plate": normalized}), 404
+        return jsonify({**seen, "pending_hours": pending_rollup_hours()})
+
+    except Exception as e:
+        return jsonify({"error": f"Failed to look up plate: {e}"}), 500
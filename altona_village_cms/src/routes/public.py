@@ -1,5 +1,5 @@
-from flask import Blueprint, jsonify
-from src.models.user import ErfAddressMapping
+from flask import Blueprint, jsonify, request
+from src.utils.erf_addresses import lookup_erf_address as cached_erf_address, CACHE_SECONDS
 
 # Public API blueprint for address lookups
 public_bp = Blueprint('public', __name__)
@@ -8,10 +8,10 @@ public_bp = Blueprint('public', __name__)
 def lookup_erf_address(erf_number):
     """Public endpoint to lookup address by ERF number"""
     try:
-        address_data = ErfAddressMapping.get_address_by_erf(erf_number)
+        address_data = cached_erf_address(erf_number)
         
         if address_data:
-            return jsonify({
+            response = jsonify({
                 'success': True,
                 'data': {
                     'erf_number': address_data['erf_number'],
@@ -21,7 +21,11 @@ def lookup_erf_address(erf_number):
                     'suburb': address_data.get('suburb'),
                     'postal_code': address_data.get('postal_code')
                 }
-            }), 200
+            })
+            # browsers may reuse the answer while typing; revalidation is a cheap 304
+            response.headers['Cache-Control'] = f'public, max-age={CACHE_SECONDS}'
+            response.add_etag()
+            return response.make_conditional(request)
         else:
             return jsonify({
                 'success': False,
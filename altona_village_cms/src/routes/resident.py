@@ -1,17 +1,22 @@
 # src/routes/resident.py
+from contextlib import nullcontext
+
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import func
 
-from src.models.user import User, Resident, Owner, Vehicle, Complaint, ComplaintUpdate, db
+from src.models.user import User, Resident, Owner, Vehicle, Complaint, ComplaintUpdate, Property, db, normalize_plate
+from src.models.user import with_vehicles, with_meters, with_updates
 
 # Import change tracking function (safe fallback if module isn't present)
 try:
-    from src.routes.admin_notifications import log_user_change
+    from src.routes.admin_notifications import log_user_change, change_log_batch
 except Exception:
     def log_user_change(*args, **kwargs):
         pass
 
+    def change_log_batch(commit=False):
+        return nullcontext()
+
 
 resident_bp = Blueprint("resident", __name__)
 
@@ -64,14 +69,14 @@ def get_my_vehicles():
             return jsonify({"error": "User not found"}), 404
 
         # multi-ERF: gather vehicles across all accounts using this email
-        all_user_accounts = User.query.filter_by(email=current_user.email).all()
+        all_user_accounts = User.accounts_for_email(current_user.email).options(*with_vehicles()).all()
 
         vehicles = []
         seen_ids = set()
 
         for acct in all_user_accounts:
             if acct.resident:
-                for v in Vehicle.query.filter_by(resident_id=acct.resident.id).all():
+                for v in acct.resident.vehicles:
                     if v.id in seen_ids:
                         continue
                     d = v.to_dict()
@@ -82,7 +87,7 @@ def get_my_vehicles():
                     seen_ids.add(v.id)
 
             if acct.owner:
-                for v in Vehicle.query.filter_by(owner_id=acct.owner.id).all():
+                for v in acct.owner.vehicles:
                     if v.id in seen_ids:
                         continue
                     d = v.to_dict()
@@ -110,15 +115,15 @@ def add_vehicle():
         data = request.get_json() or {}
 
         reg = (data.get("registration_number") or "").strip()
-        if not reg:
+        if not normalize_plate(reg):
             return jsonify({"error": "registration_number is required"}), 400
 
-        # uniqueness (case-insensitive)
-        if db.session.query(Vehicle.id).filter(func.lower(Vehicle.registration_number) == reg.lower()).first():
+        # uniqueness (ignoring case, spaces and dashes)
+        if Vehicle.by_plate(reg).with_entities(Vehicle.id).first():
             return jsonify({"error": "Vehicle with this registration number already exists"}), 400
 
         # multi-ERF target selection (frontend sends user_id for the chosen ERF)
-        all_user_accounts = User.query.filter_by(email=current_user.email).all()
+        all_user_accounts = User.accounts_for_email(current_user.email).all()
         target_user_id = data.get("erf_selection")
         if target_user_id:
             target_user = next((u for u in all_user_accounts if str(u.id) == str(target_user_id)), None)
@@ -147,24 +152,25 @@ def add_vehicle():
         try:
             user_name, erf_number = _display_name_and_erf_for(target_user)
 
-            # Critical: the registration number (used by the gate system)
-            log_user_change(
-                target_user.id,
-                user_name,
-                erf_number,
-                "vehicle_add",
-                "vehicle_registration",
-                "None",
-                reg,
-            )
-
-            # Optional non-critical meta:
-            if data.get("make"):
-                log_user_change(target_user.id, user_name, erf_number, "vehicle_add", "vehicle_make", "None", data["make"])
-            if data.get("model"):
-                log_user_change(target_user.id, user_name, erf_number, "vehicle_add", "vehicle_model", "None", data["model"])
-            if data.get("color"):
-                log_user_change(target_user.id, user_name, erf_number, "vehicle_add", "vehicle_color", "None", data["color"])
+            with change_log_batch(commit=True):
+                # Critical: the registration number (used by the gate system)
+                log_user_change(
+                    target_user.id,
+                    user_name,
+                    erf_number,
+                    "vehicle_add",
+                    "vehicle_registration",
+                    "None",
+                    reg,
+                )
+
+                # Optional non-critical meta:
+                if data.get("make"):
+                    log_user_change(target_user.id, user_name, erf_number, "vehicle_add", "vehicle_make", "None", data["make"])
+                if data.get("model"):
+                    log_user_change(target_user.id, user_name, erf_number, "vehicle_add", "vehicle_model", "None", data["model"])
+                if data.get("color"):
+                    log_user_change(target_user.id, user_name, erf_number, "vehicle_add", "vehicle_color", "None", data["color"])
         except Exception as log_err:
             print(f"[add_vehicle] logging failed: {log_err}")
 
@@ -194,60 +200,60 @@ def update_vehicle(vehicle_id):
 
         data = request.get_json() or {}
 
-        # registration update (critical)
-        if "registration_number" in data:
-            new_reg = (data["registration_number"] or "").strip()
-            if not new_reg:
-                return jsonify({"error": "registration_number cannot be empty"}), 400
-
-            # uniqueness (case-insensitive), excluding this record
-            existing = (
-                Vehicle.query
-                .filter(func.lower(Vehicle.registration_number) == new_reg.lower(), Vehicle.id != vehicle.id)
-                .first()
-            )
-            if existing:
-                return jsonify({"error": "Vehicle with this registration number already exists"}), 400
-
-            if vehicle.registration_number != new_reg:
-                user_name, erf_number = _display_name_and_erf_for(user)
-                try:
-                    log_user_change(
-                        user_id=user.id,
-                        user_name=user_name,
-                        erf_number=erf_number,
-                        change_type="vehicle_update",
-                        field_name="vehicle_registration",
-                        old_value=vehicle.registration_number or "",
-                        new_value=new_reg,
-                    )
-                except Exception as log_err:
-                    print(f"[update_vehicle] reg logging failed: {log_err}")
-
-                vehicle.registration_number = new_reg
-
-        # non-critical meta updates
-        for key, field_name in (
-            ("make", "vehicle_make"),
-            ("model", "vehicle_model"),
-            ("color", "vehicle_color"),
-        ):
-            if key in data and data[key] != getattr(vehicle, key):
-                old_val = getattr(vehicle, key)
-                setattr(vehicle, key, data[key])
-                user_name, erf_number = _display_name_and_erf_for(user)
-                try:
-                    log_user_change(
-                        user_id=user.id,
-                        user_name=user_name,
-                        erf_number=erf_number,
-                        change_type="vehicle_update",
-                        field_name=field_name,
-                        old_value=str(old_val) if old_val else "",
-                        new_value=str(data[key]) if data[key] else "",
-                    )
-                except Exception as log_err:
-                    print(f"[update_vehicle] meta logging failed ({field_name}): {log_err}")
+        with change_log_batch():
+            # registration update (critical)
+            if "registration_number" in data:
+                new_reg = (data["registration_number"] or "").strip()
+
+                # an unchanged plate is neither re-validated nor re-assigned, so
+                # legacy duplicates the plate migration left unnormalized stay editable
+                if vehicle.registration_number != new_reg:
+                    if not normalize_plate(new_reg):
+                        return jsonify({"error": "registration_number cannot be empty"}), 400
+
+                    # uniqueness (ignoring case, spaces and dashes), excluding this record
+                    existing = Vehicle.by_plate(new_reg).filter(Vehicle.id != vehicle.id).first()
+                    if existing:
+                        return jsonify({"error": "Vehicle with this registration number already exists"}), 400
+
+                    user_name, erf_number = _display_name_and_erf_for(user)
+                    try:
+                        log_user_change(
+                            user_id=user.id,
+                            user_name=user_name,
+                            erf_number=erf_number,
+                            change_type="vehicle_update",
+                            field_name="vehicle_registration",
+                            old_value=vehicle.registration_number or "",
+                            new_value=new_reg,
+                        )
+                    except Exception as log_err:
+                        print(f"[update_vehicle] reg logging failed: {log_err}")
+
+                    vehicle.registration_number = new_reg
+
+            # non-critical meta updates
+            for key, field_name in (
+                ("make", "vehicle_make"),
+                ("model", "vehicle_model"),
+                ("color", "vehicle_color"),
+            ):
+                if key in data and data[key] != getattr(vehicle, key):
+                    old_val = getattr(vehicle, key)
+                    setattr(vehicle, key, data[key])
+                    user_name, erf_number = _display_name_and_erf_for(user)
+                    try:
+                        log_user_change(
+                            user_id=user.id,
+                            user_name=user_name,
+                            erf_number=erf_number,
+                            change_type="vehicle_update",
+                            field_name=field_name,
+                            old_value=str(old_val) if old_val else "",
+                            new_value=str(data[key]) if data[key] else "",
+                        )
+                    except Exception as log_err:
+                        print(f"[update_vehicle] meta logging failed ({field_name}): {log_err}")
 
         db.session.commit()
         return jsonify(vehicle.to_dict()), 200
@@ -311,13 +317,13 @@ def get_my_complaints():
             return jsonify({"error": "Resident not found"}), 404
 
         complaints = []
-        for c in resident.complaints:
+        for c in Complaint.query.options(*with_updates()).filter_by(resident_id=resident.id):
             c_data = c.to_dict()
             if c.updates:
                 updates_with_user = []
                 for u in c.updates:
                     u_data = u.to_dict()
-                    update_user = User.query.get(u.user_id)
+                    update_user = u.author
                     if update_user:
                         u_data["admin_name"] = update_user.get_full_name()
                         u_data["admin_role"] = update_user.role
@@ -363,7 +369,7 @@ def get_complaint(complaint_id):
         if not resident:
             return jsonify({"error": "Resident not found"}), 404
 
-        complaint = Complaint.query.filter_by(id=complaint_id, resident_id=resident.id).first()
+        complaint = Complaint.query.options(*with_updates()).filter_by(id=complaint_id, resident_id=resident.id).first()
         if not complaint:
             return jsonify({"error": "Complaint not found"}), 404
 
@@ -372,7 +378,7 @@ def get_complaint(complaint_id):
             updates_with_user = []
             for u in complaint.updates:
                 u_data = u.to_dict()
-                update_user = User.query.get(u.user_id)
+                update_user = u.author
                 if update_user:
                     u_data["admin_name"] = update_user.get_full_name()
                     u_data["admin_role"] = update_user.role
@@ -394,7 +400,7 @@ def get_my_properties():
             return jsonify({"error": "Resident not found"}), 404
 
         props = []
-        for p in resident.properties:
+        for p in Property.query.options(*with_meters()).filter_by(resident_id=resident.id):
             d = p.to_dict()
             if p.meters:
                 d["meters"] = [m.to_dict() for m in p.meters]
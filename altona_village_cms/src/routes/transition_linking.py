@@ -1,35 +1,27 @@
 # altona_village_cms/src/routes/transition_linking.py
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
+from contextlib import nullcontext
 
 from src.models.user import db, User, Resident, Owner
 from src.models.user import UserTransitionRequest  # keep this import as in your project
+from src.utils.gate_register import mark_gate_register_dirty
+from src.utils.auth import admin_required
 
 # best-effort change logger (does nothing if not available)
 try:
-    from src.routes.admin_notifications import log_user_change
+    from src.routes.admin_notifications import log_user_change, change_log_batch
 except Exception:
     def log_user_change(*args, **kwargs):
         pass
 
+    def change_log_batch(commit=False):
+        return nullcontext()
+
 transition_linking_bp = Blueprint("transition_linking", __name__)
 
 # ----------------------------- helpers --------------------------------
 
-def admin_required(fn):
-    from functools import wraps
-    @wraps(fn)
-    @jwt_required()
-    def wrapper(*args, **kwargs):
-        uid = get_jwt_identity()
-        user = User.query.get(uid)
-        if not user or user.role != "admin":
-            return jsonify({"error": "Admin access required"}), 403
-        return fn(*args, **kwargs)
-    return wrapper
-
-
 def _user_name_and_erf_for(user: User, erf_number: str):
     """
     Get display name and erf for a user at a specific ERF, preferring Resident, then Owner.
@@ -115,66 +107,67 @@ def link_existing_transition_requests():
         return jsonify({"error": "Role mismatch: expected an Owner for seller and a Resident for buyer at this ERF"}), 400
 
     try:
-        # ----- Deactivate the seller -----
-        if old_owner_user.status != "inactive":
-            old_name, _ = _user_name_and_erf_for(old_owner_user, erf)
-            log_user_change(
-                user_id=old_owner_user.id,
-                user_name=old_name,
-                erf_number=erf,
-                change_type="transition",
-                field_name="status",
-                old_value=old_owner_user.status,
-                new_value="inactive",
-            )
-            old_owner_user.status = "inactive"
-
-        # Remove seller's Owner row for this ERF
-        db.session.delete(old_owner_row)
-
-        # ----- Promote tenant to owner-resident -----
-        # Ensure an Owner row exists for the new owner at this ERF
-        new_owner_row = Owner.query.filter_by(user_id=new_owner_user.id, erf_number=erf).first()
-        if not new_owner_row:
-            # Populate minimal fields from resident row (names/phone/address fields as available)
-            new_owner_row = Owner(
-                user_id=new_owner_user.id,
-                erf_number=erf,
-                first_name=new_resident_row.first_name,
-                last_name=new_resident_row.last_name,
-                phone_number=getattr(new_resident_row, "phone_number", None),
-                street_number=getattr(new_resident_row, "street_number", None),
-                street_name=getattr(new_resident_row, "street_name", None),
-                full_address=getattr(new_resident_row, "full_address", None),
-            )
-            db.session.add(new_owner_row)
-
-        # Flip tenant user role -> owner-resident
-        if new_owner_user.role != "owner-resident":
-            new_name, _ = _user_name_and_erf_for(new_owner_user, erf)
-            log_user_change(
-                user_id=new_owner_user.id,
-                user_name=new_name,
-                erf_number=erf,
-                change_type="transition",
-                field_name="role",
-                old_value=new_owner_user.role,
-                new_value="owner-resident",
-            )
-            new_owner_user.role = "owner-resident"
-
-        # Mark resident row as now an owner too (if your schema has this flag)
-        if hasattr(new_resident_row, "is_owner") and not new_resident_row.is_owner:
-            log_user_change(
-                user_id=new_owner_user.id,
-                user_name=new_name,
-                erf_number=erf,
-                change_type="transition",
-                field_name="resident.is_owner",
-                old_value="False",
-                new_value="True",
-            )
-            new_resident_row.is_owner = True
+        with change_log_batch():
+            # ----- Deactivate the seller -----
+            if old_owner_user.status != "inactive":
+                old_name, _ = _user_name_and_erf_for(old_owner_user, erf)
+                log_user_change(
+                    user_id=old_owner_user.id,
+                    user_name=old_name,
+                    erf_number=erf,
+                    change_type="transition",
+                    field_name="status",
+                    old_value=old_owner_user.status,
+                    new_value="inactive",
+                )
+                old_owner_user.status = "inactive"
+
+            # Remove seller's Owner row for this ERF
+            db.session.delete(old_owner_row)
+
+            # ----- Promote tenant to owner-resident -----
+            # Ensure an Owner row exists for the new owner at this ERF
+            new_owner_row = Owner.query.filter_by(user_id=new_owner_user.id, erf_number=erf).first()
+            if not new_owner_row:
+                # Populate minimal fields from resident row (names/phone/address fields as available)
+                new_owner_row = Owner(
+                    user_id=new_owner_user.id,
+                    erf_number=erf,
+                    first_name=new_resident_row.first_name,
+                    last_name=new_resident_row.last_name,
+                    phone_number=getattr(new_resident_row, "phone_number", None),
+                    street_number=getattr(new_resident_row, "street_number", None),
+                    street_name=getattr(new_resident_row, "street_name", None),
+                    full_address=getattr(new_resident_row, "full_address", None),
+                )
+                db.session.add(new_owner_row)
+
+            # Flip tenant user role -> owner-resident
+            if new_owner_user.role != "owner-resident":
+                new_name, _ = _user_name_and_erf_for(new_owner_user, erf)
+                log_user_change(
+                    user_id=new_owner_user.id,
+                    user_name=new_name,
+                    erf_number=erf,
+                    change_type="transition",
+                    field_name="role",
+                    old_value=new_owner_user.role,
+                    new_value="owner-resident",
+                )
+                new_owner_user.role = "owner-resident"
+
+            # Mark resident row as now an owner too (if your schema has this flag)
+            if hasattr(new_resident_row, "is_owner") and not new_resident_row.is_owner:
+                log_user_change(
+                    user_id=new_owner_user.id,
+                    user_name=new_name,
+                    erf_number=erf,
+                    change_type="transition",
+                    field_name="resident.is_owner",
+                    old_value="False",
+                    new_value="True",
+                )
+                new_resident_row.is_owner = True
 
         # ----- Complete both transition requests -----
         now = datetime.utcnow()
@@ -183,6 +176,7 @@ def link_existing_transition_requests():
         tenant_req.status = "completed"
         tenant_req.completed_at = now
 
+        mark_gate_register_dirty(old_owner_user.id, new_owner_user.id)
         db.session.commit()
 
         return jsonify({
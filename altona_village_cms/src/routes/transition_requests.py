@@ -1,8 +1,10 @@
 # src/routes/transition_requests.py
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from contextlib import nullcontext
 from datetime import datetime, date
 from werkzeug.security import generate_password_hash
+from sqlalchemy.orm import joinedload, load_only
 
 # Models (absolute imports to avoid path issues)
 from src.models.user import (
@@ -11,7 +13,9 @@ from src.models.user import (
 )
 
 # Same-package import for notifications (lazy side-effects kept out of module import)
-from .admin_notifications import log_user_change
+from .admin_notifications import log_user_change, change_log_batch, current_change_log_batch
+from src.utils.gate_register import mark_gate_register_dirty
+from src.utils.auth import get_current_user, require_admin
 
 # One blueprint; main.py should register at url_prefix="/api/transition"
 transition_bp = Blueprint("transition", __name__)
@@ -19,12 +23,6 @@ transition_bp = Blueprint("transition", __name__)
 
 # ------------------------ helpers ------------------------
 
-def _require_admin():
-    u = User.query.get(get_jwt_identity())
-    if not u or u.role != "admin":
-        return None, (jsonify({"error": "Admin access required"}), 403)
-    return u, None
-
 def _safe_bool(v):
     return bool(v) if isinstance(v, bool) else str(v).lower() in {"1", "true", "yes", "on"}
 
@@ -36,21 +34,28 @@ def _role_label(resident: bool, owner: bool) -> str:
     return "resident"
 
 def _log_change(user, erf_number, change_type, field, old_val, new_val):
+    """
+    Buffer a change into the caller's change_log_batch() (one INSERT per
+    migration, committed with it). Outside a batch the row is still only
+    written into the caller's transaction, never committed on its own.
+    """
     try:
         name = "Unknown User"
         if getattr(user, "resident", None):
             name = f"{user.resident.first_name or ''} {user.resident.last_name or ''}".strip() or name
         elif getattr(user, "owner", None):
             name = f"{user.owner.first_name or ''} {user.owner.last_name or ''}".strip() or name
-        log_user_change(
-            user_id=user.id,
-            user_name=name,
-            erf_number=erf_number,
-            change_type=change_type,
-            field_name=field,
-            old_value=str(old_val) if old_val is not None else "",
-            new_value=str(new_val) if new_val is not None else "",
-        )
+        batch = current_change_log_batch()
+        with (change_log_batch() if batch is None else nullcontext()):
+            log_user_change(
+                user_id=user.id,
+                user_name=name,
+                erf_number=erf_number,
+                change_type=change_type,
+                field_name=field,
+                old_value=str(old_val) if old_val is not None else "",
+                new_value=str(new_val) if new_val is not None else "",
+            )
     except Exception as e:
         current_app.logger.warning(f"log_user_change failed ({change_type}/{field}): {e}")
 
@@ -61,7 +66,7 @@ def _log_change(user, erf_number, change_type, field, old_val, new_val):
 @jwt_required()
 def link_existing_transition_requests():
     """Link two existing transition requests for the same ERF (owner and tenant) and process migration."""
-    _, err = _require_admin()
+    _, err = require_admin()
     if err: return err
 
     data = request.get_json() or {}
@@ -92,51 +97,53 @@ def link_existing_transition_requests():
         return jsonify({"error": "Role mismatch: expected owner + resident records for ERF"}), 400
 
     try:
-        # deactivate seller/owner
-        owner_user.status = "inactive"
-        owner_req.status = "completed"
-        owner_req.completed_at = datetime.utcnow()
-
-        # tenant becomes owner-resident
-        old_role = tenant_user.role
-        tenant_user.role = "owner-resident"
-        tenant_req.status = "completed"
-        tenant_req.completed_at = datetime.utcnow()
-
-        # remove old owner record
-        Owner.query.filter_by(user_id=owner_user.id, erf_number=owner_req.erf_number).delete()
-
-        # add owner record for tenant (if not present)
-        if not tenant_user.owner:
-            db.session.add(Owner(
-                user_id=tenant_user.id,
-                erf_number=tenant_req.erf_number,
-                first_name=getattr(tenant_user.resident, "first_name", "") or "",
-                last_name=getattr(tenant_user.resident, "last_name", "") or "",
-                phone_number=getattr(tenant_user.resident, "phone_number", "") or ""
-            ))
+        with change_log_batch():
+            # deactivate seller/owner
+            owner_user.status = "inactive"
+            owner_req.status = "completed"
+            owner_req.completed_at = datetime.utcnow()
+
+            # tenant becomes owner-resident
+            old_role = tenant_user.role
+            tenant_user.role = "owner-resident"
+            tenant_req.status = "completed"
+            tenant_req.completed_at = datetime.utcnow()
+
+            # remove old owner record
+            Owner.query.filter_by(user_id=owner_user.id, erf_number=owner_req.erf_number).delete()
+
+            # add owner record for tenant (if not present)
+            if not tenant_user.owner:
+                db.session.add(Owner(
+                    user_id=tenant_user.id,
+                    erf_number=tenant_req.erf_number,
+                    first_name=getattr(tenant_user.resident, "first_name", "") or "",
+                    last_name=getattr(tenant_user.resident, "last_name", "") or "",
+                    phone_number=getattr(tenant_user.resident, "phone_number", "") or ""
+                ))
 
-        # ensure resident exists & active
-        if tenant_user.resident:
-            tenant_user.resident.status = "active"
-        else:
-            db.session.add(Resident(
-                user_id=tenant_user.id,
-                erf_number=tenant_req.erf_number,
-                first_name="",
-                last_name="",
-                phone_number="",
-                id_number="999999999",
-                street_number="1",
-                street_name="Main Street",
-                full_address=f"{tenant_req.erf_number} Main Street",
-                intercom_code="ADMIN_SET_REQUIRED",
-                status="active",
-            ))
+            # ensure resident exists & active
+            if tenant_user.resident:
+                tenant_user.resident.status = "active"
+            else:
+                db.session.add(Resident(
+                    user_id=tenant_user.id,
+                    erf_number=tenant_req.erf_number,
+                    first_name="",
+                    last_name="",
+                    phone_number="",
+                    id_number="999999999",
+                    street_number="1",
+                    street_name="Main Street",
+                    full_address=f"{tenant_req.erf_number} Main Street",
+                    intercom_code="ADMIN_SET_REQUIRED",
+                    status="active",
+                ))
 
-        _log_change(tenant_user, tenant_req.erf_number, "transition_link", "user.role", old_role, tenant_user.role)
-        _log_change(owner_user, owner_req.erf_number, "transition_link", "user.status", "active", "inactive")
+            _log_change(tenant_user, tenant_req.erf_number, "transition_link", "user.role", old_role, tenant_user.role)
+            _log_change(owner_user, owner_req.erf_number, "transition_link", "user.status", "active", "inactive")
 
+        mark_gate_register_dirty(owner_user.id, tenant_user.id)
         db.session.commit()
         return jsonify({"success": True, "message": "Linked & migrated successfully."}), 200
     except Exception as e:
@@ -184,19 +191,124 @@ def perform_user_migration(tr):
 
 def _handle_role_change(tr, user):
     try:
-        erf = tr.erf_number
-        new_type = tr.new_occupant_type  # resident | owner | owner-resident
+        with change_log_batch():
+            erf = tr.erf_number
+            new_type = tr.new_occupant_type  # resident | owner | owner-resident
+
+            # top-level role
+            old_role = user.role
+            if new_type in ("resident", "owner", "owner-resident"):
+                user.role = new_type
+
+            # resident record
+            if new_type in ("resident", "owner-resident"):
+                if not user.resident:
+                    db.session.add(Resident(
+                        user_id=user.id,
+                        first_name=tr.new_occupant_first_name,
+                        last_name=tr.new_occupant_last_name,
+                        erf_number=erf,
+                        phone_number=tr.new_occupant_phone or "",
+                        id_number=tr.new_occupant_id_number or "999999999",
+                        street_number=tr.new_occupant_street_number or "1",
+                        street_name=tr.new_occupant_street_name or "Main Street",
+                        full_address=tr.new_occupant_full_address or f"{erf} Main Street",
+                        intercom_code=tr.new_occupant_intercom_code or "ADMIN_SET_REQUIRED",
+                        status="active",
+                    ))
+                else:
+                    user.resident.status = "active"
+                    user.resident.erf_number = erf
+            else:
+                if user.resident:
+                    user.resident.status = "inactive"
+
+            # owner record
+            if new_type in ("owner", "owner-resident"):
+                if not user.owner:
+                    db.session.add(Owner(
+                        user_id=user.id,
+                        first_name=tr.new_occupant_first_name,
+                        last_name=tr.new_occupant_last_name,
+                        erf_number=erf,
+                        phone_number=tr.new_occupant_phone or "",
+                        id_number=tr.new_occupant_id_number or "999999999",
+                        street_number=tr.new_occupant_street_number or "1",
+                        street_name=tr.new_occupant_street_name or "Main Street",
+                        full_address=tr.new_occupant_full_address or f"{erf} Main Street",
+                        intercom_code=tr.new_occupant_intercom_code or "ADMIN_SET_REQUIRED",
+                        title_deed_number=tr.new_occupant_title_deed_number or "T000000",
+                        postal_street_number=tr.new_occupant_postal_street_number or "1",
+                        postal_street_name=tr.new_occupant_postal_street_name or "Main Street",
+                        postal_suburb=tr.new_occupant_postal_suburb or "Suburb",
+                        postal_city=tr.new_occupant_postal_city or "City",
+                        postal_code=tr.new_occupant_postal_code or "0000",
+                        postal_province=tr.new_occupant_postal_province or "Province",
+                        full_postal_address=tr.new_occupant_full_postal_address or "1 Main Street, Suburb, City, 0000",
+                        status="active",
+                    ))
+                else:
+                    user.owner.status = "active"
+                    user.owner.erf_number = erf
+            else:
+                if user.owner:
+                    user.owner.status = "inactive"
+
+            _log_change(user, erf, "migration_role_change", "user.role", old_role, user.role)
+
+            tr.migration_completed = True
+            tr.migration_date = datetime.utcnow()
+            tr.new_user_id = user.id
+
+        mark_gate_register_dirty(user.id)
+        db.session.commit()
+        return {"success": True, "message": f"Role change to {user.role} for ERF {erf}", "migration_type": "role_change"}
+    except Exception as e:
+        db.session.rollback()
+        raise e
 
-        # top-level role
-        old_role = user.role
-        if new_type in ("resident", "owner", "owner-resident"):
-            user.role = new_type
 
-        # resident record
-        if new_type in ("resident", "owner-resident"):
-            if not user.resident:
+def _handle_partial_replacement(tr, old_user, new_user):
+    try:
+        with change_log_batch():
+            erf = tr.erf_number
+            new_type = tr.new_occupant_type  # resident | owner | owner-resident
+            now = datetime.utcnow()
+
+            # old user loses one role but stays active with the other
+            if new_type == "resident":
+                # old keeps owner role
+                old_user.role = "owner"
+                if old_user.resident:
+                    old_user.resident.status = "deleted_profile"
+                    old_user.resident.migration_date = now
+                    old_user.resident.migration_reason = f"Replaced by {new_user.email} via transition {tr.id}"
+            elif new_type == "owner":
+                # old keeps resident role
+                old_user.role = "resident"
+                if old_user.owner:
+                    old_user.owner.status = "deleted_profile"
+                    old_user.owner.migration_date = now
+                    old_user.owner.migration_reason = f"Replaced by {new_user.email} via transition {tr.id}"
+            else:
+                # fallback to complete replacement
+                old_user.status = "inactive"
+                old_user.password_hash = "DISABLED"
+                for rec in (old_user.resident, old_user.owner):
+                    if rec:
+                        rec.status = "deleted_profile"
+                        rec.migration_date = now
+                        rec.migration_reason = f"Replaced by {new_user.email} via transition {tr.id}"
+
+            # assign new user role records as needed
+            want_res = new_type in ("resident", "owner-resident")
+            want_own = new_type in ("owner", "owner-resident")
+
+            new_user.role = _role_label(want_res, want_own)
+
+            if want_res and not new_user.resident:
                 db.session.add(Resident(
-                    user_id=user.id,
+                    user_id=new_user.id,
                     first_name=tr.new_occupant_first_name,
                     last_name=tr.new_occupant_last_name,
                     erf_number=erf,
@@ -208,18 +320,9 @@ def _handle_role_change(tr, user):
                     intercom_code=tr.new_occupant_intercom_code or "ADMIN_SET_REQUIRED",
                     status="active",
                 ))
-            else:
-                user.resident.status = "active"
-                user.resident.erf_number = erf
-        else:
-            if user.resident:
-                user.resident.status = "inactive"
-
-        # owner record
-        if new_type in ("owner", "owner-resident"):
-            if not user.owner:
+            if want_own and not new_user.owner:
                 db.session.add(Owner(
-                    user_id=user.id,
+                    user_id=new_user.id,
                     first_name=tr.new_occupant_first_name,
                     last_name=tr.new_occupant_last_name,
                     erf_number=erf,
@@ -239,198 +342,108 @@ def _handle_role_change(tr, user):
                     full_postal_address=tr.new_occupant_full_postal_address or "1 Main Street, Suburb, City, 0000",
                     status="active",
                 ))
-            else:
-                user.owner.status = "active"
-                user.owner.erf_number = erf
-        else:
-            if user.owner:
-                user.owner.status = "inactive"
 
-        _log_change(user, erf, "migration_role_change", "user.role", old_role, user.role)
+            _log_change(new_user, erf, "migration_partial", "user.role", getattr(new_user, "role", None), new_user.role)
 
-        tr.migration_completed = True
-        tr.migration_date = datetime.utcnow()
-        tr.new_user_id = user.id
+            tr.migration_completed = True
+            tr.migration_date = now
+            tr.new_user_id = new_user.id
 
+        mark_gate_register_dirty(old_user.id, new_user.id)
         db.session.commit()
-        return {"success": True, "message": f"Role change to {user.role} for ERF {erf}", "migration_type": "role_change"}
+        return {"success": True, "message": f"Partial replacement to {new_user.role} for ERF {erf}",
+                "migration_type": "partial_replacement"}
     except Exception as e:
         db.session.rollback()
         raise e
 
 
-def _handle_partial_replacement(tr, old_user, new_user):
+def _handle_complete_replacement(tr, old_user, new_email):
     try:
-        erf = tr.erf_number
-        new_type = tr.new_occupant_type  # resident | owner | owner-resident
-        now = datetime.utcnow()
+        with change_log_batch():
+            erf = tr.erf_number
+            now = datetime.utcnow()
 
-        # old user loses one role but stays active with the other
-        if new_type == "resident":
-            # old keeps owner role
-            old_user.role = "owner"
-            if old_user.resident:
-                old_user.resident.status = "deleted_profile"
-                old_user.resident.migration_date = now
-                old_user.resident.migration_reason = f"Replaced by {new_user.email} via transition {tr.id}"
-        elif new_type == "owner":
-            # old keeps resident role
-            old_user.role = "resident"
-            if old_user.owner:
-                old_user.owner.status = "deleted_profile"
-                old_user.owner.migration_date = now
-                old_user.owner.migration_reason = f"Replaced by {new_user.email} via transition {tr.id}"
-        else:
-            # fallback to complete replacement
+            # deactivate old (and mark records)
             old_user.status = "inactive"
             old_user.password_hash = "DISABLED"
             for rec in (old_user.resident, old_user.owner):
                 if rec:
                     rec.status = "deleted_profile"
                     rec.migration_date = now
-                    rec.migration_reason = f"Replaced by {new_user.email} via transition {tr.id}"
-
-        # assign new user role records as needed
-        want_res = new_type in ("resident", "owner-resident")
-        want_own = new_type in ("owner", "owner-resident")
-
-        new_user.role = _role_label(want_res, want_own)
-
-        if want_res and not new_user.resident:
-            db.session.add(Resident(
-                user_id=new_user.id,
-                first_name=tr.new_occupant_first_name,
-                last_name=tr.new_occupant_last_name,
-                erf_number=erf,
-                phone_number=tr.new_occupant_phone or "",
-                id_number=tr.new_occupant_id_number or "999999999",
-                street_number=tr.new_occupant_street_number or "1",
-                street_name=tr.new_occupant_street_name or "Main Street",
-                full_address=tr.new_occupant_full_address or f"{erf} Main Street",
-                intercom_code=tr.new_occupant_intercom_code or "ADMIN_SET_REQUIRED",
-                status="active",
-            ))
-        if want_own and not new_user.owner:
-            db.session.add(Owner(
-                user_id=new_user.id,
-                first_name=tr.new_occupant_first_name,
-                last_name=tr.new_occupant_last_name,
-                erf_number=erf,
-                phone_number=tr.new_occupant_phone or "",
-                id_number=tr.new_occupant_id_number or "999999999",
-                street_number=tr.new_occupant_street_number or "1",
-                street_name=tr.new_occupant_street_name or "Main Street",
-                full_address=tr.new_occupant_full_address or f"{erf} Main Street",
-                intercom_code=tr.new_occupant_intercom_code or "ADMIN_SET_REQUIRED",
-                title_deed_number=tr.new_occupant_title_deed_number or "T000000",
-                postal_street_number=tr.new_occupant_postal_street_number or "1",
-                postal_street_name=tr.new_occupant_postal_street_name or "Main Street",
-                postal_suburb=tr.new_occupant_postal_suburb or "Suburb",
-                postal_city=tr.new_occupant_postal_city or "City",
-                postal_code=tr.new_occupant_postal_code or "0000",
-                postal_province=tr.new_occupant_postal_province or "Province",
-                full_postal_address=tr.new_occupant_full_postal_address or "1 Main Street, Suburb, City, 0000",
-                status="active",
-            ))
-
-        _log_change(new_user, erf, "migration_partial", "user.role", getattr(new_user, "role", None), new_user.role)
-
-        tr.migration_completed = True
-        tr.migration_date = now
-        tr.new_user_id = new_user.id
-
-        db.session.commit()
-        return {"success": True, "message": f"Partial replacement to {new_user.role} for ERF {erf}",
-                "migration_type": "partial_replacement"}
-    except Exception as e:
-        db.session.rollback()
-        raise e
-
+                    rec.migration_reason = f"Replaced by {new_email} via transition {tr.id}"
 
-def _handle_complete_replacement(tr, old_user, new_email):
-    try:
-        erf = tr.erf_number
-        now = datetime.utcnow()
+            # deactivate vehicles
+            old_vs = []
+            if old_user.resident:
+                old_vs += Vehicle.query.filter_by(resident_id=old_user.resident.id).all()
+            if old_user.owner:
+                old_vs += Vehicle.query.filter_by(owner_id=old_user.owner.id).all()
+            for v in old_vs:
+                v.status = "inactive"
+                v.migration_date = now
+                v.migration_reason = f"Owner replaced by {new_email}"
+
+            # create new user
+            temp_password = "test"
+            new_user = User(
+                email=new_email,
+                password_hash=generate_password_hash(temp_password),
+                role="resident",
+                status="active",
+            )
+            db.session.add(new_user)
+            db.session.flush()
 
-        # deactivate old (and mark records)
-        old_user.status = "inactive"
-        old_user.password_hash = "DISABLED"
-        for rec in (old_user.resident, old_user.owner):
-            if rec:
-                rec.status = "deleted_profile"
-                rec.migration_date = now
-                rec.migration_reason = f"Replaced by {new_email} via transition {tr.id}"
-
-        # deactivate vehicles
-        old_vs = []
-        if old_user.resident:
-            old_vs += Vehicle.query.filter_by(resident_id=old_user.resident.id).all()
-        if old_user.owner:
-            old_vs += Vehicle.query.filter_by(owner_id=old_user.owner.id).all()
-        for v in old_vs:
-            v.status = "inactive"
-            v.migration_date = now
-            v.migration_reason = f"Owner replaced by {new_email}"
-
-        # create new user
-        temp_password = "test"
-        new_user = User(
-            email=new_email,
-            password_hash=generate_password_hash(temp_password),
-            role="resident",
-            status="active",
-        )
-        db.session.add(new_user)
-        db.session.flush()
+            new_type = tr.new_occupant_type  # resident | owner | owner-resident
+            want_res = new_type in ("resident", "owner-resident")
+            want_own = new_type in ("owner", "owner-resident")
+            new_user.role = _role_label(want_res, want_own)
 
-        new_type = tr.new_occupant_type  # resident | owner | owner-resident
-        want_res = new_type in ("resident", "owner-resident")
-        want_own = new_type in ("owner", "owner-resident")
-        new_user.role = _role_label(want_res, want_own)
-
-        if want_res:
-            db.session.add(Resident(
-                user_id=new_user.id,
-                first_name=tr.new_occupant_first_name,
-                last_name=tr.new_occupant_last_name,
-                erf_number=erf,
-                phone_number=tr.new_occupant_phone or "",
-                id_number=tr.new_occupant_id_number or "999999999",
-                street_number=tr.new_occupant_street_number or "1",
-                street_name=tr.new_occupant_street_name or "Main Street",
-                full_address=tr.new_occupant_full_address or f"{erf} Main Street",
-                intercom_code=tr.new_occupant_intercom_code or "ADMIN_SET_REQUIRED",
-                status="active",
-            ))
-        if want_own:
-            db.session.add(Owner(
-                user_id=new_user.id,
-                first_name=tr.new_occupant_first_name,
-                last_name=tr.new_occupant_last_name,
-                erf_number=erf,
-                phone_number=tr.new_occupant_phone or "",
-                id_number=tr.new_occupant_id_number or "999999999",
-                street_number=tr.new_occupant_street_number or "1",
-                street_name=tr.new_occupant_street_name or "Main Street",
-                full_address=tr.new_occupant_full_address or f"{erf} Main Street",
-                intercom_code=tr.new_occupant_intercom_code or "ADMIN_SET_REQUIRED",
-                title_deed_number=tr.new_occupant_title_deed_number or "T000000",
-                postal_street_number="1",
-                postal_street_name="Main Street",
-                postal_suburb="Suburb",
-                postal_city="City",
-                postal_code="0000",
-                postal_province="Province",
-                full_postal_address="1 Main Street, Suburb, City, 0000",
-                status="active",
-            ))
+            if want_res:
+                db.session.add(Resident(
+                    user_id=new_user.id,
+                    first_name=tr.new_occupant_first_name,
+                    last_name=tr.new_occupant_last_name,
+                    erf_number=erf,
+                    phone_number=tr.new_occupant_phone or "",
+                    id_number=tr.new_occupant_id_number or "999999999",
+                    street_number=tr.new_occupant_street_number or "1",
+                    street_name=tr.new_occupant_street_name or "Main Street",
+                    full_address=tr.new_occupant_full_address or f"{erf} Main Street",
+                    intercom_code=tr.new_occupant_intercom_code or "ADMIN_SET_REQUIRED",
+                    status="active",
+                ))
+            if want_own:
+                db.session.add(Owner(
+                    user_id=new_user.id,
+                    first_name=tr.new_occupant_first_name,
+                    last_name=tr.new_occupant_last_name,
+                    erf_number=erf,
+                    phone_number=tr.new_occupant_phone or "",
+                    id_number=tr.new_occupant_id_number or "999999999",
+                    street_number=tr.new_occupant_street_number or "1",
+                    street_name=tr.new_occupant_street_name or "Main Street",
+                    full_address=tr.new_occupant_full_address or f"{erf} Main Street",
+                    intercom_code=tr.new_occupant_intercom_code or "ADMIN_SET_REQUIRED",
+                    title_deed_number=tr.new_occupant_title_deed_number or "T000000",
+                    postal_street_number="1",
+                    postal_street_name="Main Street",
+                    postal_suburb="Suburb",
+                    postal_city="City",
+                    postal_code="0000",
+                    postal_province="Province",
+                    full_postal_address="1 Main Street, Suburb, City, 0000",
+                    status="active",
+                ))
 
-        tr.migration_completed = True
-        tr.migration_date = now
-        tr.new_user_id = new_user.id
+            tr.migration_completed = True
+            tr.migration_date = now
+            tr.new_user_id = new_user.id
 
-        _log_change(new_user, erf, "migration_complete", "user.role", "pending", new_user.role)
+            _log_change(new_user, erf, "migration_complete", "user.role", "pending", new_user.role)
 
+        mark_gate_register_dirty(old_user.id, new_user.id)
         db.session.commit()
         return {
             "success": True,
@@ -584,7 +597,7 @@ def get_user_transition_requests():
 @jwt_required()
 def get_transition_request(request_id):
     try:
-        current_user = User.query.get(get_jwt_identity())
+        current_user = get_current_user()
         tr = UserTransitionRequest.query.get_or_404(request_id)
         if tr.user_id != current_user.id and current_user.role != "admin":
             return jsonify({"error": "Access denied"}), 403
@@ -612,7 +625,7 @@ def add_transition_request_update(request_id):
             return jsonify({"error": "Update text is required"}), 400
 
         tr = UserTransitionRequest.query.get_or_404(request_id)
-        actor = User.query.get(uid)
+        actor = get_current_user()
         if tr.user_id != uid and actor.role != "admin":
             return jsonify({"error": "Access denied"}), 403
 
@@ -639,10 +652,21 @@ def add_transition_request_update(request_id):
 @transition_bp.route("/admin/requests", methods=["GET"])
 @jwt_required()
 def get_all_transition_requests():
-    _, err = _require_admin()
+    """
+    Admin listing of transition requests as compact summaries.
+    Requesters and their Resident/Owner rows are loaded in the same query.
+    Optional ?page=&per_page= pagination (without it every request is returned).
+    """
+    _, err = require_admin()
     if err: return err
     try:
-        q = UserTransitionRequest.query
+        q = UserTransitionRequest.query.options(
+            load_only(*[getattr(UserTransitionRequest, f) for f in UserTransitionRequest.SUMMARY_FIELDS]),
+            joinedload(UserTransitionRequest.user).load_only(User.email).options(
+                joinedload(User.resident).load_only(Resident.first_name, Resident.last_name),
+                joinedload(User.owner).load_only(Owner.first_name, Owner.last_name),
+            ),
+        )
         status_filter  = request.args.get("status")
         priority_filter = request.args.get("priority")
         erf_filter     = request.args.get("erf_number")
@@ -654,9 +678,33 @@ def get_all_transition_requests():
         if erf_filter:
             q = q.filter(UserTransitionRequest.erf_number.contains(erf_filter))
 
-        rows = q.order_by(UserTransitionRequest.priority.desc(),
-                          UserTransitionRequest.created_at.desc()).all()
-        return jsonify({"requests": [r.to_dict() for r in rows], "total": len(rows)}), 200
+        q = q.order_by(UserTransitionRequest.priority.desc(),
+                       UserTransitionRequest.created_at.desc(),
+                       UserTransitionRequest.id)
+
+        paginate = "page" in request.args or "per_page" in request.args
+        if not paginate:
+            rows = q.all()
+            return jsonify({"requests": [r.to_summary_dict() for r in rows], "total": len(rows)}), 200
+
+        page = max(request.args.get("page", 1, type=int) or 1, 1)
+        per_page = max(1, min(request.args.get("per_page", 50, type=int) or 50, 200))
+        total = q.order_by(None).count()
+        rows = q.limit(per_page).offset((page - 1) * per_page).all()
+        total_pages = (total + per_page - 1) // per_page
+
+        return jsonify({
+            "requests": [r.to_summary_dict() for r in rows],
+            "total": total,
+            "pagination": {
+                "page": page,
+                "per_page": per_page,
+                "total_count": total,
+                "total_pages": total_pages,
+                "has_next": page < total_pages,
+                "has_prev": page > 1,
+            },
+        }), 200
     except Exception as e:
         current_app.logger.exception("get_all_transition_requests failed")
         return jsonify({"error": "Failed to fetch requests"}), 500
@@ -665,7 +713,7 @@ def get_all_transition_requests():
 @transition_bp.route("/admin/request/<request_id>", methods=["GET"])
 @jwt_required()
 def get_admin_transition_request_details(request_id):
-    _, err = _require_admin()
+    _, err = require_admin()
     if err: return err
     try:
         tr = UserTransitionRequest.query.filter_by(id=request_id).first()
@@ -689,7 +737,7 @@ def get_admin_transition_request_details(request_id):
 @transition_bp.route("/admin/request/<request_id>/assign", methods=["PUT"])
 @jwt_required()
 def assign_transition_request(request_id):
-    admin, err = _require_admin()
+    admin, err = require_admin()
     if err: return err
     try:
         tr = UserTransitionRequest.query.get_or_404(request_id)
@@ -728,7 +776,7 @@ def assign_transition_request(request_id):
 @transition_bp.route("/admin/request/<request_id>/status", methods=["PUT"])
 @jwt_required()
 def update_transition_request_status(request_id):
-    _, err = _require_admin()
+    _, err = require_admin()
     if err: return err
     try:
         tr = UserTransitionRequest.query.get_or_404(request_id)
@@ -800,7 +848,7 @@ def update_transition_request_status(request_id):
 @transition_bp.route("/stats", methods=["GET"])
 @jwt_required()
 def get_transition_stats():
-    _, err = _require_admin()
+    _, err = require_admin()
     if err: return err
     try:
         status_counts = {s: UserTransitionRequest.query.filter_by(status=s).count()
@@ -828,7 +876,7 @@ def get_transition_stats():
 @transition_bp.route("/admin/link-and-process", methods=["POST"])
 @jwt_required()
 def link_and_process_transition():
-    admin, err = _require_admin()
+    admin, err = require_admin()
     if err: return err
     try:
         data = request.get_json() or {}
@@ -1009,6 +1057,7 @@ def _perform_linked_migration(tr, old_user, new_user, new_user_data):
         tr.new_user_id = new_user.id
         tr.status = "completed"
 
+        mark_gate_register_dirty(old_user.id, new_user.id)
         db.session.commit()
         return {
             "success": True,
@@ -1023,7 +1072,7 @@ def _perform_linked_migration(tr, old_user, new_user, new_user_data):
 @transition_bp.route("/admin/request/<request_id>/mark-migration-completed", methods=["PUT"])
 @jwt_required()
 def mark_transition_migration_completed(request_id):
-    _, err = _require_admin()
+    _, err = require_admin()
     if err: return err
     try:
         tr = UserTransitionRequest.query.get_or_404(request_id)
@@ -1054,43 +1103,45 @@ def mark_transition_migration_completed(request_id):
 
 def _handle_termination(tr):
     try:
-        user = User.query.get(tr.user_id)
-        if not user:
-            return {"success": False, "error": "User not found"}
+        with change_log_batch():
+            user = User.query.get(tr.user_id)
+            if not user:
+                return {"success": False, "error": "User not found"}
 
-        erf = tr.erf_number
-        user.status = "inactive"
-
-        if user.resident:
-            user.resident.status = "inactive"
-            user.resident.migration_date = datetime.utcnow()
-            user.resident.migration_reason = f"User terminated from ERF {erf}"
-        if user.owner:
-            user.owner.status = "inactive"
-            user.owner.migration_date = datetime.utcnow()
-            user.owner.migration_reason = f"User terminated from ERF {erf}"
-
-        vehicles = []
-        if user.resident:
-            vehicles += Vehicle.query.filter_by(resident_id=user.resident.id).all()
-        if user.owner:
-            vehicles += Vehicle.query.filter_by(owner_id=user.owner.id).all()
-        for v in vehicles:
-            v.status = "terminated"
-            v.migration_date = datetime.utcnow()
-            v.migration_reason = f"User terminated from ERF {erf}"
-
-        _log_change(user, erf, "transition_termination", "user.status", "active", "terminated")
+            erf = tr.erf_number
+            user.status = "inactive"
 
-        tr.migration_completed = True
-        tr.migration_date = datetime.utcnow()
+            if user.resident:
+                user.resident.status = "inactive"
+                user.resident.migration_date = datetime.utcnow()
+                user.resident.migration_reason = f"User terminated from ERF {erf}"
+            if user.owner:
+                user.owner.status = "inactive"
+                user.owner.migration_date = datetime.utcnow()
+                user.owner.migration_reason = f"User terminated from ERF {erf}"
 
-        db.session.add(TransitionRequestUpdate(
-            transition_request_id=tr.id,
-            user_id=tr.user_id,
-            update_text=f"User terminated and removed from ERF {erf}. All access revoked.",
-            update_type="termination",
-        ))
+            vehicles = []
+            if user.resident:
+                vehicles += Vehicle.query.filter_by(resident_id=user.resident.id).all()
+            if user.owner:
+                vehicles += Vehicle.query.filter_by(owner_id=user.owner.id).all()
+            for v in vehicles:
+                v.status = "terminated"
+                v.migration_date = datetime.utcnow()
+                v.migration_reason = f"User terminated from ERF {erf}"
+
+            _log_change(user, erf, "transition_termination", "user.status", "active", "terminated")
+
+            tr.migration_completed = True
+            tr.migration_date = datetime.utcnow()
+
+            db.session.add(TransitionRequestUpdate(
+                transition_request_id=tr.id,
+                user_id=tr.user_id,
+                update_text=f"User terminated and removed from ERF {erf}. All access revoked.",
+                update_type="termination",
+            ))
+        mark_gate_register_dirty(user.id)
         db.session.commit()
 
         return {"success": True, "message": f"User terminated for ERF {erf}", "user_id": user.id, "erf_number": erf}
@@ -1,23 +1,17 @@
 # src/routes/user_management.py
 from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from datetime import datetime, timedelta
 from sqlalchemy import or_, and_
 
 from ..models.user import db, User, Resident, Owner, Vehicle
+from ..utils.gate_register import mark_gate_register_dirty
+from ..utils.auth import require_admin
 
 user_management_bp = Blueprint("user_management", __name__)
 
 # --------------------------- helpers ---------------------------
 
-def _require_admin():
-    """Return (current_user, error_response) where error_response is a Flask response or None."""
-    cur = User.query.get(get_jwt_identity())
-    if not cur or cur.role != "admin":
-        return None, (jsonify({"error": "Admin access required"}), 403)
-    return cur, None
-
-
 # --------------------------- queries ---------------------------
 
 @user_management_bp.route("/admin/users/inactive", methods=["GET"])
@@ -25,7 +19,7 @@ def _require_admin():
 def get_inactive_users():
     """Get all inactive users (not archived yet)."""
     try:
-        _, err = _require_admin()
+        _, err = require_admin()
         if err:
             return err
 
@@ -68,7 +62,7 @@ def get_inactive_users():
 def get_archived_users():
     """Get all archived users."""
     try:
-        _, err = _require_admin()
+        _, err = require_admin()
         if err:
             return err
 
@@ -115,7 +109,7 @@ def get_archived_users():
 def archive_user(user_id):
     """Archive an inactive user."""
     try:
-        current_admin, err = _require_admin()
+        current_admin, err = require_admin()
         if err:
             return err
 
@@ -153,7 +147,7 @@ def archive_user(user_id):
 def unarchive_user(user_id):
     """Unarchive a user (restore to inactive status)."""
     try:
-        _, err = _require_admin()
+        _, err = require_admin()
         if err:
             return err
 
@@ -186,7 +180,7 @@ def unarchive_user(user_id):
 def permanently_delete_user(user_id):
     """Permanently delete an archived user and all related data."""
     try:
-        _, err = _require_admin()
+        _, err = require_admin()
         if err:
             return err
 
@@ -218,6 +212,7 @@ def permanently_delete_user(user_id):
                 db.session.delete(v)
 
         db.session.delete(user)
+        mark_gate_register_dirty(user_id)
         db.session.commit()
 
         return jsonify({
@@ -236,7 +231,7 @@ def permanently_delete_user(user_id):
 def archive_old_inactive_users():
     """Archive all inactive users older than specified days."""
     try:
-        current_admin, err = _require_admin()
+        current_admin, err = require_admin()
         if err:
             return err
 
@@ -297,7 +292,7 @@ def set_intercom_code(user_id):
     Body: { "intercom_code": "12345" }
     """
     try:
-        _, err = _require_admin()
+        _, err = require_admin()
         if err:
             return err
 
@@ -318,6 +313,7 @@ def set_intercom_code(user_id):
         if hasattr(user.resident, "updated_at"):
             user.resident.updated_at = datetime.utcnow()
 
+        mark_gate_register_dirty(user.id)
         db.session.commit()
 
         # Return minimal payload used by your UI (adjust if you need more)
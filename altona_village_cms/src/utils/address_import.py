@@ -0,0 +1,302 @@
+# src/utils/address_import.py
+"""
+Import pipeline for ERF address mappings.
+
+Uploads (CSV, or .xlsx via openpyxl's read-only mode) are read as a stream
+of (row number, record) pairs, so memory stays bounded by the batch size and
+errors name the row as it appears in the file. They are validated a batch at a time
+(column by column) and written with executemany INSERT/UPDATE statements,
+all in one transaction. Readers keep seeing the previous mappings until the
+import commits, and a file with any invalid row changes nothing.
+
+Two modes:
+  replace - the file becomes the complete set of mappings (legacy behaviour)
+  diff    - only new or changed ERFs are written; ERFs missing from the file
+            are left alone
+"""
+import csv
+import io
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import bindparam
+
+from src.models.user import db, ErfAddressMapping
+from src.utils.erf_addresses import bump_erf_address_version
+
+REQUIRED_COLUMNS = ['erf_number', 'street_number', 'street_name']
+OPTIONAL_COLUMNS = ['suburb', 'postal_code']
+IMPORT_MODES = ('replace', 'diff')
+
+# Records validated and written per round trip
+IMPORT_BATCH_SIZE = 1000
+
+# Errors reported back to the uploader
+MAX_REPORTED_ERRORS = 10
+
+_BLANK = {'', 'nan', 'none'}
+_COLUMN_LIMITS = {
+    'erf_number': 10,
+    'street_number': 10,
+    'street_name': 100,
+    'suburb': 100,
+    'postal_code': 10,
+}
+_FIELD_LABELS = {
+    'erf_number': 'ERF number',
+    'street_number': 'Street number',
+    'street_name': 'Street name',
+}
+_DATA_COLUMNS = ('street_number', 'street_name', 'full_address', 'suburb', 'postal_code')
+
+
+class AddressImportError(ValueError):
+    """Upload rejected; `payload` is the JSON error body for the client."""
+
+    def __init__(self, payload):
+        super().__init__(payload.get('error'))
+        self.payload = payload
+
+
+def cell_text(value) -> str:
+    """Cell value as trimmed text; blank-like values ('', NaN, None) become ''."""
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        if value != value:  # NaN
+            return ''
+        if value.is_integer():
+            value = int(value)
+    text = str(value).strip()
+    return '' if text.lower() in _BLANK else text
+
+
+def _csv_records(reader):
+    # DictReader skips blank lines, so take the line number from the reader
+    for record in reader:
+        yield reader.line_num, record
+
+
+def read_csv_upload(stream):
+    """
+    (columns, records) for a CSV upload; records are (line number, dict)
+    pairs read lazily from the binary stream, never decoding the whole file
+    at once.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(text)
+    reader.fieldnames = [(c or '').strip() for c in (reader.fieldnames or [])]
+    return [c for c in reader.fieldnames if c], _csv_records(reader)
+
+
+class XlsxRecords:
+    """
+    (sheet row number, dict) pairs of an open read-only workbook. The
+    workbook holds the upload open until close() is called, which the
+    caller must do even if the records are never iterated.
+    """
+
+    def __init__(self, workbook, rows, fieldnames):
+        self.workbook = workbook
+        self.rows = rows
+        self.fieldnames = fieldnames
+
+    def __iter__(self):
+        for row_number, values in enumerate(self.rows, start=2):  # row 1 is the header
+            if values is None or all(v is None or v == '' for v in values):
+                continue  # blank row (read-only sheets often report trailing empties)
+            yield row_number, dict(zip(self.fieldnames, values))
+
+    def close(self):
+        self.workbook.close()
+
+
+def read_xlsx_upload(stream):
+    """
+    (columns, records) for an .xlsx upload, read from the first sheet with
+    openpyxl in read-only mode: rows are parsed as they are consumed instead
+    of loading the whole workbook. The stream must be seekable. Pass the
+    records to close_upload_records() when done.
+    """
+    from openpyxl import load_workbook  # only needed when an Excel file is uploaded
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None) or ()
+    except Exception:
+        workbook.close()
+        raise
+    fieldnames = [cell_text(c) for c in header]
+    return [c for c in fieldnames if c], XlsxRecords(workbook, rows, fieldnames)
+
+
+def read_xlsx_upload_pandas(stream):
+    """
+    Legacy Excel reader (pd.read_excel) kept for workbooks openpyxl's
+    read-only mode cannot handle. Loads the whole sheet into memory.
+    """
+    import pandas as pd
+
+    df = pd.read_excel(stream)
+    df.columns = [str(c).strip() for c in df.columns]
+    # numbered by data row: pandas does not keep the sheet position of rows it skips
+    return list(df.columns), list(enumerate(df.to_dict('records'), start=2))
+
+
+def close_upload_records(records) -> None:
+    """Release whatever a reader holds open (the .xlsx workbook); safe for any reader."""
+    close = getattr(records, 'close', None)
+    if close is not None:
+        close()
+
+
+def _batches(records, size):
+    it = iter(records)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _validate_batch(batch, row_numbers, seen_erfs, errors):
+    """
+    Clean one batch column by column. Returns the valid rows as dicts and
+    appends "Row N: ..." messages for the rest to `errors`.
+    """
+    columns = {
+        name: [cell_text(record.get(name)) for record in batch]
+        for name in REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+    }
+
+    bad = [None] * len(batch)
+    for name in REQUIRED_COLUMNS:
+        for i, value in enumerate(columns[name]):
+            if bad[i] is None and not value:
+                bad[i] = f"{_FIELD_LABELS[name]} is required"
+    for name, limit in _COLUMN_LIMITS.items():
+        for i, value in enumerate(columns[name]):
+            if bad[i] is None and len(value) > limit:
+                bad[i] = f"{name} is longer than {limit} characters"
+
+    rows = []
+    for i, erf in enumerate(columns['erf_number']):
+        row_number = row_numbers[i]
+        if bad[i] is None and erf in seen_erfs:
+            bad[i] = f"ERF {erf} appears more than once"
+        if bad[i] is not None:
+            errors.append(f"Row {row_number}: {bad[i]}")
+            continue
+        seen_erfs.add(erf)
+
+        street_number = columns['street_number'][i]
+        street_name = columns['street_name'][i]
+        suburb = columns['suburb'][i]
+        postal_code = columns['postal_code'][i]
+
+        full_address = f"{street_number} {street_name}"
+        if suburb:
+            full_address += f", {suburb}"
+        if postal_code:
+            full_address += f", {postal_code}"
+
+        rows.append({
+            'erf_number': erf,
+            'street_number': street_number,
+            'street_name': street_name,
+            'full_address': full_address[:255],
+            'suburb': suburb or None,
+            'postal_code': postal_code or None,
+        })
+    return rows
+
+
+def _existing_mappings():
+    """erf_number -> (id, data columns...) for the whole table, one column query."""
+    table = ErfAddressMapping.__table__
+    cols = [table.c.erf_number, table.c.id] + [table.c[name] for name in _DATA_COLUMNS]
+    return {row[0]: tuple(row[1:]) for row in db.session.execute(db.select(*cols))}
+
+
+def _write_batch(rows, mode, existing, uploaded_by_id, now, counts):
+    table = ErfAddressMapping.__table__
+    inserts, updates = [], []
+
+    for row in rows:
+        current = existing.get(row['erf_number']) if mode == 'diff' else None
+        if current is None:
+            inserts.append(dict(row, uploaded_by=uploaded_by_id, uploaded_at=now))
+        elif current[1:] != tuple(row[name] for name in _DATA_COLUMNS):
+            updates.append(dict({'b_id': current[0]}, **{name: row[name] for name in _DATA_COLUMNS},
+                                uploaded_by=uploaded_by_id, uploaded_at=now))
+        else:
+            counts['unchanged'] += 1
+
+    if inserts:
+        db.session.execute(table.insert(), inserts)
+        counts['inserted'] += len(inserts)
+    if updates:
+        db.session.execute(
+            table.update().where(table.c.id == bindparam('b_id')),
+            updates,
+        )
+        counts['updated'] += len(updates)
+
+
+def import_address_records(columns, records, uploaded_by_id, mode='replace', numbered=False) -> dict:
+    """
+    Validate and import records (dicts keyed by column name) in one
+    transaction. With numbered=True the records are (row number, dict) pairs
+    as returned by the upload readers; otherwise row 2 is the first record. Commits on success; raises AddressImportError (after rolling
+    back) if the header or any row is invalid.
+    Returns counts: total, inserted, updated, unchanged.
+    """
+    if mode not in IMPORT_MODES:
+        raise AddressImportError({'error': f"Unknown import mode '{mode}'", 'modes': list(IMPORT_MODES)})
+
+    missing = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing:
+        raise AddressImportError({
+            'error': f'Missing required columns: {", ".join(missing)}',
+            'required_columns': REQUIRED_COLUMNS,
+            'found_columns': list(columns),
+        })
+
+    table = ErfAddressMapping.__table__
+    counts = {'total': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0}
+    errors = []
+    seen_erfs = set()
+    now = datetime.utcnow()
+
+    try:
+        existing = _existing_mappings() if mode == 'diff' else None
+        if mode == 'replace':
+            # same transaction: other sessions keep reading the old rows until commit
+            db.session.execute(table.delete())
+
+        if not numbered:
+            records = enumerate(records, start=2)  # row 1 is the header
+        for batch in _batches(records, IMPORT_BATCH_SIZE):
+            row_numbers = [row_number for row_number, _ in batch]
+            rows = _validate_batch([record for _, record in batch], row_numbers, seen_erfs, errors)
+            counts['total'] += len(rows)
+            if not errors:
+                _write_batch(rows, mode, existing, uploaded_by_id, now, counts)
+
+        if errors:
+            raise AddressImportError({
+                'error': 'Data validation failed',
+                'errors': errors[:MAX_REPORTED_ERRORS],
+                'total_errors': len(errors),
+            })
+        if not counts['total']:
+            raise AddressImportError({'error': 'No valid data found in file'})
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    bump_erf_address_version()
+    return counts
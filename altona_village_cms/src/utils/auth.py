@@ -0,0 +1,127 @@
+# src/utils/auth.py
+"""
+Request-scoped authorization shared by all blueprints.
+
+The JWT identity is resolved to a User at most once per request and kept on
+flask.g, so an admin guard and the handler behind it share the same load.
+
+Tokens issued at login also carry the user's role as a claim. Admin checks
+trust that claim for non-admins outright; an "admin" claim is confirmed
+against a small per-process role cache (ROLE_CACHE_SECONDS), so a demoted
+admin loses access within that window even though their token is still
+valid. Assigning User.role drops the cached entry immediately.
+"""
+import threading
+import time
+from functools import wraps
+
+from flask import g, jsonify
+from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required
+from sqlalchemy import event
+
+from src.models.user import db, User
+
+ROLE_CLAIM = "role"
+
+# How long a user's role is trusted before it is re-read from the database
+ROLE_CACHE_SECONDS = 60
+
+_role_cache = {}  # user_id -> (role, expires_at)
+_role_lock = threading.Lock()
+
+
+def token_claims(user) -> dict:
+    """Extra JWT claims for create_access_token(additional_claims=...)."""
+    return {ROLE_CLAIM: user.role}
+
+
+def invalidate_role_cache(user_id=None) -> None:
+    """Forget the cached role of one user (or of everyone)."""
+    with _role_lock:
+        if user_id is None:
+            _role_cache.clear()
+        else:
+            _role_cache.pop(str(user_id), None)
+
+
+@event.listens_for(User.role, "set")
+def _role_changed(target, value, oldvalue, initiator):
+    if target.id and value != oldvalue:
+        invalidate_role_cache(target.id)
+
+
+def _remember_role(user_id, role) -> None:
+    with _role_lock:
+        _role_cache[str(user_id)] = (role, time.monotonic() + ROLE_CACHE_SECONDS)
+
+
+def _cached_role(user_id):
+    with _role_lock:
+        hit = _role_cache.get(str(user_id))
+    if hit and hit[1] > time.monotonic():
+        return hit[0]
+
+    role = db.session.query(User.role).filter(User.id == str(user_id)).scalar()
+    _remember_role(user_id, role)
+    return role
+
+
+def get_current_user():
+    """The User behind the request's JWT (None if unknown); loaded once per request."""
+    if "_auth_user" not in g:
+        uid = get_jwt_identity()
+        user = db.session.get(User, str(uid)) if uid else None
+        if user is not None:
+            _remember_role(user.id, user.role)
+        g._auth_user = user
+    return g._auth_user
+
+
+def is_admin() -> bool:
+    """True if the request's JWT belongs to an admin. Requires a verified JWT."""
+    uid = get_jwt_identity()
+    if not uid:
+        return False
+
+    if "_auth_user" in g:
+        user = g._auth_user
+        return bool(user and user.role == "admin")
+
+    claimed = get_jwt().get(ROLE_CLAIM)
+    if claimed is None:
+        # token issued before role claims existed
+        user = get_current_user()
+        return bool(user and user.role == "admin")
+    if claimed != "admin":
+        return False
+    return _cached_role(uid) == "admin"
+
+
+def _forbidden():
+    return jsonify({"error": "Admin access required"}), 403
+
+
+def check_admin():
+    """Return a 403 response if the caller is not an admin, else None."""
+    return None if is_admin() else _forbidden()
+
+
+def require_admin():
+    """Return (current_user, error_response) where error_response is a Flask response or None."""
+    if not is_admin():
+        return None, _forbidden()
+    user = get_current_user()
+    if not user:
+        return None, _forbidden()
+    return user, None
+
+
+def admin_required(f):
+    """Decorator to allow only admin users (includes @jwt_required())."""
+    @wraps(f)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        if not is_admin():
+            return _forbidden()
+        return f(*args, **kwargs)
+    return wrapper
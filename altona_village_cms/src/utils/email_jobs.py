@@ -0,0 +1,260 @@
+# src/utils/email_jobs.py
+"""
+Database-backed queue for bulk email sends.
+
+The communication endpoints enqueue an EmailJob (plus one EmailJobRecipient
+row per address) and return its id straight away. A separate worker process
+(`flask email-worker`) claims queued jobs and delivers them in batches over
+the pooled SMTP engine, recording the outcome per recipient. No external
+broker is needed: the jobs live in the application database.
+"""
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, func, or_, update
+
+from src.models.user import db
+from src.models.email_job import EmailJob, EmailJobAttachment, EmailJobRecipient
+from src.utils.email_service import (
+    build_attachment_part, build_attachment_part_from_bytes, create_smtp_pool,
+    send_bulk_custom_email, send_bulk_email_with_attachment,
+)
+
+JOB_BULK_EMAIL = "bulk_email"
+JOB_BULK_EMAIL_ATTACHMENT = "bulk_email_attachment"
+
+# Recipients delivered per batch; progress is committed after every batch
+BATCH_SIZE = 100
+
+# A running job whose lease is older than this is assumed orphaned and re-claimed
+LEASE_SECONDS = 10 * 60
+
+
+def enqueue_email_job(job_type, subject, message, recipients, recipient_type=None,
+                      attachment=None, created_by=None):
+    """
+    Persist a bulk send for the worker.
+    recipients: iterable of (email, recipient_name)
+    attachment: optional (filename, bytes), stored with the job so the worker
+    does not depend on the web service's filesystem
+    Returns the committed EmailJob.
+    """
+    job = EmailJob(
+        job_type=job_type,
+        subject=subject,
+        message=message,
+        recipient_type=recipient_type,
+        created_by=created_by,
+        status="queued",
+    )
+    db.session.add(job)
+    db.session.flush()
+
+    if attachment is not None:
+        filename, content = attachment
+        db.session.add(EmailJobAttachment(job_id=job.id, filename=filename, content=content))
+
+    rows = [
+        {"job_id": job.id, "email": email, "recipient_name": name, "status": "pending"}
+        for email, name in recipients
+    ]
+    if rows:
+        db.session.execute(EmailJobRecipient.__table__.insert(), rows)
+
+    db.session.commit()
+    return job
+
+
+def job_counts(job_id) -> dict:
+    """sent/failed/pending counts for a job in one grouped query."""
+    counts = dict(
+        db.session.query(EmailJobRecipient.status, func.count(EmailJobRecipient.id))
+        .filter(EmailJobRecipient.job_id == job_id)
+        .group_by(EmailJobRecipient.status)
+        .all()
+    )
+    sent = counts.get("sent", 0)
+    failed = counts.get("failed", 0)
+    pending = counts.get("pending", 0)
+    return {
+        "sent_count": sent,
+        "failed_count": failed,
+        "pending_count": pending,
+        "total_recipients": sent + failed + pending,
+    }
+
+
+def _claimable(now):
+    stale = now - timedelta(seconds=LEASE_SECONDS)
+    return or_(
+        EmailJob.status == "queued",
+        and_(EmailJob.status == "running", EmailJob.locked_at < stale),
+    )
+
+
+def claim_next_job(worker_id):
+    """
+    Atomically take the oldest queued (or orphaned) job.
+    The conditional UPDATE makes sure only one worker wins a given job.
+    """
+    now = datetime.utcnow()
+    candidate = (
+        db.session.query(EmailJob.id)
+        .filter(_claimable(now))
+        .order_by(EmailJob.created_at)
+        .first()
+    )
+    if not candidate:
+        db.session.rollback()
+        return None
+
+    result = db.session.execute(
+        update(EmailJob)
+        .where(EmailJob.id == candidate.id, _claimable(now))
+        .values(
+            status="running",
+            locked_by=worker_id,
+            locked_at=now,
+            started_at=func.coalesce(EmailJob.started_at, now),
+        )
+    )
+    db.session.commit()
+    if result.rowcount != 1:
+        return None  # another worker got there first
+    return db.session.get(EmailJob, candidate.id)
+
+
+def _record_results(job, recipient_ids, results):
+    """Store one batch of (email, success, message) results and renew the lease."""
+    now = datetime.utcnow()
+    table = EmailJobRecipient.__table__
+    for recipient_id, (_, ok, info) in zip(recipient_ids, results):
+        db.session.execute(
+            table.update()
+            .where(table.c.id == recipient_id)
+            .values(
+                status="sent" if ok else "failed",
+                error=None if ok else (info or "unknown error"),
+                sent_at=now if ok else None,
+            )
+        )
+    job.locked_at = now
+    db.session.commit()
+
+
+def _fail_job(job, error_msg):
+    """Mark a job and all of its still-pending recipients as failed."""
+    table = EmailJobRecipient.__table__
+    db.session.execute(
+        table.update()
+        .where(table.c.job_id == job.id, table.c.status == "pending")
+        .values(status="failed", error=error_msg)
+    )
+    job.status = "failed"
+    job.error = error_msg
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+
+def _job_attachment_part(job):
+    """
+    Encode the job's attachment once for the whole job, not per recipient or batch.
+    Jobs queued before attachments were stored in the database fall back to
+    their local attachment_path. Returns None when the attachment is unavailable.
+    """
+    stored = job.attachment
+    if stored is not None:
+        return build_attachment_part_from_bytes(stored.filename, stored.content, prerender=True)
+    if job.attachment_path:
+        return build_attachment_part(job.attachment_path, prerender=True)
+    return None
+
+
+def run_email_job(job):
+    """Deliver every pending recipient of a claimed job, batch by batch."""
+    attachment_part = None
+    if job.job_type == JOB_BULK_EMAIL_ATTACHMENT:
+        attachment_part = _job_attachment_part(job)
+        if attachment_part is None:
+            # never send an attachment email without its attachment
+            _fail_job(job, "Attachment is not available to the email worker")
+            return
+
+    pool, error_msg = create_smtp_pool()
+    if not pool:
+        _fail_job(job, error_msg)
+        return
+
+    try:
+        while True:
+            batch = (
+                db.session.query(EmailJobRecipient.id, EmailJobRecipient.email, EmailJobRecipient.recipient_name)
+                .filter(EmailJobRecipient.job_id == job.id, EmailJobRecipient.status == "pending")
+                .order_by(EmailJobRecipient.id)
+                .limit(BATCH_SIZE)
+                .all()
+            )
+            if not batch:
+                break
+
+            recipient_ids = [row.id for row in batch]
+            recipients = [(row.email, row.recipient_name) for row in batch]
+            if job.job_type == JOB_BULK_EMAIL_ATTACHMENT:
+                results = send_bulk_email_with_attachment(
+                    recipients, job.subject, job.message, None, pool=pool,
+                    attachment_part=attachment_part,
+                )
+            else:
+                results = send_bulk_custom_email(recipients, job.subject, job.message, pool=pool)
+
+            # results come back in input order
+            _record_results(job, recipient_ids, results)
+    finally:
+        pool.close()
+
+    job.status = "completed"
+    job.finished_at = datetime.utcnow()
+    # uploaded attachments are single-use (same cleanup as the old inline send)
+    if job.attachment is not None:
+        db.session.delete(job.attachment)
+    db.session.commit()
+
+    if job.attachment_path:
+        try:
+            os.remove(job.attachment_path)
+        except Exception:
+            pass
+
+
+def run_email_worker(poll_interval=5.0, once=False, worker_id=None):
+    """
+    Drain the queue forever (or until it is empty when once=True).
+    Must run inside an app context.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    current_app.logger.info("Email worker %s started", worker_id)
+
+    while True:
+        job = claim_next_job(worker_id)
+        if not job:
+            if once:
+                return
+            time.sleep(poll_interval)
+            continue
+
+        current_app.logger.info("Email worker %s running job %s (%s)", worker_id, job.id, job.job_type)
+        try:
+            run_email_job(job)
+            current_app.logger.info("Email job %s finished: %s", job.id, job_counts(job.id))
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception("Email job %s failed", job.id)
+            job = db.session.get(EmailJob, job.id)
+            if job:
+                job.status = "failed"
+                job.error = str(e)
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
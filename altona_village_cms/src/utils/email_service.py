@@ -3,7 +3,12 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
+from email.generator import Generator
+import io
 import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -382,6 +387,36 @@ def send_transition_status_update(to_email, user_name, erf_number, old_status, n
         return False, error_msg
 
 
+def _build_custom_message(from_email, to_email, subject, message, recipient_name=None):
+    """Build the community-branded message used by send_custom_email and bulk sends"""
+    msg = MIMEMultipart()
+    msg['From'] = from_email
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    
+    # Add reply-to for community communications
+    msg['Reply-To'] = "altonavillagehoa@gmail.com, lynette@sir-worcester.co.za"
+    
+    # Create email body with community branding
+    greeting = f"Dear {recipient_name}," if recipient_name else "Dear Resident,"
+    
+    body = f"""
+{greeting}
+
+{message}
+
+Best regards,
+Altona Village Management Team
+
+---
+This is a message from the Altona Village Community Management System.
+For any questions or concerns, please contact us at altonavillagehoa@gmail.com
+        """
+    
+    msg.attach(MIMEText(body, 'plain'))
+    return msg
+
+
 def send_custom_email(to_email, subject, message, recipient_name=None):
     """
     Send a custom email using the same configuration as registration emails
@@ -406,31 +441,7 @@ def send_custom_email(to_email, subject, message, recipient_name=None):
             return False, error_msg
         
         # Create message
-        msg = MIMEMultipart()
-        msg['From'] = from_email
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        
-        # Add reply-to for community communications
-        msg['Reply-To'] = "altonavillagehoa@gmail.com, lynette@sir-worcester.co.za"
-        
-        # Create email body with community branding
-        greeting = f"Dear {recipient_name}," if recipient_name else "Dear Resident,"
-        
-        body = f"""
-{greeting}
-
-{message}
-
-Best regards,
-Altona Village Management Team
-
----
-This is a message from the Altona Village Community Management System.
-For any questions or concerns, please contact us at altonavillagehoa@gmail.com
-        """
-        
-        msg.attach(MIMEText(body, 'plain'))
+        msg = _build_custom_message(from_email, to_email, subject, message, recipient_name)
         
         # Send email using the same method as registration emails
         print(f"[EMAIL] Connecting to {smtp_server}:{smtp_port}")
@@ -462,6 +473,121 @@ For any questions or concerns, please contact us at altonavillagehoa@gmail.com
         return False, error_msg
 
 
+class _PrerenderedPartGenerator(Generator):
+    """Writes parts that carry prerendered text verbatim instead of re-serializing them."""
+
+    def _write(self, msg):
+        rendered = getattr(msg, "_rendered", None)
+        if rendered is not None:
+            self.write(rendered)
+            return
+        super()._write(msg)
+
+
+def message_as_string(msg):
+    """Same output as msg.as_string(), but reuses prerendered attachment parts."""
+    if msg.is_multipart() and msg.get_boundary() is None:
+        # Choosing the boundary here skips the generator's collision scan over the
+        # whole (attachment-sized) text; base64 parts cannot contain it anyway.
+        msg.set_boundary(Generator._make_boundary())
+    fp = io.StringIO()
+    _PrerenderedPartGenerator(fp, mangle_from_=False, maxheaderlen=0, policy=msg.policy).flatten(msg)
+    return fp.getvalue()
+
+
+def build_attachment_part(attachment_path, prerender=False):
+    """
+    Read and base64-encode a file into a MIME attachment part.
+    Returns None when the file is missing or unreadable (the email is then sent without it).
+    The part can be attached to any number of messages: bulk sends encode once and reuse it.
+    prerender=True also serializes the part once, so message_as_string() can splice the
+    text into every message instead of flattening the encoded file again.
+    """
+    if not attachment_path:
+        return None
+    if not os.path.exists(attachment_path):
+        print(f"[EMAIL WARNING] Attachment file not found: {attachment_path}")
+        return None
+    
+    try:
+        print(f"[EMAIL] Adding attachment: {attachment_path}")
+        with open(attachment_path, "rb") as attachment:
+            content = attachment.read()
+    except Exception as attachment_error:
+        print(f"[EMAIL WARNING] Failed to attach file: {attachment_error}")
+        # Continue without attachment rather than failing completely
+        return None
+
+    return build_attachment_part_from_bytes(os.path.basename(attachment_path), content, prerender=prerender)
+
+
+def build_attachment_part_from_bytes(filename, content, prerender=False):
+    """
+    Same as build_attachment_part, for an attachment already held in memory
+    (e.g. loaded from the email job queue). Returns None if encoding fails.
+    """
+    try:
+        # Create MIMEBase object
+        part = MIMEBase('application', 'octet-stream')
+        part.set_payload(content)
+        
+        # Encode file
+        encoders.encode_base64(part)
+        
+        # Add header with filename
+        part.add_header(
+            'Content-Disposition',
+            f'attachment; filename= {filename}'
+        )
+        if prerender:
+            part._rendered = part.as_string()
+        print(f"[EMAIL] Attachment added successfully: {filename}")
+        return part
+        
+    except Exception as attachment_error:
+        print(f"[EMAIL WARNING] Failed to attach file: {attachment_error}")
+        return None
+
+
+def _build_attachment_message(from_email, to_email, subject, message, attachment_path=None,
+                              recipient_name=None, attachment_part=None):
+    """
+    Build the message used by send_email_with_attachment (attachment is optional).
+    Pass a prebuilt attachment_part (see build_attachment_part) to skip re-reading the file.
+    """
+    msg = MIMEMultipart()
+    msg['From'] = from_email
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg['Reply-To'] = "altonavillagehoa@gmail.com, lynette@sir-worcester.co.za"
+    
+    # Create email body
+    greeting = f"Dear {recipient_name}," if recipient_name else "Dear Resident,"
+    
+    body = f"""
+{greeting}
+
+{message}
+
+Best regards,
+Altona Village Management Team
+
+---
+This is a message from the Altona Village Community Management System.
+For any questions or concerns, please contact us at altonavillagehoa@gmail.com
+        """
+    
+    msg.attach(MIMEText(body, 'plain'))
+    
+    # Add attachment if provided
+    if attachment_part is None:
+        attachment_part = build_attachment_part(attachment_path)
+    if attachment_part is not None:
+        msg.attach(attachment_part)
+    
+    return msg
+
+
 def send_email_with_attachment(to_email, subject, message, attachment_path=None, recipient_name=None):
     """
     Send an email with optional PDF attachment
@@ -480,59 +606,8 @@ def send_email_with_attachment(to_email, subject, message, attachment_path=None,
             print(f"[EMAIL ERROR] {error_msg}")
             return False, error_msg
         
-        # Create message
-        msg = MIMEMultipart()
-        msg['From'] = from_email
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        msg['Reply-To'] = "altonavillagehoa@gmail.com, lynette@sir-worcester.co.za"
-        
-        # Create email body
-        greeting = f"Dear {recipient_name}," if recipient_name else "Dear Resident,"
-        
-        body = f"""
-{greeting}
-
-{message}
-
-Best regards,
-Altona Village Management Team
-
----
-This is a message from the Altona Village Community Management System.
-For any questions or concerns, please contact us at altonavillagehoa@gmail.com
-        """
-        
-        msg.attach(MIMEText(body, 'plain'))
-        
-        # Add attachment if provided
-        if attachment_path and os.path.exists(attachment_path):
-            try:
-                print(f"[EMAIL] Adding attachment: {attachment_path}")
-                with open(attachment_path, "rb") as attachment:
-                    # Create MIMEBase object
-                    part = MIMEBase('application', 'octet-stream')
-                    part.set_payload(attachment.read())
-                
-                # Encode file
-                encoders.encode_base64(part)
-                
-                # Add header with filename
-                filename = os.path.basename(attachment_path)
-                part.add_header(
-                    'Content-Disposition',
-                    f'attachment; filename= {filename}'
-                )
-                
-                # Attach the part to message
-                msg.attach(part)
-                print(f"[EMAIL] Attachment added successfully: {filename}")
-                
-            except Exception as attachment_error:
-                print(f"[EMAIL WARNING] Failed to attach file: {attachment_error}")
-                # Continue without attachment rather than failing completely
-        elif attachment_path:
-            print(f"[EMAIL WARNING] Attachment file not found: {attachment_path}")
+        # Create message (body + optional attachment)
+        msg = _build_attachment_message(from_email, to_email, subject, message, attachment_path, recipient_name)
         
         # Send email
         print(f"[EMAIL] Connecting to {smtp_server}:{smtp_port}")
@@ -562,3 +637,226 @@ For any questions or concerns, please contact us at altonavillagehoa@gmail.com
         error_msg = f"Error sending email with attachment to {to_email}: {str(e)}"
         print(f"[EMAIL ERROR] {error_msg}")
         return False, error_msg
+
+
+# ---------------------------------------------------------------------------
+# Bulk delivery: pooled SMTP connections + bounded worker pool
+# ---------------------------------------------------------------------------
+
+class SMTPConnectionPool:
+    """
+    A small pool of persistent, authenticated SMTP connections.
+
+    Connections are opened lazily (connect + STARTTLS + login once) and reused
+    across messages. A connection is retired after max_messages sends, or
+    immediately when it fails, and a fresh one is opened on the next acquire.
+    """
+
+    def __init__(self, smtp_server, smtp_port, from_email, from_password,
+                 size=4, max_messages=50, timeout=30):
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.from_email = from_email
+        self.from_password = from_password
+        self.size = max(1, size)
+        self.max_messages = max(1, max_messages)
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+
+    def _connect(self):
+        print(f"[EMAIL] Opening pooled connection to {self.smtp_server}:{self.smtp_port}")
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
+        server.starttls()
+        try:
+            server.login(self.from_email, self.from_password)
+        except smtplib.SMTPAuthenticationError as auth_error:
+            print(f"[EMAIL ERROR] Authentication failed: {auth_error}")
+            # Try with explicit AUTH LOGIN
+            server.ehlo()
+            server.login(self.from_email, self.from_password)
+        server.messages_sent = 0
+        return server
+
+    def acquire(self):
+        """Take an idle connection (or open one); blocks while all slots are busy."""
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, server, broken=False):
+        """Return a connection; broken or worn-out connections are closed instead."""
+        try:
+            if broken or server.messages_sent >= self.max_messages:
+                self._discard(server)
+            else:
+                self._idle.put(server)
+        finally:
+            self._slots.release()
+
+    def _discard(self, server):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def close(self):
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def send(self, to_email, msg, retries=1):
+        """
+        Send one message over a pooled connection.
+        Connection-level failures are retried on a fresh connection;
+        recipient/data rejections are not.
+        Returns: (success: bool, error_message: str)
+        """
+        text = message_as_string(msg)
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                server = self.acquire()
+            except Exception as e:
+                if attempt > retries:
+                    return False, f"Could not connect to SMTP server: {e}"
+                continue
+
+            try:
+                server.sendmail(self.from_email, to_email, text)
+                server.messages_sent += 1
+                self.release(server)
+                return True, f"Email sent successfully to {to_email}"
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError, smtplib.SMTPSenderRefused) as e:
+                # the server answered: the connection is fine, the message is not
+                self.release(server)
+                return False, f"Error sending email to {to_email}: {e}"
+            except Exception as e:
+                self.release(server, broken=True)
+                if attempt > retries:
+                    return False, f"Error sending email to {to_email}: {e}"
+                print(f"[EMAIL WARNING] Connection failed while sending to {to_email}, reconnecting: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def create_smtp_pool():
+    """
+    Build an SMTPConnectionPool from the usual environment variables.
+    Returns: (pool or None, error_message)
+    """
+    smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
+    smtp_port = int(os.getenv('SMTP_PORT', '587'))
+    from_email = os.getenv('FROM_EMAIL')
+    from_password = os.getenv('EMAIL_PASSWORD')
+
+    if not from_email or not from_password:
+        return None, "Email configuration missing. Please set FROM_EMAIL and EMAIL_PASSWORD in .env file"
+
+    if from_email == 'vonlandsbergjohn@gmail.com' and from_password == 'your-gmail-app-password-here':
+        return None, "Please update .env file with your actual Gmail App Password"
+
+    pool = SMTPConnectionPool(
+        smtp_server,
+        smtp_port,
+        from_email,
+        from_password,
+        size=int(os.getenv('SMTP_POOL_SIZE', '4')),
+        max_messages=int(os.getenv('SMTP_MAX_MESSAGES_PER_CONNECTION', '50')),
+    )
+    return pool, None
+
+
+def send_bulk_messages(jobs, pool=None):
+    """
+    Deliver many messages in parallel over a pool of SMTP connections.
+
+    jobs: iterable of (to_email, build_message) where build_message(from_email)
+          returns the MIME message for that recipient.
+    Returns a list of (to_email, success: bool, message: str) in input order.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+
+    own_pool = pool is None
+    if own_pool:
+        pool, error_msg = create_smtp_pool()
+        if not pool:
+            print(f"[EMAIL ERROR] {error_msg}")
+            return [(to_email, False, error_msg) for to_email, _ in jobs]
+
+    def _deliver(job):
+        to_email, build_message = job
+        try:
+            msg = build_message(pool.from_email)
+            ok, info = pool.send(to_email, msg)
+        except Exception as e:
+            ok, info = False, f"Error sending email to {to_email}: {e}"
+        print(f"[EMAIL {'SUCCESS' if ok else 'ERROR'}] {info}")
+        return to_email, ok, info
+
+    print(f"[EMAIL] Bulk send of {len(jobs)} messages over up to {pool.size} connections")
+    try:
+        with ThreadPoolExecutor(max_workers=min(pool.size, len(jobs))) as executor:
+            return list(executor.map(_deliver, jobs))
+    finally:
+        if own_pool:
+            pool.close()
+
+
+def send_bulk_custom_email(recipients, subject, message, pool=None):
+    """
+    Bulk version of send_custom_email.
+    recipients: iterable of (to_email, recipient_name)
+    Returns a list of (to_email, success: bool, message: str).
+    """
+    def _builder(to_email, recipient_name):
+        return lambda from_email: _build_custom_message(from_email, to_email, subject, message, recipient_name)
+
+    return send_bulk_messages(
+        ((to_email, _builder(to_email, recipient_name)) for to_email, recipient_name in recipients),
+        pool=pool,
+    )
+
+
+def send_bulk_email_with_attachment(recipients, subject, message, attachment_path, pool=None,
+                                    attachment_part=None):
+    """
+    Bulk version of send_email_with_attachment.
+    The attachment is read and encoded once and the same MIME part is shared by
+    every recipient's message; only the greeting and headers differ.
+    recipients: iterable of (to_email, recipient_name)
+    attachment_part: optional prebuilt part (callers sending in batches build it once)
+    Returns a list of (to_email, success: bool, message: str).
+    """
+    if attachment_part is None:
+        attachment_part = build_attachment_part(attachment_path, prerender=True)
+
+    def _builder(to_email, recipient_name):
+        return lambda from_email: _build_attachment_message(
+            from_email, to_email, subject, message,
+            recipient_name=recipient_name, attachment_part=attachment_part,
+        )
+
+    return send_bulk_messages(
+        ((to_email, _builder(to_email, recipient_name)) for to_email, recipient_name in recipients),
+        pool=pool,
+    )
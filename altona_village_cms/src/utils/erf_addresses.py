@@ -0,0 +1,94 @@
+# src/utils/erf_addresses.py
+"""
+In-process ERF -> address index for the lookup endpoints.
+
+The registration form looks an ERF up on every keystroke, so both the public
+and the admin lookup read from a dict loaded once from erf_address_mappings
+instead of querying per request, so lookups within CACHE_SECONDS hit no DB
+at all. Once that has passed, a stamp of the table (row count, highest id,
+latest uploaded_at) is read: the index is reloaded only when another worker
+has imported, updated or deleted mappings. bump_erf_address_version()
+forces a reload in this process.
+"""
+import threading
+import time
+
+from src.models.user import db, ErfAddressMapping
+
+# How often the stamp is re-checked (also the HTTP max-age of the lookups)
+CACHE_SECONDS = 5 * 60
+
+_lock = threading.Lock()
+_version = 0
+_index = {"version": None, "stamp": None, "checked_at": 0.0, "by_erf": {}}
+
+
+def bump_erf_address_version() -> None:
+    """Invalidate the index (call after importing, deleting or clearing mappings)."""
+    global _version
+    with _lock:
+        _version += 1
+
+
+def _table_stamp() -> tuple:
+    """Changes whenever a mapping is inserted, updated (imports reset uploaded_at) or deleted."""
+    row = db.session.query(
+        db.func.count(ErfAddressMapping.id),
+        db.func.max(ErfAddressMapping.id),
+        db.func.max(ErfAddressMapping.uploaded_at),
+    ).one()
+    return tuple(row)
+
+
+def _load_index() -> dict:
+    rows = db.session.query(
+        ErfAddressMapping.id,
+        ErfAddressMapping.erf_number,
+        ErfAddressMapping.street_number,
+        ErfAddressMapping.street_name,
+        ErfAddressMapping.full_address,
+        ErfAddressMapping.suburb,
+        ErfAddressMapping.postal_code,
+        ErfAddressMapping.uploaded_at,
+    ).all()
+    return {
+        row.erf_number: {
+            'id': row.id,
+            'erf_number': row.erf_number,
+            'street_number': row.street_number,
+            'street_name': row.street_name,
+            'full_address': row.full_address,
+            'suburb': row.suburb,
+            'postal_code': row.postal_code,
+            'uploaded_at': row.uploaded_at.isoformat() if row.uploaded_at else None,
+        }
+        for row in rows
+    }
+
+
+def _current_index() -> dict:
+    now = time.monotonic()
+    with _lock:
+        if _index["version"] == _version and now - _index["checked_at"] < CACHE_SECONDS:
+            return _index["by_erf"]
+        version = _version
+        current = _index["version"] == version
+
+    stamp = _table_stamp()
+    with _lock:
+        if current and _index["stamp"] == stamp:
+            # unchanged since the last load: keep the index for another CACHE_SECONDS
+            _index["checked_at"] = now
+            return _index["by_erf"]
+
+    by_erf = _load_index()
+    with _lock:
+        # a bump during the load leaves the version stale, so the next lookup reloads again
+        _index.update(version=version, stamp=stamp, checked_at=now, by_erf=by_erf)
+    return by_erf
+
+
+def lookup_erf_address(erf_number):
+    """Same result as ErfAddressMapping.get_address_by_erf, served from the index."""
+    address = _current_index().get(str(erf_number))
+    return dict(address) if address else None
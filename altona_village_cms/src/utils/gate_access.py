@@ -0,0 +1,275 @@
+# src/utils/gate_access.py
+"""
+Ingestion of boom-gate / ANPR events into the gate access history
+(monthly gate_access_logs_YYYYMM tables, see src/utils/gate_history.py).
+
+Events arrive in batches, as a JSON array (or {"events": [...]}) or as
+NDJSON (one JSON object per line), from POST /api/admin/gate-access/events
+or `flask ingest-gate-events`. Each event looks like:
+
+    {"plate": "CA 123-456", "access_time": "2025-08-01T07:15:02Z",
+     "access_type": "entry", "gate_id": "main", "notes": "..."}
+
+access_time is ISO 8601 (stored as naive UTC) or Unix seconds. Plates are
+resolved to vehicle_id through an in-process map of normalized plates
+(reloaded when vehicles change in this process and at the latest after
+PLATE_MAP_SECONDS). Unknown plates (visitors) are stored with vehicle_id
+NULL. Valid events are written with one executemany INSERT per month
+and INGEST_BATCH_SIZE events, committed per batch with their hours queued
+for the rollup job; invalid events are skipped and reported.
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.models.user import db, Vehicle, normalize_plate
+from src.utils.gate_history import write_events, dropped_months, month_key, month_label
+
+# Events written (and committed) per round trip
+INGEST_BATCH_SIZE = 1000
+
+# Largest batch accepted in one HTTP request
+MAX_REQUEST_EVENTS = 10000
+
+# Upper bound on how stale another worker's plate map can get
+PLATE_MAP_SECONDS = 60
+
+# Errors reported back to the sender
+MAX_REPORTED_ERRORS = 10
+
+_TEXT_LIMITS = {"access_type": 50, "gate_id": 50, "notes": 1000}
+_CHANGED_KEY = "gate_plate_map_changed"
+
+_lock = threading.Lock()
+_version = 0
+_plate_map = {"version": None, "loaded_at": 0.0, "data": None}
+
+
+class GateEventError(ValueError):
+    """A single event that cannot be stored."""
+
+
+# ---- plate map ---------------------------------------------------------------
+
+def bump_plate_map_version() -> None:
+    """Invalidate this process's plate map (call after vehicles change)."""
+    global _version
+    with _lock:
+        _version += 1
+
+
+def plate_map() -> dict:
+    """normalized plate -> vehicle_id for every registered vehicle."""
+    now = time.monotonic()
+    with _lock:
+        if _plate_map["version"] == _version and now - _plate_map["loaded_at"] < PLATE_MAP_SECONDS:
+            return _plate_map["data"]
+        version = _version
+
+    data = dict(
+        db.session.query(Vehicle.plate_normalized, Vehicle.id)
+        .filter(Vehicle.plate_normalized.isnot(None))
+        .all()
+    )
+    with _lock:
+        _plate_map.update(version=version, loaded_at=now, data=data)
+    return data
+
+
+@event.listens_for(Vehicle, "after_insert")
+@event.listens_for(Vehicle, "after_update")
+@event.listens_for(Vehicle, "after_delete")
+def _vehicle_changed(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info[_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _vehicles_committed(session):
+    if session.info.pop(_CHANGED_KEY, None):
+        bump_plate_map_version()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_vehicle_changes(session):
+    session.info.pop(_CHANGED_KEY, None)
+
+
+# ---- reading -------------------------------------------------------------------
+
+def _expand(payload):
+    if isinstance(payload, dict) and isinstance(payload.get("events"), list):
+        return payload["events"]
+    if isinstance(payload, list):
+        return payload
+    return [payload]
+
+
+def read_json_events(payload):
+    """Events of a parsed JSON body: an array, {"events": [...]} or a single event."""
+    yield from _expand(payload)
+
+
+def read_ndjson_events(lines):
+    """Events from NDJSON lines (str or bytes); an unparseable line yields a GateEventError."""
+    for number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield from _expand(json.loads(line))
+        except ValueError:
+            yield GateEventError(f"invalid JSON (line {number})")
+
+
+# ---- validation ----------------------------------------------------------------
+
+def parse_access_time(value) -> datetime:
+    """ISO 8601 string or Unix seconds -> naive UTC datetime."""
+    if isinstance(value, bool) or value in (None, ""):
+        raise GateEventError("access_time is required")
+    if isinstance(value, (int, float)):
+        try:
+            return datetime.fromtimestamp(value, tz=timezone.utc).replace(tzinfo=None)
+        except (OverflowError, OSError, ValueError):  # out of range, NaN or infinity
+            raise GateEventError(f"access_time {value} is not a valid Unix timestamp")
+    try:
+        parsed = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except ValueError:
+        raise GateEventError(f"access_time '{value}' is not ISO 8601 or Unix seconds")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _text_field(item, name):
+    """Optional scalar field as stripped text (None when absent); objects and arrays are rejected."""
+    value = item.get(name)
+    if value is None or value == "":
+        return None
+    if isinstance(value, (dict, list)):
+        raise GateEventError(f"{name} must be text")
+    return str(value).strip()
+
+
+def _event_row(item, plates, now) -> dict:
+    if isinstance(item, GateEventError):
+        raise item
+    if not isinstance(item, dict):
+        raise GateEventError("event must be a JSON object")
+
+    plate = normalize_plate(_text_field(item, "plate") or _text_field(item, "registration_number"))
+    if not plate:
+        raise GateEventError("plate is required")
+
+    access_type = (_text_field(item, "access_type") or "").lower()
+    if not access_type:
+        raise GateEventError("access_type is required")
+    gate_id = _text_field(item, "gate_id")
+    notes = _text_field(item, "notes")
+    for name, value in (("access_type", access_type), ("gate_id", gate_id), ("notes", notes)):
+        if value and len(value) > _TEXT_LIMITS[name]:
+            raise GateEventError(f"{name} is longer than {_TEXT_LIMITS[name]} characters")
+
+    return {
+        "id": str(uuid.uuid4()),
+        "vehicle_id": plates.get(plate),
+        "plate": plate,
+        "access_time": parse_access_time(item.get("access_time")),
+        "access_type": access_type,
+        "gate_id": gate_id,
+        "notes": notes,
+        "created_at": now,
+    }
+
+
+# ---- writing -------------------------------------------------------------------
+
+def ingest_events(events, batch_size=INGEST_BATCH_SIZE) -> dict:
+    """
+    Validate, resolve and bulk-insert an iterable of events, committing per batch.
+    Returns counts: received, inserted, matched (known vehicle), unmatched,
+    rejected, plus the first MAX_REPORTED_ERRORS errors.
+    """
+    counts = {"received": 0, "inserted": 0, "matched": 0, "unmatched": 0, "rejected": 0}
+    errors = []
+    events = iter(events)
+
+    while True:
+        batch = list(islice(events, batch_size))
+        if not batch:
+            break
+        plates = plate_map()
+        now = datetime.utcnow()
+
+        numbered = []
+        rejects = []
+        for offset, item in enumerate(batch):
+            try:
+                numbered.append((offset, _event_row(item, plates, now)))
+            except GateEventError as e:
+                rejects.append((offset, e))
+
+        # a dropped month keeps only its rollups; a late event would restart its raw table
+        dropped = dropped_months({month_key(row["access_time"]) for _, row in numbered})
+        rows = []
+        for offset, row in numbered:
+            key = month_key(row["access_time"])
+            if key in dropped:
+                rejects.append((offset, f"access_time falls in {month_label(key)}, whose raw events were dropped"))
+            else:
+                rows.append(row)
+
+        for offset, e in sorted(rejects, key=lambda reject: reject[0]):
+            counts["rejected"] += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(f"Event {counts['received'] + offset + 1}: {e}")
+        counts["received"] += len(batch)
+
+        if rows:
+            try:
+                write_events(rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            matched = sum(1 for row in rows if row["vehicle_id"])
+            counts["inserted"] += len(rows)
+            counts["matched"] += matched
+            counts["unmatched"] += len(rows) - matched
+
+    counts["errors"] = errors
+    return counts
+
+
+# ---- simulated feed ------------------------------------------------------------
+
+def simulated_events(count, unknown_share=0.2, gates=("main", "service"), end=None):
+    """
+    Synthetic gate traffic for load testing: registered plates (read once)
+    mixed with random visitor plates, one event per second up to `end`.
+    """
+    known = [plate for (plate,) in db.session.query(Vehicle.registration_number).all()]
+    end = end or datetime.utcnow()
+    start = end - timedelta(seconds=count)
+    for i in range(count):
+        if known and random.random() >= unknown_share:
+            plate = random.choice(known)
+        else:
+            plate = f"V{random.randint(0, 999999):06d}GP"
+        yield {
+            "plate": plate,
+            "access_time": (start + timedelta(seconds=i)).isoformat() + "Z",
+            "access_type": random.choice(("entry", "exit")),
+            "gate_id": random.choice(gates),
+        }
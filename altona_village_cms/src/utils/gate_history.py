@@ -0,0 +1,450 @@
+# src/utils/gate_history.py
+"""
+Time-partitioned gate access history.
+
+Raw events are written to one table per month, gate_access_logs_YYYYMM
+(same columns as GateAccessLog, indexed on (access_time) and
+(vehicle_id, access_time)). The layout is the same on PostgreSQL and
+SQLite, so a month is retired with a plain DROP TABLE, optionally after
+archiving it to a gzipped NDJSON file that `flask ingest-gate-events` can
+load again.
+
+Ingestion queues every hour it wrote to (gate_access_pending_hours). The
+rollup job (`flask gate-rollup-worker`) recounts those hours from the raw
+table into gate_access_rollups (per gate) and gate_vehicle_rollups (per
+plate), then the days they fall in from the hourly rows. Recounting makes
+the job idempotent and picks up late events for old hours. Dashboards and
+"last seen" read only the rollups, which are kept when raw months are
+dropped. Dropped months are recorded in gate_access_partitions and events
+for them are rejected, since recounting from a fresh raw table would
+replace the counts they already have.
+
+Month tables are created with CREATE TABLE IF NOT EXISTS, and the rollup
+worker creates the current and next month ahead of time, so concurrent
+ingest requests do not race to create a new month.
+"""
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from itertools import groupby
+
+from flask import current_app
+from sqlalchemy import Column, Index, MetaData, Table, event, func, literal, literal_column, select, DateTime
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from src.models.user import db, GateAccessLog
+from src.models.gate_access import GateAccessRollup, GateVehicleRollup, GateAccessPendingHour, GateAccessPartition
+
+SHARD_PREFIX = "gate_access_logs_"
+
+# Pending hours recounted per job run (one transaction)
+ROLLUP_BATCH_HOURS = 500
+
+# Rows moved or archived per round trip
+COPY_BATCH_SIZE = 5000
+
+MAX_ROLLUP_ROWS = 5000
+
+_SHARD_NAME = re.compile(r"^gate_access_logs_(\d{4})(\d{2})$")
+
+_lock = threading.Lock()
+_metadata = MetaData()
+_created = set()  # shard tables known to exist (this process)
+
+
+class GateHistoryError(ValueError):
+    """A partition operation that would lose data."""
+
+
+# ---- months and shards ----------------------------------------------------------
+
+def month_key(moment) -> str:
+    return f"{moment.year:04d}{moment.month:02d}"
+
+
+def parse_month(value) -> str:
+    """'2025-08' / '202508' -> '202508'; raises GateHistoryError otherwise."""
+    match = re.fullmatch(r"(\d{4})-?(\d{2})", (value or "").strip())
+    if not match or not 1 <= int(match.group(2)) <= 12:
+        raise GateHistoryError(f"Month '{value}' is not YYYY-MM")
+    return match.group(1) + match.group(2)
+
+
+def hour_start(moment) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def shard_table(key) -> Table:
+    """Table object for one month (not necessarily created yet)."""
+    name = SHARD_PREFIX + key
+    with _lock:
+        table = _metadata.tables.get(name)
+        if table is None:
+            # the model's columns without the vehicles foreign key: history outlives vehicles
+            columns = [
+                Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+                for c in GateAccessLog.__table__.columns
+            ]
+            table = Table(
+                name, _metadata, *columns,
+                Index(f"ix_{name}_access_time", "access_time"),
+                Index(f"ix_{name}_vehicle_time", "vehicle_id", "access_time"),
+            )
+    return table
+
+
+def month_label(key) -> str:
+    return f"{key[:4]}-{key[4:]}"
+
+
+def ensure_shard(key) -> Table:
+    """
+    The month's table, created (with its indexes) in the current transaction
+    on first use. IF NOT EXISTS plus a savepoint keep two workers creating the
+    same month from failing each other's batch.
+    """
+    table = shard_table(key)
+    if table.name not in _created:
+        connection = db.session.connection()
+        try:
+            with db.session.begin_nested():
+                connection.execute(CreateTable(table, if_not_exists=True))
+                for index in table.indexes:
+                    connection.execute(CreateIndex(index, if_not_exists=True))
+        except DBAPIError:
+            # PostgreSQL can still report a duplicate when the other CREATE commits
+            # first; that is fine as long as the table is there now
+            if not db.inspect(connection).has_table(table.name):
+                raise
+        with _lock:
+            _created.add(table.name)
+    return table
+
+
+def ensure_upcoming_shards(now=None) -> None:
+    """Create this and next month's tables ahead of the events that need them (commits)."""
+    now = now or datetime.utcnow()
+    next_month = (now.replace(day=1) + timedelta(days=32)).replace(day=1)
+    for key in (month_key(now), month_key(next_month)):
+        ensure_shard(key)
+    db.session.commit()
+
+
+def dropped_months(keys) -> set:
+    """The given month keys whose raw table has been dropped."""
+    keys = list(keys)
+    if not keys:
+        return set()
+    table = GateAccessPartition.__table__
+    return set(db.session.execute(select(table.c.month).where(table.c.month.in_(keys))).scalars())
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_created_shards(session):
+    # a rolled-back CREATE TABLE must be checked again
+    with _lock:
+        _created.clear()
+
+
+def list_shards() -> list:
+    """Month keys ('YYYYMM') that have a raw table, oldest first."""
+    names = db.inspect(db.engine).get_table_names()
+    return sorted(m.group(1) + m.group(2) for m in map(_SHARD_NAME.match, names) if m)
+
+
+def _existing_shard(key, shards=None):
+    """The month's table if it exists; shards (month keys) overrides the lookup when given."""
+    if shards is None:
+        exists = SHARD_PREFIX + key in _created or key in list_shards()
+    else:
+        exists = key in shards
+    return shard_table(key) if exists else None
+
+
+# ---- writing -------------------------------------------------------------------
+
+def _upsert_pending(rows):
+    table = GateAccessPendingHour.__table__
+    dialect = db.engine.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = (postgresql if dialect == "postgresql" else sqlite).insert(table)
+        stmt = insert.on_conflict_do_update(
+            index_elements=[table.c.hour], set_={"marked_at": insert.excluded.marked_at}
+        )
+        db.session.execute(stmt, rows)
+        return
+
+    hours = [row["hour"] for row in rows]
+    existing = set(db.session.execute(select(table.c.hour).where(table.c.hour.in_(hours))).scalars())
+    for row in rows:
+        if row["hour"] in existing:
+            db.session.execute(table.update().where(table.c.hour == row["hour"]).values(marked_at=row["marked_at"]))
+        else:
+            db.session.execute(table.insert().values(**row))
+
+
+def write_events(rows) -> None:
+    """
+    Insert event rows (dicts of GateAccessLog columns) into their monthly
+    tables and queue their hours for rollup, in the current session (no commit).
+    Raises GateHistoryError if any row falls in a dropped month (see dropped_months).
+    """
+    rows = sorted(rows, key=lambda row: row["access_time"])
+    dropped = dropped_months({month_key(row["access_time"]) for row in rows})
+    if dropped:
+        raise GateHistoryError(
+            f"Raw events for {', '.join(sorted(map(month_label, dropped)))} were dropped; "
+            "only the rollups remain"
+        )
+    for key, month_rows in groupby(rows, key=lambda row: month_key(row["access_time"])):
+        db.session.execute(ensure_shard(key).insert(), list(month_rows))
+
+    now = datetime.utcnow()
+    hours = sorted({hour_start(row["access_time"]) for row in rows})
+    if hours:
+        _upsert_pending([{"hour": hour, "marked_at": now} for hour in hours])
+
+
+def move_unpartitioned_events() -> int:
+    """Move rows from the original gate_access_logs table into the monthly tables."""
+    table = GateAccessLog.__table__
+    if not db.inspect(db.engine).has_table(table.name):
+        return 0
+
+    moved = 0
+    while True:
+        batch = [dict(row) for row in db.session.execute(
+            table.select().order_by(table.c.access_time).limit(COPY_BATCH_SIZE)
+        ).mappings()]
+        if not batch:
+            break
+        write_events(batch)
+        db.session.execute(table.delete().where(table.c.id.in_([row["id"] for row in batch])))
+        db.session.commit()
+        moved += len(batch)
+    return moved
+
+
+# ---- rollups -------------------------------------------------------------------
+
+def _recount_hour(hour, shards) -> None:
+    end = hour + timedelta(hours=1)
+    gates, vehicles = GateAccessRollup.__table__, GateVehicleRollup.__table__
+
+    shard = _existing_shard(month_key(hour), shards)
+    if shard is None:
+        # raw month already dropped: keep the counts we have
+        return
+
+    for table in (gates, vehicles):
+        db.session.execute(table.delete().where(table.c.grain == "hour", table.c.bucket == hour))
+
+    in_hour = (shard.c.access_time >= hour, shard.c.access_time < end)
+    bucket = literal(hour, DateTime)
+    # literal '' rather than a bind parameter, so PostgreSQL sees the same GROUP BY expression
+    gate = func.coalesce(shard.c.gate_id, literal_column("''"))
+    plate = func.coalesce(shard.c.plate, literal_column("''"))
+
+    db.session.execute(gates.insert().from_select(
+        ["grain", "bucket", "gate_id", "access_type", "count"],
+        select(literal("hour"), bucket, gate, shard.c.access_type, func.count())
+        .where(*in_hour).group_by(gate, shard.c.access_type),
+    ))
+    db.session.execute(vehicles.insert().from_select(
+        ["grain", "bucket", "plate", "access_type", "vehicle_id", "count", "first_seen", "last_seen"],
+        select(
+            literal("hour"), bucket, plate, shard.c.access_type, func.max(shard.c.vehicle_id),
+            func.count(), func.min(shard.c.access_time), func.max(shard.c.access_time),
+        )
+        .where(*in_hour).group_by(plate, shard.c.access_type),
+    ))
+
+
+def _recount_day(day) -> None:
+    end = day + timedelta(days=1)
+    gates, vehicles = GateAccessRollup.__table__, GateVehicleRollup.__table__
+    bucket = literal(day, DateTime)
+
+    for table in (gates, vehicles):
+        db.session.execute(table.delete().where(table.c.grain == "day", table.c.bucket == day))
+
+    db.session.execute(gates.insert().from_select(
+        ["grain", "bucket", "gate_id", "access_type", "count"],
+        select(literal("day"), bucket, gates.c.gate_id, gates.c.access_type, func.sum(gates.c.count))
+        .where(gates.c.grain == "hour", gates.c.bucket >= day, gates.c.bucket < end)
+        .group_by(gates.c.gate_id, gates.c.access_type),
+    ))
+    db.session.execute(vehicles.insert().from_select(
+        ["grain", "bucket", "plate", "access_type", "vehicle_id", "count", "first_seen", "last_seen"],
+        select(
+            literal("day"), bucket, vehicles.c.plate, vehicles.c.access_type, func.max(vehicles.c.vehicle_id),
+            func.sum(vehicles.c.count), func.min(vehicles.c.first_seen), func.max(vehicles.c.last_seen),
+        )
+        .where(vehicles.c.grain == "hour", vehicles.c.bucket >= day, vehicles.c.bucket < end)
+        .group_by(vehicles.c.plate, vehicles.c.access_type),
+    ))
+
+
+def run_rollups(max_hours=ROLLUP_BATCH_HOURS) -> dict:
+    """Recount up to max_hours pending hours (and their days) in one transaction."""
+    table = GateAccessPendingHour.__table__
+    pending = db.session.execute(
+        select(table.c.hour, table.c.marked_at).order_by(table.c.hour).limit(max_hours)
+    ).all()
+    if not pending:
+        return {"hours": 0, "days": 0}
+
+    try:
+        # a table recreated for a dropped month holds only late events; never recount from it
+        shards = set(list_shards()) - dropped_months({month_key(hour) for hour, _ in pending})
+        for hour, _ in pending:
+            _recount_hour(hour, shards)
+        days = sorted({hour.replace(hour=0) for hour, _ in pending})
+        for day in days:
+            _recount_day(day)
+
+        # an hour marked again meanwhile stays queued for the next run
+        db.session.execute(
+            table.delete().where(
+                table.c.hour == db.bindparam("p_hour"), table.c.marked_at == db.bindparam("p_marked_at")
+            ),
+            [{"p_hour": hour, "p_marked_at": marked_at} for hour, marked_at in pending],
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return {"hours": len(pending), "days": len(days)}
+
+
+def pending_rollup_hours() -> int:
+    return db.session.query(func.count()).select_from(GateAccessPendingHour).scalar() or 0
+
+
+def run_rollup_worker(poll_interval=60.0, once=False) -> None:
+    """
+    Keep the rollups current: drain the pending hours, then poll.
+    With once=True, return when nothing is pending. Must run inside an app context.
+    """
+    current_app.logger.info("Gate rollup worker started")
+    while True:
+        # a no-op once this process has seen the tables; picks up the new month when it turns
+        ensure_upcoming_shards()
+        result = run_rollups()
+        if result["hours"]:
+            current_app.logger.info("Rolled up %s hour(s) over %s day(s)", result["hours"], result["days"])
+            continue
+        if once:
+            return
+        db.session.remove()
+        time.sleep(poll_interval)
+
+
+# ---- reading -------------------------------------------------------------------
+
+def rollup_rows(by, grain, start, end, gate_id=None, plate=None, access_type=None, limit=MAX_ROLLUP_ROWS) -> list:
+    """
+    Rollup rows for [start, end), ordered by bucket.
+    by: 'gate' (per gate) or 'vehicle' (per plate); grain: 'hour' or 'day'.
+    """
+    model = GateAccessRollup if by == "gate" else GateVehicleRollup
+    query = model.query.filter(model.grain == grain, model.bucket >= start, model.bucket < end)
+    if gate_id is not None and by == "gate":
+        query = query.filter(model.gate_id == gate_id)
+    if plate and by == "vehicle":
+        query = query.filter(model.plate == plate)
+    if access_type:
+        query = query.filter(model.access_type == access_type)
+    sort = [model.bucket, model.gate_id] if by == "gate" else [model.bucket, model.plate]
+    return [row.to_dict() for row in query.order_by(*sort, model.access_type).limit(limit)]
+
+
+def last_seen(plate):
+    """Latest rolled-up sighting of a normalized plate, or None."""
+    row = (
+        GateVehicleRollup.query
+        .filter(GateVehicleRollup.plate == plate, GateVehicleRollup.grain == "hour")
+        .order_by(GateVehicleRollup.bucket.desc(), GateVehicleRollup.last_seen.desc())
+        .first()
+    )
+    if row is None:
+        return None
+    return {
+        "plate": row.plate,
+        "vehicle_id": row.vehicle_id,
+        "last_seen": row.last_seen.isoformat() if row.last_seen else None,
+        "access_type": row.access_type,
+    }
+
+
+# ---- retention -----------------------------------------------------------------
+
+def partition_info(key, with_count=False) -> dict:
+    info = {"month": month_label(key), "table": SHARD_PREFIX + key}
+    if with_count:
+        info["rows"] = db.session.execute(select(func.count()).select_from(shard_table(key))).scalar()
+    return info
+
+
+def _archive(table, path) -> int:
+    written = 0
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        result = db.session.execute(
+            table.select().order_by(table.c.access_time).execution_options(yield_per=COPY_BATCH_SIZE)
+        ).mappings()
+        for row in result:
+            item = {
+                "plate": row["plate"],
+                "access_time": row["access_time"].isoformat() + "Z",
+                "access_type": row["access_type"],
+                "gate_id": row["gate_id"],
+                "notes": row["notes"],
+            }
+            f.write(json.dumps(item) + "\n")
+            written += 1
+    return written
+
+
+def drop_partition(key, archive_dir=None) -> dict:
+    """
+    Drop one raw month (rollups are kept), archiving it first to
+    archive_dir/gate_access_logs_YYYYMM.ndjson.gz when given. Refuses the
+    current month and months with hours not rolled up yet. The month is
+    recorded in gate_access_partitions, and later events for it are
+    rejected so its rolled-up counts are never recounted from partial data.
+    """
+    if key >= month_key(datetime.utcnow()):
+        raise GateHistoryError("Only months before the current one can be dropped")
+    table = _existing_shard(key)
+    if table is None:
+        raise GateHistoryError(f"No raw table for {month_label(key)}")
+
+    start = datetime(int(key[:4]), int(key[4:]), 1)
+    end = (start + timedelta(days=32)).replace(day=1)
+    pending = GateAccessPendingHour.__table__
+    waiting = db.session.execute(
+        select(func.count()).where(pending.c.hour >= start, pending.c.hour < end)
+    ).scalar()
+    if waiting:
+        raise GateHistoryError(f"{waiting} hour(s) of {month_label(key)} are not rolled up yet")
+
+    info = partition_info(key)
+    if archive_dir:
+        os.makedirs(archive_dir, exist_ok=True)
+        path = os.path.join(archive_dir, f"{table.name}.ndjson.gz")
+        info["archived"] = _archive(table, path)
+        info["archive"] = path
+    table.drop(bind=db.session.connection(), checkfirst=True)
+    db.session.merge(GateAccessPartition(month=key, dropped_at=datetime.utcnow(), archive=info.get("archive")))
+    db.session.commit()
+    with _lock:
+        _created.discard(table.name)
+        _metadata.remove(table)
+    return info
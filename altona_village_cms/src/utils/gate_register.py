@@ -0,0 +1,269 @@
+# src/utils/gate_register.py
+"""
+Set-based loading for the gate register.
+
+Every gate register view (JSON register, CSV export, pending-change reports)
+needs the same data: each user with their Resident/Owner rows and vehicle
+registrations. Loading that user by user costs several round trips per
+household; the helpers here load it in a fixed number of queries no matter
+how many residents the estate has.
+
+The register itself is also materialized in gate_register_entries (see
+src/models/gate_register.py). Code that changes a household calls
+mark_gate_register_dirty(user_id); the affected rows are refreshed inside the
+same transaction when the session commits.
+"""
+import json
+from collections import defaultdict
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import event, or_
+from sqlalchemy.orm import Session
+
+from src.models.user import db, User, Vehicle, with_household
+from src.models.gate_register import GateRegisterEntry
+from src.utils.search import build_search_text, bump_search_version
+
+ACTIVE_STATUSES = ("active", "approved")
+
+
+def is_active_status(model_obj) -> bool:
+    """
+    Treat missing/None status as active to be permissive.
+    Works for Resident/Owner models that may or may not have a 'status' column.
+    """
+    status = getattr(model_obj, "status", None)
+    if status is None:
+        return True
+    return status in ACTIVE_STATUSES
+
+
+def status_label(resident, owner) -> str | None:
+    """Gate register label for a household, or None if it has no person records."""
+    if resident and owner:
+        return "Owner-Resident"
+    if resident:
+        return "Resident"
+    if owner:
+        return "Owner"
+    return None
+
+
+def _vehicle_regs_by_holder(residents, owners):
+    """
+    Fetch registrations for all given Resident/Owner rows in one query.
+    Returns (by_resident_id, by_owner_id), each a dict of id -> [registration_number].
+    """
+    by_resident = defaultdict(list)
+    by_owner = defaultdict(list)
+
+    resident_ids = [r.id for r in residents]
+    owner_ids = [o.id for o in owners]
+    if not resident_ids and not owner_ids:
+        return by_resident, by_owner
+
+    conditions = []
+    if resident_ids:
+        conditions.append(Vehicle.resident_id.in_(resident_ids))
+    if owner_ids:
+        conditions.append(Vehicle.owner_id.in_(owner_ids))
+
+    rows = (
+        db.session.query(Vehicle.resident_id, Vehicle.owner_id, Vehicle.registration_number)
+        .filter(or_(*conditions))
+        .all()
+    )
+    for resident_id, owner_id, reg in rows:
+        if resident_id:
+            by_resident[resident_id].append(reg)
+        if owner_id:
+            by_owner[owner_id].append(reg)
+
+    return by_resident, by_owner
+
+
+def load_gate_households(statuses=ACTIVE_STATUSES, user_ids=None, active_records_only=True,
+                         include_admins=False):
+    """
+    Load gate register households in two queries (users joined to their
+    Resident/Owner rows, then all their vehicles).
+
+    statuses:            User.status values to include (None = any status)
+    user_ids:            optional restriction to these user ids
+    active_records_only: skip households whose Resident/Owner row is not active/approved
+    include_admins:      keep admin accounts (skipped by default)
+
+    Users without a Resident/Owner row are always skipped.
+    Returns a list of dicts with keys: user, resident, owner, primary,
+    status_label, vehicle_registrations. Vehicles come from the resident
+    record when there is one, else from the owner record.
+    """
+    if user_ids is not None and not user_ids:
+        return []
+
+    q = User.query.options(*with_household())
+    if statuses is not None:
+        q = q.filter(User.status.in_(list(statuses)))
+    if user_ids is not None:
+        q = q.filter(User.id.in_(list(user_ids)))
+
+    candidates = []
+    for user in q.all():
+        if user.role == "admin" and not include_admins:
+            continue
+
+        resident = user.resident
+        owner = user.owner
+        label = status_label(resident, owner)
+        if not label:
+            continue
+
+        if active_records_only:
+            if resident and not is_active_status(resident):
+                continue
+            if owner and not is_active_status(owner):
+                continue
+
+        candidates.append((user, resident, owner, label))
+
+    by_resident, by_owner = _vehicle_regs_by_holder(
+        [r for _, r, _, _ in candidates if r],
+        [o for _, r, o, _ in candidates if o and not r],
+    )
+
+    households = []
+    for user, resident, owner, label in candidates:
+        if resident:
+            regs = list(by_resident.get(resident.id, []))
+        else:
+            regs = list(by_owner.get(owner.id, []))
+
+        households.append({
+            "user": user,
+            "resident": resident,
+            "owner": owner,
+            "primary": resident or owner,
+            "status_label": label,
+            "vehicle_registrations": regs,
+        })
+
+    return households
+
+
+# ---------------------------- snapshot table ---------------------------------
+
+_DIRTY_KEY = "gate_register_dirty"
+_CHANGED_KEY = "gate_register_changed"
+
+
+def _snapshot_row(h, now):
+    user = h["user"]
+    primary = h["primary"]
+    row = {
+        "user_id": user.id,
+        "user_status": user.status,
+        "records_active": all(
+            is_active_status(rec) for rec in (h["resident"], h["owner"]) if rec
+        ),
+        "resident_status": h["status_label"],
+        "first_name": primary.first_name or "",
+        "last_name": primary.last_name or "",
+        "email": user.email,
+        "phone_number": primary.phone_number or "",
+        "street_number": primary.street_number or "",
+        "street_name": primary.street_name or "",
+        "full_address": primary.full_address or "",
+        "erf_number": primary.erf_number or "",
+        "intercom_code": primary.intercom_code or "",
+        "vehicle_registrations": json.dumps(h["vehicle_registrations"]),
+        "sort_key": (primary.street_name or "").upper(),
+        "refreshed_at": now,
+    }
+    row["search_text"] = build_search_text(row)
+    return row
+
+
+def refresh_gate_register(user_ids) -> int:
+    """
+    Recompute the snapshot rows for the given users in the current session
+    (no commit). Users that no longer qualify simply lose their row.
+    """
+    user_ids = [str(uid) for uid in set(user_ids) if uid]
+    if not user_ids:
+        return 0
+
+    table = GateRegisterEntry.__table__
+    db.session.execute(table.delete().where(table.c.user_id.in_(user_ids)))
+
+    households = load_gate_households(statuses=None, user_ids=user_ids, active_records_only=False)
+    now = datetime.utcnow()
+    rows = [_snapshot_row(h, now) for h in households]
+    if rows:
+        db.session.execute(table.insert(), rows)
+    db.session.info[_CHANGED_KEY] = True
+    return len(rows)
+
+
+def rebuild_gate_register() -> int:
+    """Rebuild the whole snapshot in the current session (no commit)."""
+    table = GateRegisterEntry.__table__
+    db.session.execute(table.delete())
+
+    households = load_gate_households(statuses=None, active_records_only=False)
+    now = datetime.utcnow()
+    rows = [_snapshot_row(h, now) for h in households]
+    if rows:
+        db.session.execute(table.insert(), rows)
+    db.session.info[_CHANGED_KEY] = True
+    return len(rows)
+
+
+def mark_gate_register_dirty(*user_ids) -> None:
+    """Queue users whose gate register row must be refreshed on the next commit."""
+    dirty = db.session.info.setdefault(_DIRTY_KEY, set())
+    dirty.update(str(uid) for uid in user_ids if uid)
+
+
+@event.listens_for(Session, "before_commit")
+def _refresh_dirty_gate_register(session):
+    dirty = session.info.pop(_DIRTY_KEY, None)
+    if not dirty:
+        return
+    try:
+        with session.begin_nested():
+            refresh_gate_register(dirty)
+    except Exception:
+        # Never block the caller's commit; `flask rebuild-gate-register` repairs drift
+        current_app.logger.exception("Gate register refresh failed for %s user(s)", len(dirty))
+
+
+@event.listens_for(Session, "after_commit")
+def _gate_register_committed(session):
+    # the search index reads the snapshot; reload it once the new rows are visible
+    if session.info.pop(_CHANGED_KEY, None):
+        bump_search_version()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty_gate_register(session):
+    session.info.pop(_DIRTY_KEY, None)
+    session.info.pop(_CHANGED_KEY, None)
+
+
+def gate_register_snapshot_query(statuses=ACTIVE_STATUSES, active_records_only=True):
+    """
+    Query over the materialized gate register, ordered by street (sort_key).
+    Same filters as load_gate_households(). Exports iterate it with yield_per().
+    """
+    q = GateRegisterEntry.query
+    if statuses is not None:
+        q = q.filter(GateRegisterEntry.user_status.in_(list(statuses)))
+    if active_records_only:
+        q = q.filter(GateRegisterEntry.records_active.is_(True))
+    return q.order_by(GateRegisterEntry.sort_key, GateRegisterEntry.user_id)
+
+
+def load_gate_register_snapshot(statuses=ACTIVE_STATUSES, active_records_only=True):
+    """Read the materialized gate register as a list (see gate_register_snapshot_query)."""
+    return gate_register_snapshot_query(statuses, active_records_only).all()
@@ -0,0 +1,170 @@
+# src/utils/metrics.py
+"""
+Per-request instrumentation.
+
+Every request records its SQL statement count, time spent in SQL, total
+handling time and response size. The numbers are:
+  - returned to the client in a Server-Timing header (visible in the
+    browser dev tools' network tab),
+  - logged as one JSON line per request on the "src.metrics" logger,
+  - kept per route (the last METRICS_SAMPLE_SIZE requests) for
+    GET /api/admin/metrics, which reports percentiles.
+
+Samples live in process memory, so each gunicorn worker reports its own.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("src.metrics")
+
+# Requests remembered per route for the percentile report
+METRICS_SAMPLE_SIZE = 500
+
+PERCENTILES = (50, 90, 95, 99)
+
+_lock = threading.Lock()
+_routes = {}  # "GET /api/admin/residents" -> {"count", "errors", "samples": deque}
+_started_at = time.time()
+
+
+# ---- SQL hooks ---------------------------------------------------------------
+# Installed by init_metrics(), so METRICS_ENABLED=0 leaves every query untouched.
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("_metrics_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if has_request_context() and "_metrics" in g:
+        g._metrics["sql_count"] += 1
+        g._metrics["sql_seconds"] += elapsed
+
+
+# ---- request hooks -------------------------------------------------------------
+
+def _route_key():
+    rule = request.url_rule.rule if request.url_rule else "<unmatched>"
+    return f"{request.method} {rule}"
+
+
+def _start_request():
+    g._metrics = {"start": time.perf_counter(), "sql_count": 0, "sql_seconds": 0.0}
+
+
+def _finish_request(response):
+    metrics = g.pop("_metrics", None)
+    if metrics is None or request.method == "OPTIONS":
+        return response
+
+    total_ms = (time.perf_counter() - metrics["start"]) * 1000
+    sql_ms = metrics["sql_seconds"] * 1000
+    size = None if response.is_streamed else response.calculate_content_length()
+
+    response.headers.add(
+        "Server-Timing",
+        f'db;dur={sql_ms:.1f};desc="{metrics["sql_count"]} queries", app;dur={total_ms:.1f}',
+    )
+
+    key = _route_key()
+    record(key, total_ms, metrics["sql_count"], sql_ms, size, response.status_code)
+    logger.info(json.dumps({
+        "event": "request",
+        "route": key,
+        "path": request.path,
+        "status": response.status_code,
+        "duration_ms": round(total_ms, 1),
+        "sql_count": metrics["sql_count"],
+        "sql_ms": round(sql_ms, 1),
+        "response_bytes": size,
+    }))
+    return response
+
+
+def init_metrics(app) -> None:
+    """Install the request hooks and the SQL hooks (the latter are global to all engines)."""
+    for name, hook in (("before_cursor_execute", _before_cursor_execute),
+                       ("after_cursor_execute", _after_cursor_execute)):
+        if not event.contains(Engine, name, hook):
+            event.listen(Engine, name, hook)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+
+# ---- aggregation ---------------------------------------------------------------
+
+def record(route, total_ms, sql_count, sql_ms, size, status) -> None:
+    with _lock:
+        stats = _routes.get(route)
+        if stats is None:
+            stats = _routes[route] = {
+                "count": 0, "errors": 0, "samples": deque(maxlen=METRICS_SAMPLE_SIZE),
+            }
+        stats["count"] += 1
+        if status >= 500:
+            stats["errors"] += 1
+        # size is None for streamed responses (exports); those are left out of response_bytes
+        stats["samples"].append((total_ms, sql_count, sql_ms, size))
+
+
+def _percentiles(values):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    out = {}
+    for p in PERCENTILES:
+        # nearest-rank percentile
+        index = max(0, -(-p * len(ordered) // 100) - 1)
+        out[f"p{p}"] = round(ordered[index], 1)
+    out["max"] = round(ordered[-1], 1)
+    return out
+
+
+def metrics_snapshot() -> dict:
+    """Per-route summary of the recorded samples, slowest p95 first."""
+    with _lock:
+        routes = {
+            key: (stats["count"], stats["errors"], list(stats["samples"]))
+            for key, stats in _routes.items()
+        }
+
+    report = []
+    for key, (count, errors, samples) in routes.items():
+        if not samples:
+            continue
+        report.append({
+            "route": key,
+            "count": count,
+            "errors": errors,
+            "sampled": len(samples),
+            "duration_ms": _percentiles([s[0] for s in samples]),
+            "sql_count": _percentiles([s[1] for s in samples]),
+            "sql_ms": _percentiles([s[2] for s in samples]),
+            "response_bytes": _percentiles([s[3] for s in samples if s[3] is not None]),
+        })
+    report.sort(key=lambda r: r["duration_ms"]["p95"], reverse=True)
+
+    return {
+        "pid": os.getpid(),
+        "since": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(_started_at)),
+        "sample_size": METRICS_SAMPLE_SIZE,
+        "routes": report,
+    }
+
+
+def reset_metrics() -> None:
+    global _started_at
+    with _lock:
+        _routes.clear()
+        _started_at = time.time()
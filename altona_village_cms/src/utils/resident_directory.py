@@ -0,0 +1,201 @@
+# src/utils/resident_directory.py
+"""
+Admin resident directory: one row per user with a Resident and/or Owner
+record, filtered, sorted and paged in the database.
+
+A page is a single statement: the page of users (keyset-limited) is a
+subquery, outer-joined to their vehicles, so the cost per page does not grow
+with the estate. Each row carries the resident record's details, or the
+owner's when there is no resident record (same shape as the legacy
+/api/admin/residents list).
+"""
+import base64
+import json
+
+from sqlalchemy import and_, case, func, or_, select, tuple_
+from sqlalchemy.orm import aliased
+
+from src.models.user import db, User, Resident, Owner, Vehicle
+
+SORT_KEYS = ("street", "surname", "erf")
+TYPE_FILTERS = ("tenant", "owner", "owner-resident")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+_DETAIL_COLUMNS = (
+    "id", "first_name", "last_name", "phone_number", "emergency_contact_name",
+    "emergency_contact_number", "id_number", "erf_number", "street_number",
+    "street_name", "full_address", "intercom_code",
+)
+_VEHICLE_COLUMNS = ("id", "registration_number", "make", "model", "color", "status")
+
+
+def encode_cursor(sort, order, values) -> str:
+    payload = [sort, order] + list(values)
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor, sort, order):
+    """Sort-key values of the last row seen; raises ValueError on a malformed or mismatched cursor."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(payload, list) or payload[:2] != [sort, order]:
+        raise ValueError("Cursor does not match the requested sort")
+    return payload[2:]
+
+
+def _base_query(filters):
+    r = aliased(Resident, name="dir_resident")
+    o = aliased(Owner, name="dir_owner")
+
+    def pick(name):
+        # resident details win; owner details for non-resident owners
+        return case((r.id.isnot(None), getattr(r, name)), else_=getattr(o, name))
+
+    detail = {name: pick(name) for name in _DETAIL_COLUMNS}
+
+    def text(name):
+        return func.coalesce(detail[name], "")
+
+    sort_exprs = {
+        "street": [func.lower(text("street_name")), func.length(text("street_number")), text("street_number")],
+        "surname": [func.lower(text("last_name")), func.lower(text("first_name"))],
+        "erf": [func.length(text("erf_number")), text("erf_number")],
+    }[filters["sort"]] + [User.id]
+
+    q = (
+        select(
+            User.id.label("user_id"),
+            User.email,
+            User.status,
+            User.archived,
+            User.created_at,
+            r.id.label("resident_id"),
+            o.id.label("owner_id"),
+            *[expr.label(f"d_{name}") for name, expr in detail.items()],
+        )
+        .select_from(User)
+        .outerjoin(r, r.user_id == User.id)
+        .outerjoin(o, o.user_id == User.id)
+        .where(or_(r.id.isnot(None), o.id.isnot(None)))
+    )
+
+    if filters.get("status"):
+        q = q.where(User.status.in_(filters["status"]))
+    # archived flag or the archived status, as the admin UI has always treated it
+    is_archived = or_(User.archived.is_(True), User.status == "archived")
+    if filters.get("archived") is True:
+        q = q.where(is_archived)
+    elif filters.get("archived") is False:
+        q = q.where(~is_archived)
+
+    kind = filters.get("type")
+    if kind == "tenant":
+        q = q.where(r.id.isnot(None), o.id.is_(None))
+    elif kind == "owner":
+        q = q.where(o.id.isnot(None), r.id.is_(None))
+    elif kind == "owner-resident":
+        q = q.where(r.id.isnot(None), o.id.isnot(None))
+
+    for term in (filters.get("q") or "").lower().split():
+        pattern = f"%{term}%"
+        q = q.where(or_(
+            func.lower(User.email).like(pattern),
+            *[func.lower(text(name)).like(pattern)
+              for name in ("first_name", "last_name", "erf_number", "phone_number", "full_address")],
+        ))
+
+    return q, sort_exprs
+
+
+def count_directory(filters) -> int:
+    q, _ = _base_query(filters)
+    return db.session.execute(select(func.count()).select_from(q.subquery())).scalar() or 0
+
+
+def _row_dict(row):
+    is_resident = row.resident_id is not None
+    is_owner = row.owner_id is not None
+    if is_resident and is_owner:
+        kind = "owner-resident"
+    elif is_owner:
+        kind = "owner"
+    else:
+        kind = "tenant"
+
+    out = {
+        "user_id": row.user_id,
+        "email": row.email,
+        "status": row.status,
+        "archived": bool(row.archived),
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "is_resident": is_resident,
+        "is_owner": is_owner,
+        "tenant_or_owner": kind,
+    }
+    for name in _DETAIL_COLUMNS:
+        value = getattr(row, f"d_{name}")
+        out[name] = value if name == "id" else (value or "")
+    out["vehicles"] = []
+    return out
+
+
+def directory_page(filters, after=None, limit=None):
+    """
+    One page of the directory.
+    filters: sort ('street'|'surname'|'erf'), order ('asc'|'desc') and the
+    optional status (list), archived (bool), type and q filters.
+    after: sort-key values from decode_cursor(), or None for the first page.
+    limit: page size, or None for every matching row.
+    Returns (rows, next_cursor).
+    """
+    q, sort_exprs = _base_query(filters)
+    descending = filters.get("order") == "desc"
+
+    if after is not None:
+        if len(after) != len(sort_exprs):
+            raise ValueError("Cursor does not match the requested sort")
+        position = tuple_(*sort_exprs)
+        q = q.where(position < tuple_(*after) if descending else position > tuple_(*after))
+
+    keys = [expr.label(f"sk{i}") for i, expr in enumerate(sort_exprs)]
+    q = q.add_columns(*keys).order_by(*[k.desc() if descending else k for k in sort_exprs])
+    if limit is not None:
+        q = q.limit(limit + 1)
+    page = q.subquery("page")
+
+    sort_cols = [page.c[f"sk{i}"] for i in range(len(sort_exprs))]
+    stmt = (
+        select(page, *[getattr(Vehicle, name).label(f"v_{name}") for name in _VEHICLE_COLUMNS])
+        .outerjoin(Vehicle, or_(
+            and_(page.c.resident_id.isnot(None), Vehicle.resident_id == page.c.resident_id),
+            and_(page.c.owner_id.isnot(None), Vehicle.owner_id == page.c.owner_id),
+        ))
+        .order_by(
+            *[c.desc() if descending else c for c in sort_cols],
+            # resident vehicles before owner vehicles, as in the legacy list
+            case((Vehicle.resident_id == page.c.resident_id, 0), else_=1),
+            Vehicle.created_at,
+            Vehicle.id,
+        )
+    )
+
+    rows, positions = [], []
+    by_user = {}
+    for row in db.session.execute(stmt):
+        entry = by_user.get(row.user_id)
+        if entry is None:
+            entry = by_user[row.user_id] = _row_dict(row)
+            rows.append(entry)
+            positions.append([getattr(row, f"sk{i}") for i in range(len(sort_exprs))])
+        if row.v_id is not None:
+            entry["vehicles"].append({name: getattr(row, f"v_{name}") or "" for name in _VEHICLE_COLUMNS})
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(filters["sort"], filters.get("order", "asc"), positions[limit - 1])
+    return rows, next_cursor
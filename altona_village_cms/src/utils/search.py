@@ -0,0 +1,336 @@
+# src/utils/search.py
+"""
+Admin search over households: names, ERF numbers, street addresses, phone
+numbers and vehicle plates.
+
+The searchable rows are the gate register snapshot (gate_register_entries,
+one row per household, refreshed whenever a household changes). Each row
+carries a search_text column of normalized words built by
+build_search_text().
+
+On PostgreSQL with pg_trgm the query runs in the database against GIN
+indexes: trigram word similarity (typo tolerance) OR a 'simple' tsvector
+prefix match. Elsewhere (SQLite in development) an in-process index of the
+same words is used: exact, prefix and small-edit-distance matches per word
+(typo candidates are narrowed with a bigram index before the edit-distance
+check; all-digit words such as ERFs and phones only match exactly or by
+prefix).
+The index reloads when the snapshot changes in this process
+(bump_search_version(), called by the gate register refresh) and at the
+latest after CACHE_SECONDS for changes made by other workers.
+"""
+import bisect
+import json
+from collections import Counter
+import re
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import text
+
+from src.models.user import db, normalize_plate
+from src.models.gate_register import GateRegisterEntry
+
+# Upper bound on how stale another worker's in-process index can get
+CACHE_SECONDS = 60
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+
+# pg_trgm word_similarity() needed for a fuzzy hit (default is 0.6)
+PG_WORD_SIMILARITY = 0.4
+
+# Relative weight of a word by the field it came from
+FIELD_WEIGHTS = {
+    "name": 1.0,
+    "erf": 1.0,
+    "plate": 1.0,
+    "phone": 0.9,
+    "address": 0.7,
+    "email": 0.6,
+}
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+_lock = threading.Lock()
+_version = 0
+_index = {"version": None, "loaded_at": 0.0, "data": None}
+_pg_available = {}  # engine url -> bool
+
+
+# ---- normalization -----------------------------------------------------------
+
+def _words(value) -> list:
+    return _WORD.findall((value or "").lower())
+
+
+def _digits(value) -> str:
+    return re.sub(r"\D", "", value or "")
+
+
+def _plates(vehicle_registrations) -> list:
+    if isinstance(vehicle_registrations, str):
+        try:
+            vehicle_registrations = json.loads(vehicle_registrations or "[]")
+        except ValueError:
+            vehicle_registrations = []
+    return [normalize_plate(p).lower() for p in vehicle_registrations or [] if normalize_plate(p)]
+
+
+def _field_words(row) -> dict:
+    """field -> words for one snapshot row (dict or row object)."""
+    get = row.get if isinstance(row, dict) else (lambda name: getattr(row, name, None))
+    email = (get("email") or "").split("@")[0]
+    return {
+        "name": _words(get("first_name")) + _words(get("last_name")),
+        "erf": _words(get("erf_number")),
+        "address": _words(get("street_number")) + _words(get("street_name")),
+        "phone": [d for d in [_digits(get("phone_number"))] if d],
+        "plate": _plates(get("vehicle_registrations")),
+        "email": _words(email),
+    }
+
+
+def build_search_text(row) -> str:
+    """Normalized words of a gate register row, stored in search_text."""
+    seen, out = set(), []
+    for words in _field_words(row).values():
+        for word in words:
+            if word not in seen:
+                seen.add(word)
+                out.append(word)
+    return " ".join(out)
+
+
+def query_words(q) -> list:
+    """Words of a search query, normalized like the indexed text."""
+    return [w for w in _words(q) if w]
+
+
+def bump_search_version() -> None:
+    """Invalidate this process's in-process index (call after the snapshot changes)."""
+    global _version
+    with _lock:
+        _version += 1
+
+
+# ---- PostgreSQL --------------------------------------------------------------
+
+_PG_TSVECTOR = "to_tsvector('simple', coalesce(search_text, ''))"
+
+
+def ensure_search_indexes(engine) -> None:
+    """Create pg_trgm and the GIN indexes used by the search (PostgreSQL only)."""
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_gate_register_entries_search_trgm "
+                "ON gate_register_entries USING gin (search_text gin_trgm_ops)"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_gate_register_entries_search_tsv "
+                f"ON gate_register_entries USING gin ({_PG_TSVECTOR})"
+            ))
+        _pg_available.pop(str(engine.url), None)
+    except Exception as e:
+        # no privilege for CREATE EXTENSION: the in-process index is used instead
+        current_app.logger.warning("Search indexes not created (%s); using in-process search", e)
+
+
+def _use_postgres() -> bool:
+    engine = db.engine
+    if engine.dialect.name != "postgresql":
+        return False
+    key = str(engine.url)
+    if key not in _pg_available:
+        found = db.session.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first()
+        _pg_available[key] = found is not None
+    return _pg_available[key]
+
+
+def _search_postgres(words, limit):
+    phrase = " ".join(words)
+    tsquery = " & ".join(f"{w}:*" for w in words)
+    db.session.execute(text(f"SET LOCAL pg_trgm.word_similarity_threshold = {PG_WORD_SIMILARITY}"))
+    rows = db.session.execute(text(f"""
+        SELECT *, greatest(
+                   word_similarity(:phrase, coalesce(search_text, '')),
+                   ts_rank({_PG_TSVECTOR}, to_tsquery('simple', :tsquery))
+               ) AS score
+        FROM gate_register_entries
+        WHERE :phrase <% coalesce(search_text, '')
+           OR {_PG_TSVECTOR} @@ to_tsquery('simple', :tsquery)
+        ORDER BY score DESC, last_name, first_name
+        LIMIT :limit
+    """), {"phrase": phrase, "tsquery": tsquery, "limit": limit}).mappings().all()
+    return [(float(row["score"]), row) for row in rows]
+
+
+# ---- in-process index ----------------------------------------------------------
+
+def _load_index() -> dict:
+    table = GateRegisterEntry.__table__
+    rows = [dict(row) for row in db.session.execute(table.select()).mappings()]
+
+    postings = {}  # word -> {doc index: best field weight}
+    for i, row in enumerate(rows):
+        for field, words in _field_words(row).items():
+            weight = FIELD_WEIGHTS[field]
+            for word in words:
+                docs = postings.setdefault(word, {})
+                if docs.get(i, 0) < weight:
+                    docs[i] = weight
+
+    grams = {}  # bigram -> words containing it (typo candidates)
+    for word in postings:
+        if not word.isdigit():
+            for gram in _bigrams(word):
+                grams.setdefault(gram, set()).add(word)
+
+    return {"rows": rows, "postings": postings, "vocabulary": sorted(postings), "grams": grams}
+
+
+def _current_index() -> dict:
+    now = time.monotonic()
+    with _lock:
+        if _index["version"] == _version and now - _index["loaded_at"] < CACHE_SECONDS:
+            return _index["data"]
+        version = _version
+
+    data = _load_index()
+    with _lock:
+        _index.update(version=version, loaded_at=now, data=data)
+    return data
+
+
+def _bigrams(word) -> set:
+    return {word[i:i + 2] for i in range(len(word) - 1)}
+
+
+def _within_edits(a, b, limit) -> bool:
+    """Damerau-Levenshtein(a, b) <= limit, with an early exit."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    prev2, prev = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return False
+        prev2, prev = prev, cur
+    return prev[-1] <= limit
+
+
+def _allowed_edits(word) -> int:
+    if word.isdigit():
+        return 0
+    if len(word) >= 8:
+        return 2
+    if len(word) >= 4:
+        return 1
+    return 0
+
+
+def _typo_candidates(word, edits, grams):
+    # q-gram lemma: within `edits` edits, a word keeps at least this many of its bigrams
+    needed = max(1, len(word) - 1 - 2 * edits)
+    shared = Counter()
+    for gram in _bigrams(word):
+        shared.update(grams.get(gram, ()))
+    return [candidate for candidate, count in shared.items() if count >= needed]
+
+
+def _word_matches(word, vocabulary, grams) -> dict:
+    """vocabulary word -> match quality for one query word (exact 1.0, prefix, typo)."""
+    matches = {}
+    start = bisect.bisect_left(vocabulary, word)
+    for candidate in vocabulary[start:]:
+        if not candidate.startswith(word):
+            break
+        matches[candidate] = 1.0 if candidate == word else 0.6 + 0.3 * len(word) / len(candidate)
+
+    edits = _allowed_edits(word)
+    if edits:
+        for candidate in _typo_candidates(word, edits, grams):
+            if candidate in matches:
+                continue
+            if _within_edits(word, candidate, edits):
+                matches[candidate] = 0.5
+            elif len(candidate) > len(word) and _within_edits(word, candidate[:len(word)], 1):
+                matches[candidate] = 0.4  # typo in a prefix still being typed
+    return matches
+
+
+def _search_memory(words, limit):
+    index = _current_index()
+    postings, vocabulary, grams = index["postings"], index["vocabulary"], index["grams"]
+
+    scores = None
+    for word in words:
+        best = {}
+        for candidate, quality in _word_matches(word, vocabulary, grams).items():
+            for doc, weight in postings[candidate].items():
+                score = quality * weight
+                if score > best.get(doc, 0):
+                    best[doc] = score
+        # every query word must match something
+        scores = best if scores is None else {d: s + best[d] for d, s in scores.items() if d in best}
+        if not scores:
+            break
+
+    # "CA 123 456" typed with spaces still finds plate CA123456 (and split phone numbers)
+    compact = "".join(words)
+    if len(words) > 1 and len(compact) >= 4:
+        for candidate, quality in _word_matches(compact, vocabulary, grams).items():
+            for doc, weight in postings[candidate].items():
+                score = quality * weight * len(words)
+                if score > (scores or {}).get(doc, 0):
+                    scores = scores or {}
+                    scores[doc] = score
+
+    rows = index["rows"]
+    ranked = sorted(
+        (scores or {}).items(),
+        key=lambda item: (-item[1], (rows[item[0]]["last_name"] or "").lower(), (rows[item[0]]["first_name"] or "").lower()),
+    )
+    return [(score / len(words), rows[doc]) for doc, score in ranked[:limit]]
+
+
+# ---- public API --------------------------------------------------------------
+
+def _hit(score, row) -> dict:
+    try:
+        vehicles = json.loads(row["vehicle_registrations"] or "[]")
+    except ValueError:
+        vehicles = []
+    name = f"{row['first_name'] or ''} {row['last_name'] or ''}".strip()
+    return {
+        "user_id": row["user_id"],
+        "name": name,
+        "first_name": row["first_name"],
+        "last_name": row["last_name"],
+        "email": row["email"],
+        "phone_number": row["phone_number"],
+        "erf_number": row["erf_number"],
+        "address": f"{row['street_number'] or ''} {row['street_name'] or ''}".strip(),
+        "resident_status": row["resident_status"],
+        "user_status": row["user_status"],
+        "vehicles": vehicles,
+        "score": round(score, 3),
+    }
+
+
+def search_households(q, limit=DEFAULT_LIMIT):
+    """Ranked hits for a query. Returns (hits, backend) with backend 'postgres' or 'memory'."""
+    words = query_words(q)
+    if not words:
+        return [], None
+    if _use_postgres():
+        return [_hit(s, r) for s, r in _search_postgres(words, limit)], "postgres"
+    return [_hit(s, r) for s, r in _search_memory(words, limit)], "memory"
@@ -0,0 +1,29 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+# Same import layout as the app (`src.*`), against a throwaway in-memory database
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("METRICS_ENABLED", "0")
+
+
+@pytest.fixture()
+def app():
+    from src.main import app as flask_app
+    from src.models.migrate import migrate_schema
+    from src.models.user import db
+
+    flask_app.config["TESTING"] = True
+    with flask_app.app_context():
+        db.drop_all()
+        assert migrate_schema() == []
+        yield flask_app
+        db.session.remove()
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
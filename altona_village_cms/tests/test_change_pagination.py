@@ -0,0 +1,67 @@
+# tests/test_change_pagination.py
+"""Cursor and legacy ?page= paging of the admin change lists."""
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from src.models.user import db, User
+from src.models.user_change import UserChange
+from src.routes.admin_notifications import CRITICAL_FIELDS
+from src.utils.auth import token_claims
+
+
+@pytest.fixture()
+def headers(app):
+    admin = User(email="admin@example.com", role="admin", status="active", password_hash="unused")
+    db.session.add(admin)
+    start = datetime(2025, 1, 1)
+    for i in range(5):
+        field = CRITICAL_FIELDS[0] if i < 2 else "intercom_code"
+        db.session.add(UserChange(
+            user_id="u1", change_type="resident_update", field_name=field,
+            old_value="a", new_value=str(i), change_timestamp=start + timedelta(minutes=i),
+        ))
+    db.session.commit()
+    token = create_access_token(identity=admin.id, additional_claims=token_claims(admin))
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _values(rows):
+    return [row["new_value"] for row in rows]
+
+
+def test_page_param_serves_offset_pages(client, headers):
+    first = client.get("/api/admin/changes/pending?page=1&per_page=2", headers=headers).get_json()
+    second = client.get("/api/admin/changes/pending?page=2&per_page=2", headers=headers).get_json()
+
+    assert _values(first["changes"]) == ["1", "0"]
+    assert _values(second["changes"]) == ["4", "3"]
+    assert second["pagination"] == {
+        "page": 2, "per_page": 2, "next_cursor": None, "has_next": True, "has_prev": True,
+        "total_count": 5, "total_pages": 3, "total_is_estimate": False,
+    }
+    assert second["critical_pending"] == 2
+
+    non_critical = client.get("/api/admin/changes/non-critical?page=2&per_page=2", headers=headers).get_json()
+    assert _values(non_critical["non_critical_changes"]) == ["2"]
+    assert non_critical["total_pending"] == 3
+
+
+def test_cursor_pages_match_page_order(client, headers):
+    seen = []
+    url = "/api/admin/changes/pending?per_page=2"
+    while url:
+        body = client.get(url, headers=headers).get_json()
+        seen += _values(body["changes"])
+        assert body["pagination"]["total_is_estimate"] is True
+        cursor = body["pagination"]["next_cursor"]
+        url = f"/api/admin/changes/pending?per_page=2&cursor={cursor}" if cursor else None
+    assert seen == ["1", "0", "4", "3", "2"]
+
+
+def test_cursor_and_page_together_is_rejected(client, headers):
+    body = client.get("/api/admin/changes/pending?per_page=2", headers=headers).get_json()
+    cursor = body["pagination"]["next_cursor"]
+    response = client.get(f"/api/admin/changes/non-critical?page=2&cursor={cursor}", headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,52 @@
+# tests/test_login.py
+"""Password verification cost of logging in to an email with several ERF accounts."""
+import pytest
+from werkzeug.security import generate_password_hash
+
+from src.models.user import db, User
+from src.routes import auth
+
+
+@pytest.fixture()
+def verifications(app, monkeypatch):
+    """Counts check_password calls; shares hashes between sibling accounts."""
+    app.config["SHARE_PASSWORD_HASH_PER_EMAIL"] = True
+    auth._checked_siblings.clear()
+    calls = []
+    original = User.check_password
+
+    def counting(self, password):
+        calls.append(self.id)
+        return original(self, password)
+
+    monkeypatch.setattr(User, "check_password", counting)
+    yield calls
+    app.config["SHARE_PASSWORD_HASH_PER_EMAIL"] = False
+
+
+def _account(password):
+    # a cheap hash method keeps the test fast; each call still salts its own hash
+    user = User(email="multi@example.com", role="resident", status="active",
+                password_hash=generate_password_hash(password, method="pbkdf2:sha256:1"))
+    db.session.add(user)
+    return user
+
+
+def _login(client, password="secret"):
+    return client.post("/api/auth/login", json={"email": "multi@example.com", "password": password})
+
+
+def test_siblings_are_verified_once(client, verifications):
+    same = [_account("secret") for _ in range(3)]
+    other = _account("different")
+    db.session.commit()
+
+    assert _login(client).status_code == 200
+    db.session.expire_all()
+    assert len({u.password_hash for u in same}) == 1
+    assert other.password_hash not in {u.password_hash for u in same}
+
+    # the shared hash matches first; the differing sibling is not re-verified
+    verifications.clear()
+    assert _login(client).status_code == 200
+    assert len(verifications) == 1
@@ -0,0 +1,31 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from src.models.email_job import EmailJobAttachment
+from src.models.migrate import migrate_schema
+from src.models.user import db
+
+
+@pytest.fixture()
+def broken_attachment_table(app):
+    """Drop email_job_attachments and make creating it fail."""
+    EmailJobAttachment.__table__.drop(bind=db.engine)
+
+    def fail(conn, cursor, statement, *args):
+        if statement.lstrip().startswith("CREATE TABLE email_job_attachments"):
+            raise OperationalError(statement, {}, Exception("disk full"))
+
+    event.listen(db.engine, "before_cursor_execute", fail)
+    yield
+    event.remove(db.engine, "before_cursor_execute", fail)
+
+
+def test_failed_step_is_reported(broken_attachment_table):
+    assert migrate_schema() == ["create tables", "email job tables"]
+
+
+def test_migrate_db_exits_non_zero(app, broken_attachment_table):
+    result = app.test_cli_runner().invoke(args=["migrate-db"])
+    assert result.exit_code == 1
+    assert "email job tables" in result.output
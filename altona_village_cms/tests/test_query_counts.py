@@ -0,0 +1,177 @@
+# tests/test_query_counts.py
+"""
+Query-count regression tests for the listing endpoints.
+
+Each endpoint is called against a seed of N and of 2N households. The
+number of SQL statements must be the same for both sizes (and equal to the
+pinned count), so a relationship that falls back to lazy loading per row
+shows up here as a failure instead of as a slow page in production.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from src.models.migrate import migrate_schema
+from src.models.user import (
+    db, User, Resident, Owner, Vehicle, Property, Meter, Builder, Complaint, ComplaintUpdate,
+)
+from src.utils.auth import invalidate_role_cache, token_claims
+from src.utils.gate_register import rebuild_gate_register
+
+SIZES = (5, 10)
+
+
+def _resident(user, erf, status="active"):
+    return Resident(
+        user_id=user.id, first_name=f"First{erf}", last_name=f"Last{erf}", phone_number="0820000000",
+        id_number="8001015009087", erf_number=str(erf), street_number=str(erf), street_name="Main Street",
+        full_address=f"{erf} Main Street", intercom_code=f"I{erf}", status=status,
+    )
+
+
+def _owner(user, erf):
+    return Owner(
+        user_id=user.id, first_name=f"First{erf}", last_name=f"Last{erf}", phone_number="0820000000",
+        id_number="8001015009087", erf_number=str(erf), street_number=str(erf), street_name="Main Street",
+        full_address=f"{erf} Main Street", intercom_code=f"I{erf}", title_deed_number=f"T{erf}",
+        postal_street_number=str(erf), postal_street_name="Main Street", postal_suburb="Altona",
+        postal_city="City", postal_code="0000", postal_province="Province",
+        full_postal_address=f"{erf} Main Street, Altona", status="active",
+    )
+
+
+def _user(email, role, status="active"):
+    # the listings never check passwords, so skip the (slow) hashing
+    user = User(email=email, role=role, status=status, password_hash="unused")
+    db.session.add(user)
+    db.session.flush()
+    return user
+
+
+def seed(n):
+    """
+    An admin; n active households (every other one owner-resident, each
+    with vehicles); n pending registrations; and one resident (with a
+    second ERF under the same email) holding n vehicles, complaints with
+    admin updates, and properties with a builder and meters.
+    Returns (admin, resident).
+    """
+    admin = _user("admin@example.com", "admin")
+
+    for i in range(n):
+        erf = 1000 + i
+        user = _user(f"household{i}@example.com", "owner-resident" if i % 2 else "resident")
+        resident = _resident(user, erf)
+        db.session.add(resident)
+        if i % 2:
+            owner = _owner(user, erf)
+            db.session.add(owner)
+            db.session.flush()
+            db.session.add(Vehicle(owner_id=owner.id, registration_number=f"OWN{i}", make="VW"))
+        db.session.flush()
+        db.session.add(Vehicle(resident_id=resident.id, registration_number=f"RES{i}", make="Toyota"))
+
+    for i in range(n):
+        user = _user(f"pending{i}@example.com", "resident", status="pending")
+        db.session.add(_resident(user, 2000 + i, status="pending"))
+
+    me = _user("me@example.com", "resident")
+    my_resident = _resident(me, 3000)
+    db.session.add(my_resident)
+    sibling = _user("me@example.com", "resident")
+    sibling_resident = _resident(sibling, 3001)
+    db.session.add(sibling_resident)
+    db.session.flush()
+
+    for i in range(n):
+        db.session.add(Vehicle(resident_id=my_resident.id, registration_number=f"ME{i}", make="Ford"))
+        db.session.add(Vehicle(resident_id=sibling_resident.id, registration_number=f"SIB{i}", make="Ford"))
+
+        complaint = Complaint(resident_id=my_resident.id, subject=f"Complaint {i}", description="Streetlight out")
+        db.session.add(complaint)
+        db.session.flush()
+        db.session.add(ComplaintUpdate(complaint_id=complaint.id, user_id=admin.id, update_text="Looking into it"))
+
+        prop = Property(erf_number=str(4000 + i), address=f"{4000 + i} Main Street", resident_id=my_resident.id)
+        db.session.add(prop)
+        db.session.flush()
+        db.session.add(Builder(property_id=prop.id, company_name="Builders Ltd",
+                               building_start_date=datetime(2024, 1, 1)))
+        db.session.add(Meter(property_id=prop.id, meter_type="water", meter_number=f"W{i}"))
+
+    rebuild_gate_register()
+    db.session.commit()
+    return admin, me
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _count)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _count)
+
+
+def queries_for(client, user, url):
+    """Statements one GET issues, starting from cold per-request state."""
+    token = create_access_token(identity=user.id, additional_claims=token_claims(user))
+    invalidate_role_cache()
+    db.session.expunge_all()  # nothing left over from the seed in the identity map
+    with count_queries() as statements:
+        response = client.get(url, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return len(statements)
+
+
+# (url, expected statements); {me} is the seeded resident's user id.
+# Admin calls include the role check behind check_admin().
+ADMIN_LISTINGS = [
+    ("/api/admin/residents", 2),
+    ("/api/admin/residents?per_page=50", 2),
+    ("/api/admin/pending-registrations", 2),
+    ("/api/admin/properties", 3),
+    ("/api/admin/complaints", 3),
+    ("/api/admin/email-status", 2),
+    ("/api/admin/communication/residents-group", 2),
+    ("/api/admin/communication/owners-group", 2),
+    ("/api/admin/communication/non-resident-owners", 2),
+    ("/api/admin/communication/owner-residents", 2),
+    ("/api/admin/residents/{me}/vehicles", 5),
+    ("/api/admin/gate-register", 2),
+]
+
+RESIDENT_LISTINGS = [
+    ("/api/resident/vehicles", 3),
+    ("/api/resident/complaints", 4),
+    ("/api/resident/properties", 4),
+]
+
+
+def _counts(app, client, url, as_admin):
+    counts = []
+    for n in SIZES:
+        with app.app_context():
+            db.drop_all()
+            migrate_schema()
+            admin, me = seed(n)
+            counts.append(queries_for(client, admin if as_admin else me, url.format(me=me.id)))
+    return counts
+
+
+@pytest.mark.parametrize("url,expected", ADMIN_LISTINGS)
+def test_admin_listing_query_count(app, client, url, expected):
+    assert _counts(app, client, url, as_admin=True) == [expected] * len(SIZES)
+
+
+@pytest.mark.parametrize("url,expected", RESIDENT_LISTINGS)
+def test_resident_listing_query_count(app, client, url, expected):
+    assert _counts(app, client, url, as_admin=False) == [expected] * len(SIZES)
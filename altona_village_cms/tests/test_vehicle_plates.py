@@ -0,0 +1,50 @@
+# tests/test_vehicle_plates.py
+"""The plate_normalized migration and legacy vehicles whose plates collide."""
+from datetime import datetime
+
+from src.models.user import db, Vehicle, ensure_vehicle_plate_column, duplicate_vehicle_plates
+
+
+def _legacy_vehicle(vehicle_id, registration_number, status="active", created_at=datetime(2024, 1, 1)):
+    # raw insert: rows from before the column existed have no plate_normalized
+    db.session.execute(Vehicle.__table__.insert().values(
+        id=vehicle_id, registration_number=registration_number, status=status,
+        created_at=created_at, updated_at=created_at,
+    ))
+
+
+def test_colliding_plates_stay_active_and_are_reported(app):
+    _legacy_vehicle("old-inactive", "CA 123-456", status="inactive", created_at=datetime(2023, 1, 1))
+    _legacy_vehicle("active", "ca123456")
+    _legacy_vehicle("other", "CY 1")
+    db.session.commit()
+
+    ensure_vehicle_plate_column()
+    db.session.expire_all()
+
+    kept, duplicate = db.session.get(Vehicle, "active"), db.session.get(Vehicle, "old-inactive")
+    assert kept.plate_normalized == "CA123456"
+    assert duplicate.plate_normalized is None
+    assert duplicate.status == "inactive" and duplicate.migration_reason is None
+    assert db.session.get(Vehicle, "other").plate_normalized == "CY1"
+
+    assert [(d["plate"], d["vehicle"]["id"], d["kept_on"]["id"]) for d in duplicate_vehicle_plates()] == [
+        ("CA123456", "old-inactive", "active"),
+    ]
+
+    result = app.test_cli_runner().invoke(args=["vehicle-plate-duplicates"])
+    assert "old-inactive" in result.output and "1 duplicate vehicle(s)" in result.output
+
+
+def test_active_duplicate_is_not_deactivated(app):
+    _legacy_vehicle("first", "GP 1", created_at=datetime(2023, 1, 1))
+    _legacy_vehicle("second", "gp1")
+    db.session.commit()
+
+    ensure_vehicle_plate_column()
+    db.session.expire_all()
+
+    assert {v.id: (v.status, v.plate_normalized) for v in Vehicle.query.all()} == {
+        "first": ("active", "GP1"),
+        "second": ("active", None),
+    }
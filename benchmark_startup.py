@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+Measures backend cold starts: app import time and time-to-first-request.
+
+Local mode (default) runs each sample in a fresh Python process:
+  - import_s:        time to import altona_village_cms.src.main (create_app)
+  - first_request_s: time for the first GET /api/health after import
+  - first_db_s:      time for the first request that touches the database
+
+Remote mode (--url) times the first response of a deployed instance, e.g.
+right after a Render deploy or while it wakes from sleep.
+
+Usage:
+  DATABASE_URL=sqlite:////tmp/bench.db python benchmark_startup.py --runs 5
+  python benchmark_startup.py --importtime          # slowest imported modules
+  python benchmark_startup.py --url https://altona-village-backend.onrender.com
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Runs inside the child process; prints one JSON line of timings
+CHILD = r"""
+import json, sys, time
+sys.path.insert(0, {root!r})
+t0 = time.perf_counter()
+from altona_village_cms.src.main import app
+t1 = time.perf_counter()
+client = app.test_client()
+client.get("/api/health")
+t2 = time.perf_counter()
+client.get("/api/public/erf-lookup/0")
+t3 = time.perf_counter()
+heavy = sorted(m for m in ("pandas", "numpy", "openpyxl") if m in sys.modules)
+print("BENCH " + json.dumps({{
+    "import_s": t1 - t0, "first_request_s": t2 - t1, "first_db_s": t3 - t2, "heavy_modules": heavy,
+}}))
+"""
+
+
+def run_local_sample(extra_args=()):
+    code = CHILD.format(root=ROOT)
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, *extra_args, "-c", code],
+        capture_output=True, text=True, cwd=ROOT, env=os.environ.copy(),
+    )
+    total = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "child failed")
+    line = next((l for l in proc.stdout.splitlines() if l.startswith("BENCH ")), None)
+    if not line:
+        raise RuntimeError("no timings reported by child process")
+    sample = json.loads(line[len("BENCH "):])
+    sample["process_s"] = total
+    return sample, proc.stderr
+
+
+def summarize(samples, key):
+    values = [s[key] for s in samples]
+    return f"median {statistics.median(values) * 1000:8.1f} ms   min {min(values) * 1000:8.1f} ms   max {max(values) * 1000:8.1f} ms"
+
+
+def bench_local(runs):
+    if not os.environ.get("DATABASE_URL"):
+        print("❌ DATABASE_URL is not set (e.g. DATABASE_URL=sqlite:////tmp/bench.db)")
+        return 1
+
+    samples = []
+    for i in range(runs):
+        sample, _ = run_local_sample()
+        samples.append(sample)
+        print(f"  run {i + 1}: import {sample['import_s'] * 1000:.1f} ms, "
+              f"first request {sample['first_request_s'] * 1000:.1f} ms, "
+              f"first DB request {sample['first_db_s'] * 1000:.1f} ms")
+
+    print("\n🚀 ALTONA VILLAGE CMS - STARTUP BENCHMARK")
+    print("=" * 60)
+    for key, label in (("import_s", "App import"), ("first_request_s", "First request"),
+                       ("first_db_s", "First DB request"), ("process_s", "Whole process")):
+        print(f"{label:<18}{summarize(samples, key)}")
+    heavy = samples[-1]["heavy_modules"]
+    print(f"Heavy modules loaded at boot: {', '.join(heavy) if heavy else 'none'}")
+    return 0
+
+
+def bench_importtime(top):
+    """Slowest modules by cumulative import time (python -X importtime)."""
+    _, stderr = run_local_sample(("-X", "importtime"))
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split(":", 1)[1].split("|", 2)
+        rows.append((int(cumulative_us), name.rstrip()))
+    rows.sort(reverse=True)
+    print(f"Top {top} imports by cumulative time:")
+    for cumulative_us, name in rows[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+    return 0
+
+
+def bench_remote(url, timeout):
+    url = url.rstrip("/") + "/api/health"
+    start = time.perf_counter()
+    deadline = start + timeout
+    attempts = 0
+    while time.perf_counter() < deadline:
+        attempts += 1
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as resp:
+                if resp.status == 200:
+                    print(f"✅ {url} answered after {time.perf_counter() - start:.2f} s ({attempts} attempt(s))")
+                    return 0
+        except Exception:
+            time.sleep(1)
+    print(f"❌ {url} did not answer within {timeout} s")
+    return 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure backend import time and time-to-first-request.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh-process samples to take (local mode)")
+    parser.add_argument("--importtime", action="store_true", help="list the slowest imports instead")
+    parser.add_argument("--top", type=int, default=20, help="rows to show with --importtime")
+    parser.add_argument("--url", help="time the first response of a deployed backend instead")
+    parser.add_argument("--timeout", type=float, default=180.0, help="seconds to wait in --url mode")
+    args = parser.parse_args()
+
+    if args.url:
+        return bench_remote(args.url, args.timeout)
+    if args.importtime:
+        return bench_importtime(args.top)
+    return bench_local(args.runs)
+
+
+if __name__ == "__main__":
+    sys.exit(main())